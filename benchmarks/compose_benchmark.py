@@ -0,0 +1,71 @@
+"""
+Frame composition benchmark for the animated slots renderer.
+
+Builds the frames of a fixed set of seeded spins with the original Pillow
+paste loop and with the NumPy engine in SlotsRenderer (cold, rebuilding every
+reel column, and warm, from the column cache), and reports frames per second
+and peak memory growth. Each engine runs in its own forked process so peak
+RSS is measured separately.
+
+Usage:
+    python -m benchmarks.compose_benchmark [--spins 10] [--seed 1]
+"""
+import argparse
+import multiprocessing
+import resource
+import time
+
+from benchmarks.render_benchmark import legacy_frames, seeded_stops
+from utils.image_generator import SYMBOL_SIZE, load_slots_assets
+from utils.slots_render import FRAME_COUNT, SlotsRenderer
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_engine(name, assets, stops, results):
+    """Build all frames with one engine and report its speed and memory."""
+    if name == "pillow":
+        build = lambda *stop: legacy_frames(assets, *stop)
+    elif name == "numpy-cold":
+        # No cache budget, so every spin rebuilds its three reel columns
+        build = SlotsRenderer(assets, cache_bytes=0).render_frames
+    else:
+        renderer = SlotsRenderer(assets)
+        for stop in stops:
+            renderer.render_frames(*stop)
+        build = renderer.render_frames
+
+    rss_before = _peak_rss_mb()
+    start = time.perf_counter()
+    for stop in stops:
+        build(*stop)
+    elapsed = time.perf_counter() - start
+    results.put((name, len(stops) * FRAME_COUNT / elapsed, _peak_rss_mb() - rss_before))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--spins", type=int, default=10, help="Number of seeded spins to build")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the reel stops")
+    args = parser.parse_args()
+
+    assets = load_slots_assets()
+    items = assets.reel_size[1] // SYMBOL_SIZE
+    stops = seeded_stops(args.spins, args.seed, items)
+
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    print(f"{args.spins} spins, {FRAME_COUNT} frames each")
+    for name in ("pillow", "numpy-cold", "numpy-warm"):
+        process = context.Process(target=_run_engine, args=(name, assets, stops, results))
+        process.start()
+        engine, fps, peak_mb = results.get()
+        process.join()
+        print(f"{engine:<12} {fps:8.0f} frames/s  peak RSS +{peak_mb:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Output format benchmark for the animated slots renderer.
+
+Renders a fixed set of seeded spins in every format in ANIMATION_FORMATS and
+reports the encode time and bytes per animation for each, so operators can
+pick a format for SLOTS_ANIMATION_FORMAT or /slots_format.
+
+Usage:
+    python -m benchmarks.format_benchmark [--spins 10] [--seed 1] [--formats gif,webp]
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.render_benchmark import seeded_stops
+from utils.image_generator import SYMBOL_SIZE, load_slots_assets
+from utils.slots_render import ANIMATION_FORMATS, FRAME_COUNT, FRAME_DURATION, SlotsRenderer
+
+
+def run_format(renderer, fmt, stops):
+    """Time rendering and encoding a format over all stops."""
+    times, sizes = [], []
+    for stop in stops:
+        start = time.perf_counter()
+        data = renderer.render_animation(*stop, fmt).getvalue()
+        times.append(time.perf_counter() - start)
+        sizes.append(len(data))
+    return times, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--spins", type=int, default=10, help="Number of seeded spins to render")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the reel stops")
+    parser.add_argument("--formats", default=",".join(ANIMATION_FORMATS), help="Comma-separated formats to run")
+    args = parser.parse_args()
+
+    assets = load_slots_assets()
+    items = assets.reel_size[1] // SYMBOL_SIZE
+    stops = seeded_stops(args.spins, args.seed, items)
+
+    renderer = SlotsRenderer(assets)
+    # Warm the column cache so only encoding differs between formats
+    for stop in stops:
+        renderer.render_frames(*stop)
+
+    print(f"{args.spins} spins, {FRAME_COUNT} frames at {FRAME_DURATION} ms")
+    for fmt in args.formats.split(","):
+        times, sizes = run_format(renderer, fmt, stops)
+        print(
+            f"{fmt:<14} median {statistics.median(times) * 1000:7.1f} ms  "
+            f"max {max(times) * 1000:7.1f} ms  "
+            f"size {statistics.mean(sizes) / 1024:7.1f} KB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Mention command routing benchmark.
+
+Routes a seeded corpus of bot mentions, mostly chatter with some commands,
+with the substring checks on_message used to run and with the token router
+in utils.mention_router. Reports the time per message of each and the
+messages the substring checks turned into a game that the router doesn't,
+and fails if any of `NOT_ALL_IN` is routed as an all-in bet.
+
+Usage:
+    python -m benchmarks.mention_benchmark [--messages 20000] [--seed 1] [--repeat 5]
+"""
+import argparse
+import random
+import sys
+import time
+
+from utils.currency import MAX_BET_WORDS
+from utils.mention_router import route
+
+MENTION = "<@1180000000000000000>"
+
+COMMANDS = [
+    "slots", "slots 100", "sl 1k", "slot max", "slots 2.5k",
+    "coinflip heads 50", "flip t 200", "coin 1k tails", "coinflip all h",
+    "blackjack 500", "bj 1k", "21 250",
+]
+
+CHATTER = [
+    "gm everyone", "how do i get more coins", "what's my balance",
+    "lol i slipped and lost everything", "can you flip the table for me",
+    "i had 2100 an hour ago", "this bot is a slot machine of lies",
+    "is the blackjack table open", "flipping out right now", "slow day today",
+    "the odds are rigged", "who is top of the leaderboard", "i need my daily",
+    "please give me money", "what does the wild symbol do", "coins pls",
+    "my friend said you cheat at 21", "thanks for the 1k", "when is the next event",
+    "does anyone want to play", "sleeping now, gn", "how does work give money",
+    "flip a coin",
+]
+
+# Messages that route to a game but must never bet the whole balance
+NOT_ALL_IN = ["flip a coin", "coin h 10 a", "coinflip m", "flip a coin for me, heads"]
+
+
+def build_corpus(count, seed, command_share=0.3):
+    """
+    Build mention messages, a share of them commands and the rest chatter.
+
+    Returns:
+        list: Message contents, mentions included
+    """
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        text = rng.choice(COMMANDS) if rng.random() < command_share else rng.choice(CHATTER)
+        # Mentions usually lead, sometimes trail
+        messages.append(f"{MENTION} {text}" if rng.random() < 0.8 else f"{text} {MENTION}")
+    return messages
+
+
+def legacy_route(content):
+    """Route a message with the substring checks on_message used before the token router."""
+    content = content.lower()
+
+    slots_keywords = ["slots", "sl", "slot"]
+    if any(keyword in content for keyword in slots_keywords):
+        parts = content.split()
+        bet = "1"
+        for i, part in enumerate(parts):
+            if part.lower() in slots_keywords:
+                if i + 1 < len(parts):
+                    bet = parts[i + 1]
+                break
+        return ("slots", bet)
+
+    coinflip_keywords = ["coinflip", "coin", "flip"]
+    if any(keyword in content for keyword in coinflip_keywords):
+        parts = content.split()
+        bet_str = "1"
+        choice = "heads"
+        for i, part in enumerate(parts):
+            if part.lower() in coinflip_keywords:
+                for j in range(i + 1, min(len(parts), i + 4)):
+                    if parts[j].lower() in ["heads", "head", "h"]:
+                        choice = "heads"
+                    elif parts[j].lower() in ["tails", "tail", "t"]:
+                        choice = "tails"
+                    elif parts[j].isdigit() or parts[j].lower() in ["all", "max"]:
+                        bet_str = parts[j]
+                break
+        return ("coinflip", bet_str, choice)
+
+    blackjack_keywords = ["blackjack", "bj", "21"]
+    if any(keyword in content for keyword in blackjack_keywords):
+        parts = content.split()
+        for i, part in enumerate(parts):
+            if part.lower() in blackjack_keywords and i + 1 < len(parts):
+                return ("blackjack", parts[i + 1])
+        return ("blackjack", None)
+
+    return None
+
+
+def time_router(router, messages, repeat):
+    """Get the fastest time per message, in microseconds, over repeated passes."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content in messages:
+            router(content)
+        best = min(best, time.perf_counter() - start)
+    return best / len(messages) * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=20000, help="Number of messages in the corpus")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the corpus")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes per router, keeping the fastest")
+    args = parser.parse_args()
+
+    messages = build_corpus(args.messages, args.seed)
+    legacy_us = time_router(legacy_route, messages, args.repeat)
+    router_us = time_router(route, messages, args.repeat)
+
+    print(f"{len(messages):,} messages")
+    print(f"{'router':<12}{'us/msg':>10}{'games':>10}")
+    legacy_games = sum(legacy_route(content) is not None for content in messages)
+    router_games = sum(route(content) is not None for content in messages)
+    print(f"{'substring':<12}{legacy_us:>10.2f}{legacy_games:>10,}")
+    print(f"{'token':<12}{router_us:>10.2f}{router_games:>10,}")
+    print(f"Speedup: {legacy_us / router_us:.2f}x")
+
+    false_triggers = sorted({
+        content.replace(MENTION, "").strip() for content in messages
+        if legacy_route(content) is not None and route(content) is None
+    })
+    print(f"Chatter the substring checks started a game for ({len(false_triggers)} distinct):")
+    for text in false_triggers:
+        print(f"  {text!r} -> {legacy_route(text)[0]}")
+
+    all_in = [text for text in NOT_ALL_IN if route(f"{MENTION} {text}").bet in MAX_BET_WORDS]
+    for text in all_in:
+        print(f"{text!r} was routed as an all-in bet")
+    return 1 if all_in else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
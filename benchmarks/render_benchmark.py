@@ -0,0 +1,113 @@
+"""
+Render benchmark for the animated slots GIF pipeline.
+
+Renders a fixed set of seeded spins with the legacy pipeline (RGBA frames
+quantized by the GIF encoder), the palette-mode pipeline with full frames and
+the palette-mode pipeline with transparent delta frames as the bot encodes
+them, and reports frame build time, encode time and bytes per GIF for each,
+with the size relative to the original pipeline.
+
+Usage:
+    python -m benchmarks.render_benchmark [--spins 20] [--seed 1]
+"""
+import argparse
+import io
+import statistics
+import time
+
+from PIL import Image
+
+from utils.image_generator import BACKGROUND_COLOR, SYMBOL_SIZE, load_slots_assets
+from utils.rng import RoundRng
+from utils.slots_render import FRAME_COUNT, FRAME_DURATION, REEL_X, REEL_Y, SPIN_SPEED, SlotsRenderer
+
+
+def seeded_stops(spins, seed, items):
+    """Get a reproducible list of (s1, s2, s3) reel stops."""
+    rng = RoundRng(seed)
+    return [tuple(rng.randint(1, items - 1) for _ in range(3)) for _ in range(spins)]
+
+
+def legacy_frames(assets, s1, s2, s3):
+    """Build frames the way AnimatedSlots originally did, as full RGBA images."""
+    reel = assets.reel()
+    facade = assets.facade()
+    rw = reel.size[0]
+    images = []
+    for i in range(1, FRAME_COUNT + 1):
+        bg = Image.new('RGBA', facade.size, color=BACKGROUND_COLOR)
+        for k, stop in enumerate((s1, s2, s3)):
+            bg.paste(reel, (REEL_X + rw * k, REEL_Y - (SPIN_SPEED * i * stop)))
+        bg.alpha_composite(facade)
+        images.append(bg)
+    return images
+
+
+def encode(images, **params):
+    """Encode frames as a GIF in memory and return the bytes."""
+    buffer = io.BytesIO()
+    images[0].save(
+        buffer,
+        format='GIF',
+        save_all=True,
+        append_images=images[1:],
+        duration=FRAME_DURATION,
+        loop=0,
+        **params
+    )
+    return buffer.getvalue()
+
+
+def run_pipeline(build, encode_frames, stops):
+    """Time frame building and encoding separately over all stops."""
+    build_times, encode_times, sizes = [], [], []
+    for stop in stops:
+        start = time.perf_counter()
+        images = build(*stop)
+        built = time.perf_counter()
+        data = encode_frames(images)
+        done = time.perf_counter()
+        build_times.append(built - start)
+        encode_times.append(done - built)
+        sizes.append(len(data))
+    return build_times, encode_times, sizes
+
+
+def report(name, build_times, encode_times, sizes, before_sizes):
+    """Print median timings and sizes for a pipeline, with its size against the original."""
+    size = statistics.mean(sizes)
+    print(
+        f"{name:<10} build {statistics.median(build_times) * 1000:7.1f} ms  "
+        f"encode {statistics.median(encode_times) * 1000:7.1f} ms  "
+        f"size {size / 1024:7.1f} KB/GIF ({size / statistics.mean(before_sizes) - 1:+.1%} vs before)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--spins", type=int, default=20, help="Number of seeded spins to render")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the reel stops")
+    args = parser.parse_args()
+
+    assets = load_slots_assets()
+    items = assets.reel_size[1] // SYMBOL_SIZE
+    stops = seeded_stops(args.spins, args.seed, items)
+
+    renderer = SlotsRenderer(assets)
+    # Warm the column cache so the palette pipelines are measured at steady state
+    for stop in stops:
+        renderer.render_delta_frames(*stop)
+
+    print(f"{args.spins} spins, {FRAME_COUNT} frames each")
+    before = run_pipeline(lambda *s: legacy_frames(assets, *s), encode, stops)
+    report("before", *before, before[2])
+    report("palette", *run_pipeline(
+        renderer.render_frames, lambda images: encode(images, optimize=False), stops
+    ), before[2])
+    report("delta", *run_pipeline(
+        renderer.render_delta_frames, lambda images: renderer.encode(images).getvalue(), stops
+    ), before[2])
+
+
+if __name__ == "__main__":
+    main()
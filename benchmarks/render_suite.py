@@ -0,0 +1,297 @@
+"""
+Render regression suite for /animated_slots.
+
+Runs the production render pipeline (SlotsRenderer.build_frames and encode)
+over fixed seeded reel stops without a Discord connection, first with a cold
+column cache and then warm. Each pass is repeated with a fresh renderer and
+the fastest time per spin is kept, which filters out scheduler noise. It
+reports p50/p95/p99 build, encode and total time, bytes per animation and
+peak RSS, and compares them with the stored baseline. It also checks that
+the text grid shown when animations are unavailable matches the symbols the
+still image of each spin shows. The exit status is 1 if the grid is wrong for
+any spin or any metric regressed beyond its tolerance.
+
+Usage:
+    python -m benchmarks.render_suite [--spins 50] [--seed 1] [--repeat 3] [--formats gif]
+    python -m benchmarks.render_suite --update-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+import PIL
+from PIL import Image
+
+from benchmarks.render_benchmark import seeded_stops
+from utils.image_generator import SYMBOL_SIZE, load_slots_assets
+from utils.paytable import get_paytable
+from utils.slots_render import ANIMATION_FORMATS, REEL_X, SlotsRenderer, visible_grid, window_rows
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Allowed relative increase over the baseline before a metric counts as a regression.
+# p95 and p99 timings are noisier, so they get twice the time tolerance.
+TIME_TOLERANCE = 0.25
+BYTES_TOLERANCE = 0.01
+RSS_TOLERANCE = 0.20
+
+# Every nth row of a window is compared with the reel strip when reading a still
+GRID_SAMPLE_STEP = 4
+
+
+def percentiles(values):
+    """Get the p50, p95 and p99 of a list of values."""
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50": round(cuts[49], 2), "p95": round(cuts[94], 2), "p99": round(cuts[98], 2)}
+
+
+def run_pass(renderer, fmt, stops):
+    """
+    Render every stop once.
+
+    Returns:
+        dict: Per-spin build_ms, encode_ms, total_ms and bytes lists
+    """
+    times = {"build_ms": [], "encode_ms": [], "total_ms": [], "bytes": []}
+    for stop in stops:
+        start = time.perf_counter()
+        images = renderer.build_frames(*stop, fmt)
+        built = time.perf_counter()
+        data = renderer.encode(images, fmt).getvalue()
+        done = time.perf_counter()
+        times["build_ms"].append((built - start) * 1000)
+        times["encode_ms"].append((done - built) * 1000)
+        times["total_ms"].append((done - start) * 1000)
+        times["bytes"].append(len(data))
+    return times
+
+
+def summarize(passes):
+    """Keep the fastest repeat of each spin and summarize the timings and sizes."""
+    summary = {}
+    for metric in ("build_ms", "encode_ms", "total_ms"):
+        summary[metric] = percentiles([min(spin) for spin in zip(*(p[metric] for p in passes))])
+    summary["bytes"] = round(statistics.mean(passes[0]["bytes"]))
+    return summary
+
+
+def run_suite(spins, seed, formats, repeat=3):
+    """
+    Run the suite for each format, with a fresh renderer per repeat.
+
+    Returns:
+        dict: Results keyed by format, then "cold"/"warm", plus peak RSS in MB
+    """
+    assets = load_slots_assets()
+    items = assets.reel_size[1] // SYMBOL_SIZE
+    stops = seeded_stops(spins, seed, items)
+
+    results = {}
+    for fmt in formats:
+        cold, warm = [], []
+        for _ in range(repeat):
+            renderer = SlotsRenderer(assets)
+            cold.append(run_pass(renderer, fmt, stops))
+            warm.append(run_pass(renderer, fmt, stops))
+        results[fmt] = {"cold": summarize(cold), "warm": summarize(warm)}
+    # ru_maxrss is in kilobytes on Linux
+    results["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return results
+
+
+def read_still_grid(assets, still, windows, symbols):
+    """
+    Read the symbols a still image shows in each window from its pixels.
+
+    Sampled rows of each window are looked up in the first len(symbols)
+    positions of the reel strip, which repeats after that. Rows found in more
+    than one symbol, such as plain background, are skipped, and each window
+    reads as the symbol most of its other rows belong to.
+
+    Args:
+        assets (SlotsAssets): Decoded slot machine assets
+        still (io.BytesIO): PNG from SlotsRenderer.render_still
+        windows (list): Per reel window rows, from window_rows()
+        symbols (tuple): Symbol keys in reel strip order
+
+    Returns:
+        list: Rows of symbol keys, top to bottom, None for an empty window
+    """
+    frame = np.asarray(Image.open(still))
+    mask = assets.facade_mask()
+    strip = assets.reel_array()[:len(symbols) * SYMBOL_SIZE]
+    width = assets.reel_size[0]
+    columns = []
+    for reel_index, reel_windows in enumerate(windows):
+        columns_slice = slice(REEL_X + width * reel_index, REEL_X + width * (reel_index + 1))
+        cells = []
+        for start, end in reel_windows:
+            votes = Counter()
+            for y in range(start, end, GRID_SAMPLE_STEP):
+                visible = ~mask[y, columns_slice]
+                row = frame[y, columns_slice][visible]
+                found = set(np.flatnonzero((strip[:, visible] == row).all(axis=1)) // SYMBOL_SIZE)
+                if len(found) == 1:
+                    votes[found.pop()] += 1
+            cells.append(symbols[votes.most_common(1)[0][0]] if votes else None)
+        columns.append(cells)
+    return [list(row) for row in zip(*columns)]
+
+
+def check_grid(assets, stops):
+    """
+    Compare the text grid of each spin with what its still image shows.
+
+    Returns:
+        list: (stops, grid, still grid) for every spin where they differ
+    """
+    renderer = SlotsRenderer(assets)
+    windows = window_rows(assets)
+    items = assets.reel_size[1] // SYMBOL_SIZE
+    symbols = get_paytable().symbols
+    mismatches = []
+    for stop in stops:
+        grid = visible_grid(windows, stop, items, symbols)
+        shown = read_still_grid(assets, renderer.render_still(*stop), windows, symbols)
+        if grid != shown:
+            mismatches.append((stop, grid, shown))
+    return mismatches
+
+
+def flatten(results, prefix=""):
+    """Flatten nested results into {"gif.warm.total_ms.p95": value} form."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+
+def tolerance_for(metric, time_tolerance=TIME_TOLERANCE):
+    """Get the allowed relative increase for a flattened metric name."""
+    if metric.endswith("bytes"):
+        return BYTES_TOLERANCE
+    if metric == "peak_rss_mb":
+        return RSS_TOLERANCE
+    if metric.endswith(("p95", "p99")):
+        return 2 * time_tolerance
+    return time_tolerance
+
+
+def compare(results, baseline, time_tolerance):
+    """
+    Compare results with a baseline.
+
+    Args:
+        results (dict): Output of run_suite
+        baseline (dict): Stored baseline results
+        time_tolerance (float): Allowed relative increase for timings
+
+    Returns:
+        list: (metric, baseline value, current value, tolerance) for every regression
+    """
+    current = flatten(results)
+    regressions = []
+    for metric, expected in flatten(baseline).items():
+        if metric not in current:
+            continue
+        tolerance = tolerance_for(metric, time_tolerance)
+        if current[metric] > expected * (1 + tolerance):
+            regressions.append((metric, expected, current[metric], tolerance))
+    return regressions
+
+
+def format_results(results):
+    """Format suite results as a text table."""
+    lines = [f"{'format':<14}{'pass':<6}{'metric':<11}{'p50':>9}{'p95':>9}{'p99':>9}"]
+    for fmt, passes in results.items():
+        if fmt == "peak_rss_mb":
+            continue
+        for name, summary in passes.items():
+            for metric in ("build_ms", "encode_ms", "total_ms"):
+                cuts = summary[metric]
+                lines.append(
+                    f"{fmt:<14}{name:<6}{metric:<11}{cuts['p50']:>9.1f}{cuts['p95']:>9.1f}{cuts['p99']:>9.1f}"
+                )
+            lines.append(f"{fmt:<14}{name:<6}{'bytes':<11}{summary['bytes'] / 1024:>9.1f} KB")
+    lines.append(f"peak RSS {results['peak_rss_mb']:.1f} MB")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--spins", type=int, default=50, help="Number of seeded spins per pass")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the reel stops")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeats per pass, keeping the fastest time per spin")
+    parser.add_argument("--formats", default="gif", help=f"Comma-separated formats ({', '.join(ANIMATION_FORMATS)})")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE,
+                        help="Allowed relative slowdown before failing")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    args = parser.parse_args()
+
+    assets = load_slots_assets()
+    stops = seeded_stops(args.spins, args.seed, assets.reel_size[1] // SYMBOL_SIZE)
+    mismatches = check_grid(assets, stops)
+    for stop, grid, shown in mismatches:
+        print(f"Grid for stops {stop} is {grid}, the still shows {shown}")
+    if mismatches:
+        return 1
+    print(f"Text grid matches the still for all {len(stops)} spins")
+
+    formats = args.formats.split(",")
+    results = run_suite(args.spins, args.seed, formats, args.repeat)
+    print(format_results(results))
+
+    config = {
+        "spins": args.spins,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "formats": formats,
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+    }
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"config": config, "results": results}, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    stored = baseline["config"]
+    if (stored["spins"], stored["seed"]) != (args.spins, args.seed):
+        print(f"Baseline was recorded with --spins {stored['spins']} --seed {stored['seed']}, not comparable")
+        return 2
+
+    regressions = compare(results, baseline["results"], args.time_tolerance)
+    if not regressions:
+        print("No regressions against the baseline")
+        return 0
+
+    print("Regressions against the baseline:")
+    for metric, expected, current, tolerance in regressions:
+        print(f"  {metric}: {expected:.1f} -> {current:.1f} (allowed +{tolerance:.0%})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
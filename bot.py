@@ -2,9 +2,79 @@ import os
 import discord
 from discord.ext import commands
 import logging
+from utils.mention_router import route as route_mention
 
 logger = logging.getLogger(__name__)
 
+
+async def slots_mention(bot, message, command):
+    """Run slots for a mention command."""
+    try:
+        # Get the gambling cog and run the slots command
+        cog = bot.get_cog("Gambling")
+        if cog:
+            logger.info(f"Executing slots command with bet: {command.bet}")
+            await cog.slots_command(message, command.bet)
+    except Exception as e:
+        logger.error(f"Error processing slots command: {e}")
+
+
+async def coinflip_mention(bot, message, command):
+    """Flip a coin for a mention command."""
+    from utils.currency import format_currency, validate_bet
+    from utils.db_service import get_user_balance, update_user_balance
+    from utils.rng import new_round
+    
+    try:
+        user_id = str(message.author.id)
+        username = message.author.name
+        
+        # Parse bet and validate
+        balance = get_user_balance(user_id)
+        try:
+            bet_amount = validate_bet(command.bet, balance)
+        except ValueError as e:
+            await message.channel.send(str(e))
+            return
+        
+        # Deduct bet
+        rng = new_round()
+        update_user_balance(user_id, username, -bet_amount, "coinflip", "Bet placed", rng)
+        
+        # Flip the coin
+        result = rng.choice(["heads", "tails"])
+        result_emoji = "🟡" if result == "heads" else "⚪"
+        
+        # Determine win/loss
+        win = command.choice == result
+        if win:
+            winnings = bet_amount  # 1x profit
+            update_user_balance(user_id, username, bet_amount * 2, "coinflip", f"Win: {result}", rng)
+            await message.channel.send(f"🪙 The coin landed on **{result.upper()}** {result_emoji}! You won {format_currency(winnings)}! New balance: {format_currency(get_user_balance(user_id))}")
+        else:
+            await message.channel.send(f"🪙 The coin landed on **{result.upper()}** {result_emoji}! You lost {format_currency(bet_amount)}. New balance: {format_currency(get_user_balance(user_id))}")
+    except Exception as e:
+        logger.error(f"Error processing coinflip command: {e}")
+        await message.channel.send("Error processing coinflip command. Try using the slash command `/coinflip` instead.")
+
+
+async def blackjack_mention(bot, message, command):
+    """Point a blackjack mention command at the slash command."""
+    try:
+        # Redirect to the slash command for blackjack
+        await message.channel.send(f"Starting a blackjack game with bet: {command.bet}. Use the slash command `/blackjack {command.bet}` for a better experience with buttons!")
+    except Exception as e:
+        logger.error(f"Error processing blackjack command: {e}")
+        await message.channel.send("Error processing blackjack command. Try using the slash command `/blackjack` instead.")
+
+
+# Mention command name -> handler
+MENTION_HANDLERS = {
+    "slots": slots_mention,
+    "coinflip": coinflip_mention,
+    "blackjack": blackjack_mention,
+}
+
 def setup_bot():
     """
     Set up the Discord bot with necessary configurations and load all cogs.
@@ -59,116 +129,9 @@ def setup_bot():
             
         # Check for mention commands (alternatives to slash commands)
         if bot.user.mentioned_in(message) and not message.mention_everyone:
-            content = message.content.lower()
-            
-            # Check for slots commands
-            slots_keywords = ["slots", "sl", "slot"]
-            # Check if any of the slots keywords are in the content
-            if any(keyword in content for keyword in slots_keywords):
-                # Extract bet amount
-                parts = content.split()
-                bet = "1"  # Default bet amount
-                try:
-                    # Find the slots keyword in the message
-                    for i, part in enumerate(parts):
-                        if part.lower() in slots_keywords:
-                            # Look for bet amount after the command
-                            if i + 1 < len(parts):
-                                bet = parts[i + 1]
-                            break
-                    
-                    # Get the gambling cog and run the slots command
-                    cog = bot.get_cog("Gambling")
-                    if cog:
-                        # For debugging
-                        logger.info(f"Executing slots command with bet: {bet}")
-                        await cog.slots_command(message, bet)
-                except Exception as e:
-                    logger.error(f"Error processing slots command: {e}")
-                return
-                
-            # Check for coinflip commands
-            coinflip_keywords = ["coinflip", "coin", "flip"]
-            if any(keyword in content for keyword in coinflip_keywords):
-                parts = content.split()
-                try:
-                    bet_str = "1"  # Default bet
-                    choice = "heads"  # Default choice
-                    
-                    for i, part in enumerate(parts):
-                        if part.lower() in coinflip_keywords:
-                            # Look for choice and bet amount after the command
-                            for j in range(i + 1, min(len(parts), i + 4)):
-                                if parts[j].lower() in ["heads", "head", "h"]:
-                                    choice = "heads"
-                                elif parts[j].lower() in ["tails", "tail", "t"]:
-                                    choice = "tails"
-                                elif parts[j].isdigit() or parts[j].lower() in ["all", "max"]:
-                                    bet_str = parts[j]
-                            
-                            # Call the coinflip method
-                            import random
-                            from utils.currency import parse_bet, format_currency
-                            from utils.db_service import get_user_balance, update_user_balance
-                            
-                            user_id = str(message.author.id)
-                            username = message.author.name
-                            
-                            # Parse bet and validate
-                            balance = get_user_balance(user_id)
-                            try:
-                                bet_amount = parse_bet(bet_str, balance)
-                            except ValueError as e:
-                                await message.channel.send(f"Error: {str(e)}")
-                                break
-                            
-                            if bet_amount <= 0:
-                                await message.channel.send("Bet amount must be greater than 0.")
-                                break
-                            
-                            if bet_amount > balance:
-                                await message.channel.send(f"You don't have enough funds! Your balance is {format_currency(balance)}.")
-                                break
-                            
-                            # Deduct bet
-                            update_user_balance(user_id, username, -bet_amount, "coinflip", "Bet placed")
-                            
-                            # Flip the coin
-                            result = random.choice(["heads", "tails"])
-                            result_emoji = "🟡" if result == "heads" else "⚪"
-                            
-                            # Determine win/loss
-                            win = choice == result
-                            if win:
-                                winnings = bet_amount  # 1x profit
-                                update_user_balance(user_id, username, bet_amount * 2, "coinflip", f"Win: {result}")
-                                await message.channel.send(f"🪙 The coin landed on **{result.upper()}** {result_emoji}! You won {format_currency(winnings)}! New balance: {format_currency(get_user_balance(user_id))}")
-                            else:
-                                await message.channel.send(f"🪙 The coin landed on **{result.upper()}** {result_emoji}! You lost {format_currency(bet_amount)}. New balance: {format_currency(get_user_balance(user_id))}")
-                            
-                            break
-                except Exception as e:
-                    logger.error(f"Error processing coinflip command: {e}")
-                    await message.channel.send("Error processing coinflip command. Try using the slash command `/coinflip` instead.")
-                return
-                
-            # Check for blackjack commands
-            blackjack_keywords = ["blackjack", "bj", "21"]
-            if any(keyword in content for keyword in blackjack_keywords):
-                parts = content.split()
-                try:
-                    bet_str = "1"  # Default bet
-                    
-                    for i, part in enumerate(parts):
-                        if part.lower() in blackjack_keywords and i + 1 < len(parts):
-                            bet_str = parts[i + 1]
-                            
-                            # Redirect to the slash command for blackjack
-                            await message.channel.send(f"Starting a blackjack game with bet: {bet_str}. Use the slash command `/blackjack {bet_str}` for a better experience with buttons!")
-                            break
-                except Exception as e:
-                    logger.error(f"Error processing blackjack command: {e}")
-                    await message.channel.send("Error processing blackjack command. Try using the slash command `/blackjack` instead.")
+            command = route_mention(message.content)
+            if command:
+                await MENTION_HANDLERS[command.name](bot, message, command)
                 return
         
         # Process regular commands
@@ -1,3 +1,5 @@
+import asyncio
+import functools
 import os
 import random
 import bisect
@@ -5,39 +7,131 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import logging
-from PIL import Image
-import tempfile
 
-from utils.currency import parse_bet, format_currency
-from utils.image_generator import generate_slots_assets
-from utils.slots import PAYOUTS, SYMBOLS
+from utils import metrics
+from utils.currency import format_currency, validate_bet
+from utils.db_service import get_guild_settings, set_guild_slots_format
+from utils.image_generator import SYMBOL_SIZE, generate_slots_assets, load_slots_assets
+from utils.paytable import get_paytable
+from utils.rng import new_round
+from utils.slots import SYMBOLS, format_visual_result
+from utils.render_cache import RENDER_CACHE_BYTES, RenderDiskCache
+from utils.slots_analysis import outcome_frequencies, stop_frequencies
+from utils.slots_render import (
+    ANIMATION_FORMATS, DEFAULT_ANIMATION_FORMAT, RenderPool, RenderRejected, render_digest, visible_grid,
+    window_rows
+)
 
 logger = logging.getLogger(__name__)
 
+# Send the result as soon as the spin is settled and attach the animation later
+DEFERRED_ANIMATION = os.environ.get("SLOTS_DEFERRED_ANIMATION", "1") != "0"
+# Most frequent outcomes to pre-render into the disk cache when idle (0 disables)
+RENDER_PRERENDER = int(os.environ.get("RENDER_PRERENDER", 0))
+
 class AnimatedSlots(commands.Cog):
     """Cog for handling animated slots functionality."""
     
     def __init__(self, bot):
         self.bot = bot
         self.assets = generate_slots_assets()
+        # Decode the reel and facade once; spins only read these buffers
+        self.decoded_assets = load_slots_assets(self.assets)
+        # Rows each reel shows through the facade, for the text grid
+        self.reel_windows = window_rows(self.decoded_assets)
+        # Render in worker processes that pre-crop the most frequent reel stops
+        items = self.decoded_assets.reel_size[1] // SYMBOL_SIZE
+        # Keep encoded animations on disk, keyed by outcome, assets and format
+        disk_cache = None
+        if RENDER_CACHE_BYTES:
+            disk_cache = RenderDiskCache(render_digest(self.decoded_assets))
+        self.render_pool = RenderPool(
+            self.decoded_assets,
+            prewarm_stops=stop_frequencies(get_paytable(), items),
+            disk_cache=disk_cache
+        )
+        self.prerender_task = None
+        
+        # Output format per guild ID, None for the default, loaded on first use
+        self.guild_formats = {}
+        # Background renders for already sent results
+        self.upload_tasks = set()
         
         # Import Gambling cog for currency management
         self.gambling_cog = None
     
+    async def cog_load(self):
+        """Start pre-rendering the most frequent outcomes, if enabled."""
+        if RENDER_PRERENDER and self.render_pool.disk_cache is not None:
+            self.prerender_task = asyncio.create_task(self.prerender())
+    
+    async def prerender(self):
+        """Render the most frequent outcomes into the disk cache while the pool is idle."""
+        items = self.decoded_assets.reel_size[1] // SYMBOL_SIZE
+        outcomes = outcome_frequencies(get_paytable(), items, RENDER_PRERENDER)
+        try:
+            rendered = await self.render_pool.prerender([stops for stops, _ in outcomes])
+            logger.info(f"Pre-rendered {rendered} animated slots outcomes")
+        except Exception as e:
+            logger.error(f"Error pre-rendering animated slots outcomes: {e}")
+    
+    async def cog_unload(self):
+        """Stop the render workers and pending uploads when the cog is unloaded."""
+        if self.prerender_task is not None:
+            self.prerender_task.cancel()
+        for task in self.upload_tasks:
+            task.cancel()
+        self.render_pool.shutdown()
+    
     @commands.Cog.listener()
     async def on_ready(self):
         """On ready, get reference to Gambling cog."""
         self.gambling_cog = self.bot.get_cog("Gambling")
     
+    def get_animation_format(self, guild_id):
+        """
+        Get the animation output format for a guild.
+        
+        Args:
+            guild_id (int): Discord guild ID, or None outside a guild
+            
+        Returns:
+            str: Key of ANIMATION_FORMATS
+        """
+        if guild_id is None:
+            return DEFAULT_ANIMATION_FORMAT
+        
+        if guild_id not in self.guild_formats:
+            settings = get_guild_settings(str(guild_id))
+            fmt = settings.slots_format if settings else None
+            self.guild_formats[guild_id] = fmt if fmt in ANIMATION_FORMATS else None
+        
+        return self.guild_formats[guild_id] or DEFAULT_ANIMATION_FORMAT
+    
     def get_symbol_index(self, position):
         """Get the symbol at a given position on the reel."""
         symbol_index = position % 9  # 9 different symbols
-        # Convert to 0-based index in PAYOUTS keys
+        # Convert to 0-based index in paytable symbol order
         return symbol_index
     
-    def get_symbol_from_index(self, index):
+    def get_visible_grid(self, s1, s2, s3, table=None):
+        """
+        Get the 3x3 grid of symbol keys visible when the reels stop.
+        
+        Args:
+            s1, s2, s3 (int): Reel stop positions
+            table (Paytable, optional): Paytable snapshot with the reel symbol order
+            
+        Returns:
+            list: Rows of symbol keys, top to bottom, for format_visual_result;
+                None where a window shows the end of the reel strip
+        """
+        items = self.decoded_assets.reel_size[1] // SYMBOL_SIZE
+        return visible_grid(self.reel_windows, (s1, s2, s3), items, (table or get_paytable()).symbols)
+    
+    def get_symbol_from_index(self, index, table=None):
         """Get the symbol string from its index."""
-        symbols = list(PAYOUTS.keys())
+        symbols = (table or get_paytable()).symbols
         if index is not None and 0 <= index < len(symbols):
             symbol_key = symbols[index]
             return SYMBOLS[symbol_key]["emoji"]  # Return emoji for display
@@ -45,22 +139,56 @@ class AnimatedSlots(commands.Cog):
             # Return default symbol if index is invalid
             return SYMBOLS["CHERRY"]["emoji"]
     
-    def get_symbol_key_from_index(self, index):
+    def get_symbol_key_from_index(self, index, table=None):
         """Get the symbol key from its index."""
-        symbols = list(PAYOUTS.keys())
+        symbols = (table or get_paytable()).symbols
         if index is not None and 0 <= index < len(symbols):
             return symbols[index]
         else:
             # Return default symbol if index is invalid
             return "CHERRY"
     
-    def calculate_win(self, s1, s2, s3):
+    def pick_stops(self, items, table=None, rng=None):
+        """
+        Pick the stop position of each reel, sometimes forcing a win.
+        
+        Args:
+            items (int): Number of symbol positions on the reel strip
+            table (Paytable, optional): Paytable snapshot with the forced-win settings
+            rng (random.Random, optional): Round RNG, defaults to the global one
+            
+        Returns:
+            tuple: (s1, s2, s3) reel stop positions
+        """
+        table = table or get_paytable()
+        rng = rng or random
+        
+        # Generate random positions for each reel
+        s1 = rng.randint(1, items-1)
+        s2 = rng.randint(1, items-1)
+        s3 = rng.randint(1, items-1)
+        
+        # Force a win sometimes
+        if rng.random() < table.win_rate:
+            x = round(rng.random()*100, 1)
+            pos = bisect.bisect(table.forced_win_weights, x)
+            s1 = pos + (rng.randint(1, (items//6)-1) * 6)
+            s2 = pos + (rng.randint(1, (items//6)-1) * 6)
+            s3 = pos + (rng.randint(1, (items//6)-1) * 6)
+            # Ensure no reel hits the last symbol
+            s1 = s1 - 6 if s1 >= items else s1
+            s2 = s2 - 6 if s2 >= items else s2
+            s3 = s3 - 6 if s3 >= items else s3
+        
+        return s1, s2, s3
+    
+    def calculate_win(self, s1, s2, s3, table=None):
         """Calculate win based on symbol indices."""
-        # Convert indices to actual symbol keys
-        symbols = list(PAYOUTS.keys())
-        sym1 = symbols[s1 % 9]
-        sym2 = symbols[s2 % 9]
-        sym3 = symbols[s3 % 9]
+        table = table or get_paytable()
+        
+        # Look up the precompiled line payout for the three symbols
+        n = len(table.symbols)
+        multiplier, symbol_idx, count = table.line_table[table.line_key(s1 % n, s2 % n, s3 % n)]
         
         result = {
             "win": False,
@@ -70,119 +198,38 @@ class AnimatedSlots(commands.Cog):
             "multiplier": 0
         }
         
-        # Check for 3 matching symbols
-        if sym1 == sym2 == sym3:
-            if sym1 in PAYOUTS and 3 in PAYOUTS[sym1]:
-                result["win"] = True
-                result["symbol"] = sym1
-                result["count"] = 3
-                result["multiplier"] = PAYOUTS[sym1][3]
-        
-        # Check for 2 matching symbols
-        elif sym1 == sym2 or sym1 == sym3 or sym2 == sym3:
-            matching_symbol = None
-            if sym1 == sym2:
-                matching_symbol = sym1
-            elif sym1 == sym3:
-                matching_symbol = sym1
-            elif sym2 == sym3:
-                matching_symbol = sym2
-                
-            if matching_symbol is not None and matching_symbol in PAYOUTS and 2 in PAYOUTS[matching_symbol]:
-                result["win"] = True
-                result["symbol"] = matching_symbol
-                result["count"] = 2
-                result["multiplier"] = PAYOUTS[matching_symbol][2]
+        if multiplier > 0:
+            result["win"] = True
+            result["symbol"] = table.symbols[symbol_idx]
+            result["count"] = count
+            result["multiplier"] = multiplier
         
         return result
     
-    @app_commands.command(
-        name="animated_slots",
-        description="Try your luck with animated slots!"
-    )
-    @app_commands.describe(bet="The amount to bet. Use `m` for max and `a` for all in")
-    async def animated_slots(self, interaction: discord.Interaction, bet: str):
-        """Animated slot machine command with slash command support."""
-        await interaction.response.defer()
-        
-        if not self.gambling_cog:
-            await interaction.followup.send("Error: Currency system not available")
-            return
+    async def play_spin(self, user, guild_id, bet_amount, send):
+        """
+        Play a validated bet and send the result.
         
-        user_id = str(interaction.user.id)
-        
-        # Get user balance and parse bet
-        balance = self.gambling_cog.get_balance(user_id)
+        Args:
+            user (discord.abc.User): Player
+            guild_id (int): Discord guild ID, or None outside a guild
+            bet_amount (int): Bet, already checked against the balance
+            send (coroutine function): Sends a message with the given kwargs and returns it
+        """
+        user_id = str(user.id)
         
-        try:
-            bet_amount = parse_bet(bet, balance)
-        except ValueError as e:
-            await interaction.followup.send(f"Error: {str(e)}")
-            return
-        
-        # Check if bet is valid
-        if bet_amount <= 0:
-            await interaction.followup.send("Bet amount must be greater than 0.")
-            return
-        
-        if bet_amount > balance:
-            await interaction.followup.send(f"You don't have enough funds! Your balance is {format_currency(balance)}.")
-            return
-        
-        # Update balance (deduct bet)
-        self.gambling_cog.update_balance(user_id, -bet_amount, "animated_slots", "Bet placed")
+        # Use one paytable snapshot for the whole spin and record it with the bet
+        table = get_paytable()
+        rng = new_round(table)
+        self.gambling_cog.update_balance(user_id, -bet_amount, "animated_slots", "Bet placed", rng)
         
         # Run slots animation
         try:
-            # Load assets
-            reel = Image.open(self.assets["reel"]).convert('RGBA')
-            facade = Image.open(self.assets["facade"]).convert('RGBA')
-            
-            rw, rh = reel.size
-            item = 180  # Symbol height
-            items = rh // item
+            # Number of symbol positions on the reel strip
+            items = self.decoded_assets.reel_size[1] // SYMBOL_SIZE
             
-            # Generate random positions for each reel
-            s1 = random.randint(1, items-1)
-            s2 = random.randint(1, items-1)
-            s3 = random.randint(1, items-1)
-            
-            # Force a win sometimes (12% chance)
-            win_rate = 12/100
-            if random.random() < win_rate:
-                symbols_weights = [3.5, 7, 15, 25, 55]  # Weights for symbols
-                x = round(random.random()*100, 1)
-                pos = bisect.bisect(symbols_weights, x)
-                s1 = pos + (random.randint(1, (items//6)-1) * 6)
-                s2 = pos + (random.randint(1, (items//6)-1) * 6)
-                s3 = pos + (random.randint(1, (items//6)-1) * 6)
-                # Ensure no reel hits the last symbol
-                s1 = s1 - 6 if s1 >= items else s1
-                s2 = s2 - 6 if s2 >= items else s2
-                s3 = s3 - 6 if s3 >= items else s3
-            
-            # Create animation frames
-            images = []
-            speed = 6
-            for i in range(1, (item//speed)+1):
-                bg = Image.new('RGBA', facade.size, color=(40, 40, 40, 255))
-                bg.paste(reel, (25 + rw*0, 100-(speed * i * s1)))
-                bg.paste(reel, (25 + rw*1, 100-(speed * i * s2)))
-                bg.paste(reel, (25 + rw*2, 100-(speed * i * s3)))
-                bg.alpha_composite(facade)
-                images.append(bg)
-            
-            # Save as GIF
-            with tempfile.NamedTemporaryFile(suffix='.gif', delete=False) as temp:
-                fp = temp.name
-            
-            images[0].save(
-                fp,
-                save_all=True,
-                append_images=images[1:],
-                duration=50,  # Duration of each frame in ms
-                loop=0        # Loop forever
-            )
+            # Pick reel stops
+            s1, s2, s3 = self.pick_stops(items, table, rng)
             
             # Calculate symbol indices in the middle row
             sym1_idx = self.get_symbol_index(s1)
@@ -190,13 +237,13 @@ class AnimatedSlots(commands.Cog):
             sym3_idx = self.get_symbol_index(s3)
             
             # Get actual symbols
-            sym1 = self.get_symbol_from_index(sym1_idx)
-            sym2 = self.get_symbol_from_index(sym2_idx)
-            sym3 = self.get_symbol_from_index(sym3_idx)
+            sym1 = self.get_symbol_from_index(sym1_idx, table)
+            sym2 = self.get_symbol_from_index(sym2_idx, table)
+            sym3 = self.get_symbol_from_index(sym3_idx, table)
             middle_row = f"{sym1} {sym2} {sym3}"
             
             # Calculate win
-            win_result = self.calculate_win(sym1_idx, sym2_idx, sym3_idx)
+            win_result = self.calculate_win(sym1_idx, sym2_idx, sym3_idx, table)
             
             # Process results
             if win_result["win"]:
@@ -206,7 +253,7 @@ class AnimatedSlots(commands.Cog):
                 symbol_name = SYMBOLS[symbol_key]["name"]
                 symbol_emoji = SYMBOLS[symbol_key]["emoji"]
                 win_details = f"{win_result['count']}x {symbol_name} {symbol_emoji} ({win_result['multiplier']}x)"
-                self.gambling_cog.update_balance(user_id, winnings, "animated_slots", f"Win: {win_details}")
+                self.gambling_cog.update_balance(user_id, winnings, "animated_slots", f"Win: {win_details}", rng)
                 result = ('won', winnings)
             else:
                 result = ('lost', bet_amount)
@@ -229,7 +276,7 @@ class AnimatedSlots(commands.Cog):
                 color=color
             )
             
-            embed.set_author(name=f"{interaction.user.name}'s Slot Machine", icon_url=interaction.user.display_avatar.url)
+            embed.set_author(name=f"{user.name}'s Slot Machine", icon_url=user.display_avatar.url)
             embed.add_field(name="Bet", value=format_currency(bet_amount), inline=True)
             
             # Add win details if available
@@ -239,21 +286,114 @@ class AnimatedSlots(commands.Cog):
             embed.add_field(name="Balance", value=format_currency(new_balance), inline=True)
             embed.set_footer(text="Piglet Casino | Try your luck again with /animated_slots!")
             
-            # Send the GIF and embed
-            file = discord.File(fp, filename="slots.gif")
-            embed.set_image(url=f"attachment://slots.gif")
+            fmt = self.get_animation_format(guild_id)
             
-            await interaction.followup.send(file=file, embed=embed)
+            grid = self.get_visible_grid(s1, s2, s3, table)
             
-            # Clean up temp file
-            try:
-                os.unlink(fp)
-            except:
-                pass
+            if DEFERRED_ANIMATION:
+                # Show the settled result now and attach the animation when it's ready
+                message = await send(embed=embed)
+                task = asyncio.create_task(self.attach_animation(message, embed, (s1, s2, s3), grid, fmt, user_id))
+                self.upload_tasks.add(task)
+                task.add_done_callback(self.upload_tasks.discard)
+                return
+            
+            # Send the animation and embed
+            file = await self.render_attachment((s1, s2, s3), grid, embed, fmt, user_id)
+            
+            if file:
+                await send(file=file, embed=embed)
+            else:
+                await send(embed=embed)
                 
         except Exception as e:
             logger.error(f"Error in animated slots: {e}")
-            await interaction.followup.send(f"An error occurred: {e}")
+            await send(content=f"An error occurred: {e}")
+    
+    async def render_attachment(self, stops, grid, embed, fmt, user_id):
+        """
+        Render a spin for the result embed, degrading under load.
+        
+        Falls back to a still of the final frame when the render scheduler
+        rejects the animation, and to the text grid on the embed when stills
+        are busy too.
+        
+        Args:
+            stops (tuple): (s1, s2, s3) reel stop positions
+            grid (list): Visible symbol keys, for the text fallback
+            embed (discord.Embed): Result embed, pointed at the attachment
+            fmt (str): Key of ANIMATION_FORMATS
+            user_id (str): Player the render is for
+            
+        Returns:
+            discord.File: Attachment named slots.<extension>, or None for the text fallback
+        """
+        try:
+            # Render the animation in the worker pool, straight into memory
+            animation = await self.render_pool.render_animation(*stops, fmt, user_id=user_id)
+            file = discord.File(animation, filename=f"slots.{ANIMATION_FORMATS[fmt]['extension']}")
+        except RenderRejected as e:
+            try:
+                file = discord.File(await self.render_pool.render_still(*stops), filename="slots.png")
+                metrics.increment("render.fallback.still")
+            except RenderRejected:
+                embed.add_field(name="Reels", value=format_visual_result(grid), inline=False)
+                metrics.increment("render.fallback.text")
+                return None
+            logger.info(f"Sent a still animated slots result ({e.reason})")
+        
+        embed.set_image(url=f"attachment://{file.filename}")
+        return file
+    
+    async def attach_animation(self, message, embed, stops, grid, fmt, user_id):
+        """
+        Render a spin in the background and add it to an already sent result.
+        
+        Args:
+            message (discord.Message): Result message to edit
+            embed (discord.Embed): Result embed shown on the message
+            stops (tuple): (s1, s2, s3) reel stop positions
+            grid (list): Visible symbol keys, for the text fallback
+            fmt (str): Key of ANIMATION_FORMATS
+            user_id (str): Player the render is for
+        """
+        try:
+            file = await self.render_attachment(stops, grid, embed, fmt, user_id)
+            if file:
+                await message.edit(embed=embed, attachments=[file])
+            else:
+                await message.edit(embed=embed)
+        except Exception as e:
+            # The result is already settled and shown, only the animation is lost
+            logger.error(f"Error attaching animated slots render: {e}")
+    
+    @app_commands.command(
+        name="animated_slots",
+        description="Try your luck with animated slots!"
+    )
+    @app_commands.describe(bet="The amount to bet. Use `m` for max and `a` for all in")
+    async def animated_slots(self, interaction: discord.Interaction, bet: str):
+        """Animated slot machine command with slash command support."""
+        await interaction.response.defer()
+        
+        if not self.gambling_cog:
+            await interaction.followup.send("Error: Currency system not available")
+            return
+        
+        user_id = str(interaction.user.id)
+        
+        # Get user balance and parse bet
+        balance = self.gambling_cog.get_balance(user_id)
+        
+        try:
+            bet_amount = validate_bet(bet, balance)
+        except ValueError as e:
+            await interaction.followup.send(str(e))
+            return
+        
+        # wait=True returns the message so a deferred animation can be attached to it
+        send = functools.partial(interaction.followup.send, wait=True)
+        await self.play_spin(interaction.user, interaction.guild_id, bet_amount, send)
     
     @commands.command(name="animated_slots", aliases=["aslots", "asl"])
     async def animated_slots_command(self, ctx, bet_str: str = "1"):
@@ -268,145 +408,41 @@ class AnimatedSlots(commands.Cog):
         balance = self.gambling_cog.get_balance(user_id)
         
         try:
-            bet_amount = parse_bet(bet_str, balance)
+            bet_amount = validate_bet(bet_str, balance)
         except ValueError as e:
-            await ctx.reply(f"Error: {str(e)}")
+            await ctx.reply(str(e))
             return
         
-        # Check if bet is valid
-        if bet_amount <= 0:
-            await ctx.reply("Bet amount must be greater than 0.")
-            return
+        await self.play_spin(ctx.author, ctx.guild.id if ctx.guild else None, bet_amount, ctx.reply)
+    
+    @app_commands.command(
+        name="slots_format",
+        description="Choose the animation format for /animated_slots in this server"
+    )
+    @app_commands.describe(format="Animation format, leave empty to show the current one")
+    @app_commands.choices(format=[
+        app_commands.Choice(name="Default", value="default"),
+        *(app_commands.Choice(name=info["label"], value=key) for key, info in ANIMATION_FORMATS.items())
+    ])
+    @app_commands.guild_only()
+    @app_commands.default_permissions(manage_guild=True)
+    async def slots_format(self, interaction: discord.Interaction, format: str = None):
+        """Set or show the animated slots output format for the server."""
+        guild_id = interaction.guild_id
         
-        if bet_amount > balance:
-            await ctx.reply(f"You don't have enough funds! Your balance is {format_currency(balance)}.")
+        if format is None:
+            current = self.get_animation_format(guild_id)
+            await interaction.response.send_message(
+                f"Animated slots use {ANIMATION_FORMATS[current]['label']} in this server.", ephemeral=True
+            )
             return
         
-        # Update balance (deduct bet)
-        self.gambling_cog.update_balance(user_id, -bet_amount, "animated_slots", "Bet placed")
+        slots_format = None if format == "default" else format
+        set_guild_slots_format(str(guild_id), slots_format)
+        self.guild_formats[guild_id] = slots_format
         
-        # Run slots animation
-        try:
-            # Load assets
-            reel = Image.open(self.assets["reel"]).convert('RGBA')
-            facade = Image.open(self.assets["facade"]).convert('RGBA')
-            
-            rw, rh = reel.size
-            item = 180  # Symbol height
-            items = rh // item
-            
-            # Generate random positions for each reel
-            s1 = random.randint(1, items-1)
-            s2 = random.randint(1, items-1)
-            s3 = random.randint(1, items-1)
-            
-            # Force a win sometimes (12% chance)
-            win_rate = 12/100
-            if random.random() < win_rate:
-                symbols_weights = [3.5, 7, 15, 25, 55]  # Weights for symbols
-                x = round(random.random()*100, 1)
-                pos = bisect.bisect(symbols_weights, x)
-                s1 = pos + (random.randint(1, (items//6)-1) * 6)
-                s2 = pos + (random.randint(1, (items//6)-1) * 6)
-                s3 = pos + (random.randint(1, (items//6)-1) * 6)
-                # Ensure no reel hits the last symbol
-                s1 = s1 - 6 if s1 >= items else s1
-                s2 = s2 - 6 if s2 >= items else s2
-                s3 = s3 - 6 if s3 >= items else s3
-            
-            # Create animation frames
-            images = []
-            speed = 6
-            for i in range(1, (item//speed)+1):
-                bg = Image.new('RGBA', facade.size, color=(40, 40, 40, 255))
-                bg.paste(reel, (25 + rw*0, 100-(speed * i * s1)))
-                bg.paste(reel, (25 + rw*1, 100-(speed * i * s2)))
-                bg.paste(reel, (25 + rw*2, 100-(speed * i * s3)))
-                bg.alpha_composite(facade)
-                images.append(bg)
-            
-            # Save as GIF
-            with tempfile.NamedTemporaryFile(suffix='.gif', delete=False) as temp:
-                fp = temp.name
-            
-            images[0].save(
-                fp,
-                save_all=True,
-                append_images=images[1:],
-                duration=50,  # Duration of each frame in ms
-                loop=0        # Loop forever
-            )
-            
-            # Calculate symbol indices in the middle row
-            sym1_idx = self.get_symbol_index(s1)
-            sym2_idx = self.get_symbol_index(s2)
-            sym3_idx = self.get_symbol_index(s3)
-            
-            # Get actual symbols
-            sym1 = self.get_symbol_from_index(sym1_idx)
-            sym2 = self.get_symbol_from_index(sym2_idx)
-            sym3 = self.get_symbol_from_index(sym3_idx)
-            middle_row = f"{sym1} {sym2} {sym3}"
-            
-            # Calculate win
-            win_result = self.calculate_win(sym1_idx, sym2_idx, sym3_idx)
-            
-            # Process results
-            if win_result["win"]:
-                winnings = int(bet_amount * win_result["multiplier"])
-                # Get friendly symbol name and emoji
-                symbol_key = win_result["symbol"]
-                symbol_name = SYMBOLS[symbol_key]["name"]
-                symbol_emoji = SYMBOLS[symbol_key]["emoji"]
-                win_details = f"{win_result['count']}x {symbol_name} {symbol_emoji} ({win_result['multiplier']}x)"
-                self.gambling_cog.update_balance(user_id, winnings, "animated_slots", f"Win: {win_details}")
-                result = ('won', winnings)
-            else:
-                result = ('lost', bet_amount)
-                win_details = None
-                winnings = 0
-            
-            new_balance = self.gambling_cog.get_balance(user_id)
-            
-            # Create result embed
-            if result[0] == 'won':
-                title = f"🎰 You won {format_currency(winnings)}! 🎰"
-                color = discord.Color.green()
-            else:
-                title = "🎰 Better luck next time! 🎰"
-                color = discord.Color.red()
-            
-            embed = discord.Embed(
-                title=title,
-                description=f"**{middle_row}**",
-                color=color
-            )
-            
-            embed.set_author(name=f"{ctx.author.name}'s Slot Machine", icon_url=ctx.author.display_avatar.url)
-            embed.add_field(name="Bet", value=format_currency(bet_amount), inline=True)
-            
-            # Add win details if available
-            if win_details:
-                embed.add_field(name="Match", value=win_details, inline=True)
-            
-            embed.add_field(name="Balance", value=format_currency(new_balance), inline=True)
-            embed.set_footer(text="Piglet Casino | Try your luck again with /animated_slots!")
-            
-            # Send the GIF and embed
-            file = discord.File(fp, filename="slots.gif")
-            embed.set_image(url=f"attachment://slots.gif")
-            
-            await ctx.reply(file=file, embed=embed)
-            
-            # Clean up temp file
-            try:
-                os.unlink(fp)
-            except:
-                pass
-                
-        except Exception as e:
-            logger.error(f"Error in animated slots: {e}")
-            await ctx.reply(f"An error occurred: {e}")
+        label = ANIMATION_FORMATS[slots_format or DEFAULT_ANIMATION_FORMAT]["label"]
+        await interaction.response.send_message(f"Animated slots will now use {label}.", ephemeral=True)
 
 async def setup(bot):
     """Setup function for the cog."""
@@ -1,187 +1,164 @@
+import asyncio
+import os
+import time
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 import logging
-import random
-from utils.currency import parse_bet, format_currency
-from utils.db_service import get_user_balance, update_user_balance
+from utils.blackjack import BlackjackGame, BlackjackTable, Shoe
+from utils.currency import format_currency, validate_bet
+from utils.db_service import (
+    apply_balance_changes, delete_blackjack_game, get_active_blackjack_games, get_user_balance, save_blackjack_game,
+    update_user_balance
+)
+from utils.message_edits import EditCoalescer
 
 logger = logging.getLogger(__name__)
 
-# Card suits and values
-SUITS = ["♠️", "♥️", "♦️", "♣️"]
-VALUES = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
+# Seconds a game may sit idle before the player automatically stands
+GAME_TTL = int(os.environ.get("BLACKJACK_GAME_TTL", 180))
 
-class BlackjackGame:
-    """Class to represent a blackjack game."""
-    
-    def __init__(self, player_id, bet_amount):
-        self.player_id = player_id
-        self.bet_amount = bet_amount
-        self.player_hand = []
-        self.dealer_hand = []
-        self.deck = self._create_deck()
-        self.status = "active"  # active, player_bust, dealer_bust, player_win, dealer_win, push
-        self.message = None  # Store the message for updating
-        
-        # Deal initial cards
-        self.player_hand.append(self._deal_card())
-        self.dealer_hand.append(self._deal_card())
-        self.player_hand.append(self._deal_card())
-        self.dealer_hand.append(self._deal_card())
-        
-        # Check for player blackjack
-        if self.calculate_score(self.player_hand) == 21:
-            if self.calculate_score(self.dealer_hand) == 21:
-                self.status = "push"  # Both have blackjack, push
-            else:
-                self.status = "player_blackjack"  # Player has blackjack
-    
-    def _create_deck(self):
-        """Create a new shuffled deck of cards."""
-        deck = [f"{v}{s}" for s in SUITS for v in VALUES]
-        random.shuffle(deck)
-        return deck
-    
-    def _deal_card(self):
-        """Deal a card from the deck."""
-        if not self.deck:
-            self.deck = self._create_deck()  # Reshuffle if needed
-        return self.deck.pop()
-    
-    def calculate_score(self, hand):
-        """Calculate the score of a hand."""
-        score = 0
-        ace_count = 0
-        
-        for card in hand:
-            value = card[:-2]  # Remove the suit
-            if value in ["J", "Q", "K"]:
-                score += 10
-            elif value == "A":
-                score += 11
-                ace_count += 1
-            else:
-                score += int(value)
-        
-        # Adjust for aces if needed (A can be 1 or 11)
-        while score > 21 and ace_count > 0:
-            score -= 10
-            ace_count -= 1
+# Seconds a table takes seats before dealing, and a seat has to act before it stands
+TABLE_JOIN_SECONDS = int(os.environ.get("BLACKJACK_TABLE_JOIN_SECONDS", 20))
+TABLE_TURN_SECONDS = int(os.environ.get("BLACKJACK_TABLE_TURN_SECONDS", 30))
+
+SEAT_STATUS_LABELS = {
+    "waiting": "Waiting for the deal",
+    "active": "Playing",
+    "stood": "Stands",
+    "player_blackjack": "Blackjack!",
+    "player_bust": "Bust",
+    "dealer_bust": "Dealer busts",
+    "player_win": "Wins",
+    "dealer_win": "Dealer wins",
+    "push": "Push",
+}
+
+
+def create_game_embed(game, username, avatar_url, hide_dealer=True):
+    """Create an embed for the current game state."""
+    player_score = game.player_hand.score
+    dealer_score = game.dealer_hand.score if not hide_dealer else game.dealer_showing()
+    
+    # Determine display values based on game state
+    if game.status == "active":
+        title = "🃏 Blackjack Game in Progress"
+        color = discord.Color.blue()
+        footer = "Hit to draw another card, or Stand to end your turn."
+        dealer_display = f"Dealer's Hand: {game.dealer_hand.format(hide_dealer)}"
+        if hide_dealer:
+            dealer_display += f" (Showing: {dealer_score})"
+        else:
+            dealer_display += f" (Score: {dealer_score})"
+    else:
+        # Game is over, show full results
+        if game.status == "player_blackjack":
+            title = "🃏 BLACKJACK! You win 3:2 on your bet!"
+            color = discord.Color.gold()
+        elif game.status == "player_bust":
+            title = "🃏 Bust! You went over 21."
+            color = discord.Color.red()
+        elif game.status == "dealer_bust":
+            title = "🃏 Dealer busts! You win!"
+            color = discord.Color.green()
+        elif game.status == "player_win":
+            title = "🃏 You win!"
+            color = discord.Color.green()
+        elif game.status == "dealer_win":
+            title = "🃏 Dealer wins."
+            color = discord.Color.red()
+        else:  # push
+            title = "🃏 Push! It's a tie."
+            color = discord.Color.light_grey()
             
-        return score
+        dealer_display = f"Dealer's Hand: {game.dealer_hand.format()} (Score: {game.dealer_hand.score})"
+        footer = "Game over. Use /blackjack to play again!"
     
-    def player_hit(self):
-        """Player takes a hit (draws a card)."""
-        self.player_hand.append(self._deal_card())
-        score = self.calculate_score(self.player_hand)
-        
-        if score > 21:
-            self.status = "player_bust"
-        
-        return score
+    embed = discord.Embed(
+        title=title,
+        color=color
+    )
     
-    def player_stand(self):
-        """Player stands, dealer plays."""
-        player_score = self.calculate_score(self.player_hand)
-        dealer_score = self.calculate_score(self.dealer_hand)
-        
-        # Dealer hits until 17 or higher
-        while dealer_score < 17:
-            self.dealer_hand.append(self._deal_card())
-            dealer_score = self.calculate_score(self.dealer_hand)
-        
-        if dealer_score > 21:
-            self.status = "dealer_bust"
-        elif dealer_score > player_score:
-            self.status = "dealer_win"
-        elif dealer_score < player_score:
-            self.status = "player_win"
+    embed.set_author(name=f"{username}'s Blackjack Game", icon_url=avatar_url)
+    embed.add_field(name="Your Bet", value=format_currency(game.bet_amount), inline=True)
+    
+    # Show result if game is over
+    if game.status != "active":
+        result = game.get_result()
+        if result > 0:
+            embed.add_field(name="Result", value=f"You won {format_currency(result)}", inline=True)
+        elif result < 0:
+            embed.add_field(name="Result", value=f"You lost {format_currency(abs(result))}", inline=True)
         else:
-            self.status = "push"  # Equal scores
-        
-        return dealer_score
-    
-    def get_result(self):
-        """Get the final result of the game."""
-        if self.status == "player_blackjack":
-            return 1.5 * self.bet_amount  # Blackjack pays 3:2
-        elif self.status in ["player_win", "dealer_bust"]:
-            return self.bet_amount  # Win pays 1:1
-        elif self.status == "push":
-            return 0  # Push returns the bet
-        else:  # dealer_win, player_bust
-            return -self.bet_amount  # Lose
-    
-    def format_hand(self, hand, hide_second=False):
-        """Format a hand for display."""
-        if hide_second and len(hand) > 1:
-            return f"{hand[0]} ??"
-        return " ".join(hand)
-    
-    def create_embed(self, username, avatar_url, hide_dealer=True):
-        """Create an embed for the current game state."""
-        player_score = self.calculate_score(self.player_hand)
-        dealer_score = self.calculate_score(self.dealer_hand) if not hide_dealer else self.calculate_score([self.dealer_hand[0]])
-        
-        # Determine display values based on game state
-        if self.status == "active":
-            title = "🃏 Blackjack Game in Progress"
-            color = discord.Color.blue()
-            footer = "Hit to draw another card, or Stand to end your turn."
-            dealer_display = f"Dealer's Hand: {self.format_hand(self.dealer_hand, hide_dealer)}"
-            if hide_dealer:
-                dealer_display += f" (Showing: {dealer_score})"
-            else:
-                dealer_display += f" (Score: {dealer_score})"
+            embed.add_field(name="Result", value="Push (bet returned)", inline=True)
+    
+    embed.add_field(name="\u200b", value="\u200b", inline=False)  # Spacer
+    embed.add_field(name=f"Your Hand: {game.player_hand.format()} (Score: {player_score})", value="\u200b", inline=False)
+    embed.add_field(name=dealer_display, value="\u200b", inline=False)
+    embed.set_footer(text=footer)
+    
+    return embed
+
+
+def create_table_embed(table):
+    """Create an embed for the current state of a table's round."""
+    if table.status == "open":
+        title = "🃏 Blackjack Table - Taking Seats"
+        color = discord.Color.blue()
+        dealer_display = "Dealer's Hand: waiting for the deal"
+        footer = (f"Use /blackjack_table to take a seat ({len(table.seats)}/{table.max_seats}). "
+                  f"Cards are dealt {TABLE_JOIN_SECONDS} seconds after the table opens, or when it's full.")
+    elif table.status == "playing":
+        title = "🃏 Blackjack Table"
+        color = discord.Color.blue()
+        dealer_display = f"Dealer's Hand: {table.dealer_hand.format(True)} (Showing: {table.dealer_showing()})"
+        footer = f"{table.current.username}'s turn: Hit to draw another card, or Stand to end your turn."
+    else:
+        title = "🃏 Blackjack Table - Round Over"
+        color = discord.Color.gold()
+        dealer_display = f"Dealer's Hand: {table.dealer_hand.format()} (Score: {table.dealer_hand.score})"
+        footer = "Round over. Use /blackjack_table to start the next one!"
+    
+    embed = discord.Embed(title=title, color=color)
+    embed.add_field(name=dealer_display, value="\u200b", inline=False)
+    
+    for seat in table.seats:
+        marker = "▶️ " if seat is table.current else ""
+        if seat.hand.cards:
+            value = f"{seat.hand.format()} (Score: {seat.hand.score}) - {SEAT_STATUS_LABELS[seat.status]}"
         else:
-            # Game is over, show full results
-            if self.status == "player_blackjack":
-                title = "🃏 BLACKJACK! You win 3:2 on your bet!"
-                color = discord.Color.gold()
-            elif self.status == "player_bust":
-                title = "🃏 Bust! You went over 21."
-                color = discord.Color.red()
-            elif self.status == "dealer_bust":
-                title = "🃏 Dealer busts! You win!"
-                color = discord.Color.green()
-            elif self.status == "player_win":
-                title = "🃏 You win!"
-                color = discord.Color.green()
-            elif self.status == "dealer_win":
-                title = "🃏 Dealer wins."
-                color = discord.Color.red()
-            else:  # push
-                title = "🃏 Push! It's a tie."
-                color = discord.Color.light_grey()
-                
-            dealer_display = f"Dealer's Hand: {self.format_hand(self.dealer_hand)} (Score: {self.calculate_score(self.dealer_hand)})"
-            footer = "Game over. Use /blackjack to play again!"
+            value = SEAT_STATUS_LABELS[seat.status]
         
-        embed = discord.Embed(
-            title=title,
-            color=color
-        )
-        
-        embed.set_author(name=f"{username}'s Blackjack Game", icon_url=avatar_url)
-        embed.add_field(name="Your Bet", value=format_currency(self.bet_amount), inline=True)
-        
-        # Show result if game is over
-        if self.status != "active":
-            result = self.get_result()
+        # Show result once the round is over
+        if table.status == "finished":
+            result = seat.get_result()
             if result > 0:
-                embed.add_field(name="Result", value=f"You won {format_currency(result)}", inline=True)
+                value += f"\nWon {format_currency(result)}"
             elif result < 0:
-                embed.add_field(name="Result", value=f"You lost {format_currency(abs(result))}", inline=True)
+                value += f"\nLost {format_currency(abs(result))}"
             else:
-                embed.add_field(name="Result", value="Push (bet returned)", inline=True)
+                value += "\nBet returned"
         
-        embed.add_field(name="\u200b", value="\u200b", inline=False)  # Spacer
-        embed.add_field(name=f"Your Hand: {self.format_hand(self.player_hand)} (Score: {player_score})", value="\u200b", inline=False)
-        embed.add_field(name=dealer_display, value="\u200b", inline=False)
-        embed.set_footer(text=footer)
-        
-        return embed
+        embed.add_field(
+            name=f"{marker}{seat.username} - {format_currency(seat.bet_amount)}", value=value, inline=False
+        )
+    
+    embed.set_footer(text=footer)
+    return embed
+
+
+def table_payouts(table):
+    """
+    Get the balance changes settling every seat of a finished table round.
+    
+    Losing seats get a zero change, so every hand's cards are on the ledger.
+    """
+    return [
+        {"user_id": seat.player_id, "username": seat.username,
+         "amount": max(seat.bet_amount + seat.get_result(), 0),
+         "details": f"Table result: {seat.status} ({seat.hand.code()} vs {table.dealer_hand.code()})"}
+        for seat in table.seats
+    ]
 
 
 class Blackjack(commands.Cog):
@@ -189,9 +166,152 @@ class Blackjack(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        self.active_games = {}  # Store active games by player ID
+        self.active_games = {}  # Games in progress by player ID, also saved to the database
+        self.shoes = {}  # Shared shoe per channel ID
+        self.table_views = {}  # View of the table round in each channel, holding the round as `table`
+        self.editors = {}  # Edit coalescer of each game message with edits in flight, by message ID
+        # One persistent view handles the buttons of every game message
+        self.view = BlackjackView(self)
         logger.info("Blackjack cog initialized")
     
+    async def cog_load(self):
+        """Resume saved games, listen for their buttons and start the timeout sweep."""
+        for record in get_active_blackjack_games():
+            game = BlackjackGame.from_record(record, self.get_shoe(record["channel_id"]))
+            self.active_games[game.player_id] = game
+        if self.active_games:
+            logger.info(f"Resumed {len(self.active_games)} blackjack games")
+        self.bot.add_view(self.view)
+        self.expire_games.start()
+    
+    async def cog_unload(self):
+        """Stop the timeout sweep and table rounds; games stay saved and resume on the next load."""
+        self.expire_games.cancel()
+        for view in list(self.table_views.values()):
+            view.task.cancel()
+    
+    def get_shoe(self, channel_id):
+        """
+        Get the shoe shared by blackjack games in a channel.
+        
+        Args:
+            channel_id (int): Discord channel ID
+            
+        Returns:
+            Shoe: The channel's shoe, created on first use
+        """
+        shoe = self.shoes.get(channel_id)
+        if shoe is None:
+            shoe = self.shoes[channel_id] = Shoe()
+        return shoe
+    
+    async def check_bet(self, interaction, bet):
+        """
+        Parse and validate a bet, telling the player what's wrong with it.
+        
+        Args:
+            interaction (discord.Interaction): Command interaction
+            bet (str): Bet as typed by the player
+            
+        Returns:
+            int: Bet amount, or None if the bet was refused
+        """
+        # Get user balance and parse bet
+        balance = get_user_balance(str(interaction.user.id))
+        
+        try:
+            bet_amount = validate_bet(bet, balance)
+        except ValueError as e:
+            await interaction.response.send_message(str(e), ephemeral=True)
+            return None
+        
+        return bet_amount
+    
+    def message_editor(self, channel_id, message_id):
+        """
+        Get the edit coalescer of a game message.
+        
+        Args:
+            channel_id (int): Channel the message is in
+            message_id (int): Game message ID
+            
+        Returns:
+            EditCoalescer: The message's coalescer, created on first use
+        """
+        editor = self.editors.get(message_id)
+        if editor is None:
+            message = self.bot.get_partial_messageable(channel_id).get_partial_message(message_id)
+            editor = self.editors[message_id] = EditCoalescer(message.edit)
+        return editor
+    
+    async def close_editor(self, message_id):
+        """Send a game message's last edit and drop its coalescer."""
+        editor = self.editors.pop(message_id, None)
+        if editor is not None:
+            await editor.flush()
+    
+    def save_game(self, game):
+        """Push back a game's timeout and save its current state."""
+        game.expires_at = time.time() + GAME_TTL
+        save_blackjack_game(game.to_record())
+    
+    def settle_game(self, game, username, note=""):
+        """
+        Pay out a finished game and forget it.
+        
+        Every game gets a result transaction, zero for a loss, recording the
+        cards both hands ended with. Does nothing if the game was already settled, so a button press and
+        the timeout sweep can't both pay it out.
+        
+        Args:
+            game (BlackjackGame): Finished game
+            username (str): Player's username, for the ledger
+            note (str, optional): Added to the transaction details
+        """
+        if self.active_games.get(game.player_id) is not game:
+            return
+        # Win or push returns the bet with the winnings, a loss returns nothing
+        amount = max(game.bet_amount + game.get_result(), 0)
+        update_user_balance(game.player_id, username, amount, "blackjack",
+                            f"Result: {game.status}{note} ({game.player_hand.code()} vs {game.dealer_hand.code()})",
+                            game.rng)
+        self.active_games.pop(game.player_id, None)
+        delete_blackjack_game(game.player_id)
+    
+    @tasks.loop(seconds=15)
+    async def expire_games(self):
+        """Stand for players who have left their game idle past the timeout."""
+        now = time.time()
+        for game in [game for game in self.active_games.values() if game.expires_at <= now]:
+            # Skip games the player finished while an earlier timeout was being shown
+            if self.active_games.get(game.player_id) is not game or game.status != "active":
+                continue
+            
+            # Player stands, dealer plays
+            game.player_stand()
+            
+            # Try to get username from bot's cache
+            user = self.bot.get_user(int(game.player_id))
+            username = user.name if user else "Player"
+            self.settle_game(game, username, " (timeout)")
+            
+            # Update message with final result
+            if game.message_id is None:
+                continue
+            avatar_url = user.display_avatar.url if user else None
+            self.message_editor(game.channel_id, game.message_id).request(
+                lambda game=game, username=username, avatar_url=avatar_url: {
+                    "embed": create_game_embed(game, username, avatar_url, hide_dealer=False),
+                    "view": None,
+                }
+            )
+            await self.close_editor(game.message_id)
+    
+    @expire_games.before_loop
+    async def before_expire_games(self):
+        """Wait until the bot can edit messages."""
+        await self.bot.wait_until_ready()
+    
     @app_commands.command(
         name="blackjack", 
         description="Play a game of Blackjack"
@@ -207,147 +327,277 @@ class Blackjack(commands.Cog):
             await interaction.response.send_message("You already have an active blackjack game! Finish it before starting a new one.", ephemeral=True)
             return
         
-        # Get user balance and parse bet
-        balance = get_user_balance(user_id)
-        
-        try:
-            bet_amount = parse_bet(bet, balance)
-        except ValueError as e:
-            await interaction.response.send_message(f"Error: {str(e)}", ephemeral=True)
-            return
-        
-        # Check if bet is valid
-        if bet_amount <= 0:
-            await interaction.response.send_message("Bet amount must be greater than 0.", ephemeral=True)
+        bet_amount = await self.check_bet(interaction, bet)
+        if bet_amount is None:
             return
         
-        if bet_amount > balance:
-            await interaction.response.send_message(f"You don't have enough funds! Your balance is {format_currency(balance)}.", ephemeral=True)
-            return
+        # Create a new blackjack game, dealt from the channel's shoe
+        game = BlackjackGame(user_id, bet_amount, shoe=self.get_shoe(interaction.channel_id))
+        game.channel_id = interaction.channel_id
         
-        # Create a new blackjack game
-        game = BlackjackGame(user_id, bet_amount)
+        # Deduct bet from balance, noting where in which shoe the cards came from
+        update_user_balance(user_id, username, -bet_amount, "blackjack",
+                            f"Bet placed (shoe {game.shoe_round}@{game.shoe_position})", game.rng)
         
-        # Deduct bet from balance
-        update_user_balance(user_id, username, -bet_amount, "blackjack", "Bet placed")
-        
-        # Store the game
+        # Handle immediate blackjack or push; the game is stored first so settle_game pays it out
         self.active_games[user_id] = game
+        if game.status != "active":
+            self.settle_game(game, username)
+            await interaction.response.send_message(
+                embed=create_game_embed(game, interaction.user.name, interaction.user.display_avatar.url, hide_dealer=False)
+            )
+            return
         
-        # Create buttons for hit and stand
-        view = BlackjackView(self, game)
+        # Save the game before anything can fail so a restart can't lose the bet
+        self.save_game(game)
         
-        # Send initial game state
-        embed = game.create_embed(interaction.user.name, interaction.user.display_avatar.url)
-        await interaction.response.send_message(embed=embed, view=view)
+        # Send initial game state with the hit and stand buttons
+        embed = create_game_embed(game, interaction.user.name, interaction.user.display_avatar.url)
+        await interaction.response.send_message(embed=embed, view=self.view)
         
         # Store the message for updating
         message = await interaction.original_response()
-        game.message = message
+        game.message_id = message.id
+        self.save_game(game)
+
+    
+    @app_commands.command(
+        name="blackjack_table",
+        description="Take a seat at this channel's blackjack table"
+    )
+    @app_commands.describe(bet="Amount to bet")
+    async def blackjack_table(self, interaction: discord.Interaction, bet: str):
+        """Open a table round in the channel, or sit at the one taking seats."""
+        view = self.table_views.get(interaction.channel_id)
+        if view and view.table.status != "open":
+            await interaction.response.send_message("A round is being played at this table. Join the next one when it's over!", ephemeral=True)
+            return
         
-        # Handle immediate blackjack or push
-        if game.status != "active":
-            result = game.get_result()
-            if result >= 0:  # Win or push
-                update_user_balance(user_id, username, bet_amount + result, "blackjack", f"Result: {game.status}")
-            # Update the message with new embed and remove buttons
-            await message.edit(embed=game.create_embed(interaction.user.name, interaction.user.display_avatar.url, hide_dealer=False), view=None)
-            # Remove the game
-            if user_id in self.active_games:
-                del self.active_games[user_id]
+        bet_amount = await self.check_bet(interaction, bet)
+        if bet_amount is None:
+            return
+        
+        user_id = str(interaction.user.id)
+        if view:
+            try:
+                view.table.sit(user_id, interaction.user.name, bet_amount)
+            except ValueError as e:
+                await interaction.response.send_message(str(e), ephemeral=True)
+                return
+            if view.editor:
+                view.editor.request(view.render)
+            if view.table.is_full:
+                view.full.set()
+            await interaction.response.send_message(f"You took a seat with a bet of {format_currency(bet_amount)}.", ephemeral=True)
+            return
+        
+        # Open a table round dealt from the channel's shoe
+        table = BlackjackTable(self.get_shoe(interaction.channel_id))
+        table.channel_id = interaction.channel_id
+        table.sit(user_id, interaction.user.name, bet_amount)
+        view = self.table_views[table.channel_id] = TableView(table)
+        
+        await interaction.response.send_message(embed=create_table_embed(table))
+        message = await interaction.original_response()
+        table.message_id = message.id
+        view.editor = EditCoalescer(message.edit)
+        view.task = asyncio.create_task(self.run_table(view))
+    
+    async def run_table(self, view):
+        """
+        Take seats, then play and settle a table's round.
+        
+        Stakes are taken for every seat in one batched commit when the cards
+        are dealt, and winnings paid in another when the round is over.
+        
+        Args:
+            view (TableView): View of the table round
+        """
+        table = view.table
+        staked = {}
+        settled = False
+        try:
+            try:
+                await asyncio.wait_for(view.full.wait(), TABLE_JOIN_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            
+            # Seats whose balance no longer covers their bet are dropped
+            staked = apply_balance_changes([
+                {"user_id": seat.player_id, "username": seat.username, "amount": -seat.bet_amount,
+                 "details": "Table bet placed"}
+                for seat in table.seats
+            ], "blackjack", table.rng)
+            for seat in list(table.seats):
+                if seat.player_id not in staked:
+                    table.leave(seat.player_id)
+            if not table.seats:
+                view.editor.request(lambda: {"content": "No one at the table could cover their bet.", "embed": None})
+                await view.editor.flush()
+                return
+            
+            table.deal()
+            view.editor.request(view.render)
+            
+            # Stand for seats that don't act in time
+            while table.status == "playing":
+                seat = table.current
+                view.acted.clear()
+                try:
+                    await asyncio.wait_for(view.acted.wait(), TABLE_TURN_SECONDS)
+                except asyncio.TimeoutError:
+                    # The player may have acted just as the turn ran out
+                    if table.current is seat:
+                        table.stand(seat.player_id)
+                        view.editor.request(view.render)
+            
+            # Settle every seat, recording its cards
+            apply_balance_changes(table_payouts(table), "blackjack", table.rng)
+            settled = True
+            await view.editor.flush()
+        except asyncio.CancelledError:
+            # Unloaded mid-round
+            if staked and not settled:
+                self.close_failed_round(table)
+            raise
+        except Exception as e:
+            logger.error(f"Error running blackjack table in channel {table.channel_id}: {e}")
+            if not settled:
+                # Stakes are only held once the staking commit went through
+                if staked:
+                    self.close_failed_round(table)
+                view.editor.request(lambda: {
+                    "content": "Something went wrong at the table, the round was called off.", "embed": None, "view": None
+                })
+            await view.editor.flush()
+        finally:
+            view.stop()
+            self.table_views.pop(table.channel_id, None)
+    
+    def close_failed_round(self, table):
+        """
+        Return the stakes of a round that stopped before it was paid out.
+        
+        A round the dealer finished is paid out as usual; one still being
+        played gets every stake back. If even that fails, what each player
+        is owed is logged so it can be paid by hand.
+        
+        Args:
+            table (BlackjackTable): The round, with its stakes taken
+        """
+        if table.status == "finished":
+            changes = table_payouts(table)
+        else:
+            changes = [
+                {"user_id": seat.player_id, "username": seat.username, "amount": seat.bet_amount,
+                 "details": "Table bet refunded"}
+                for seat in table.seats
+            ]
+        try:
+            apply_balance_changes(changes, "blackjack", table.rng)
+        except Exception as e:
+            owed = ", ".join(f"{change['user_id']}: {change['amount']}" for change in changes)
+            logger.error(f"Failed to close blackjack table round {table.rng.round_id}, owed {owed}: {e}")
 
 
 class BlackjackView(discord.ui.View):
-    """View for blackjack game buttons."""
+    """
+    Persistent view for blackjack game buttons.
+    
+    One instance serves every game message, including messages sent before a
+    restart; the game is looked up by the player who pressed the button.
+    """
     
-    def __init__(self, cog, game):
-        super().__init__(timeout=180)  # 3 minute timeout
+    def __init__(self, cog):
+        super().__init__(timeout=None)  # Idle games are timed out by Blackjack.expire_games
         self.cog = cog
-        self.game = game
     
-    @discord.ui.button(label="Hit", style=discord.ButtonStyle.primary)
+    async def get_game(self, interaction):
+        """Get the clicking player's game on this message, or tell them it isn't theirs."""
+        game = self.cog.active_games.get(str(interaction.user.id))
+        if game is None or game.message_id != interaction.message.id:
+            await interaction.response.send_message("This is not your game!", ephemeral=True)
+            return None
+        return game
+    
+    @discord.ui.button(label="Hit", style=discord.ButtonStyle.primary, custom_id="blackjack:hit")
     async def hit(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Hit button - draw another card."""
-        if str(interaction.user.id) != self.game.player_id:
-            await interaction.response.send_message("This is not your game!", ephemeral=True)
+        game = await self.get_game(interaction)
+        if game is None:
             return
             
         # Player takes a hit
-        self.game.player_hit()
+        game.player_hit()
+        username, avatar_url = interaction.user.name, interaction.user.display_avatar.url
+        editor = self.cog.message_editor(game.channel_id, game.message_id)
         
         # Check if player busted
-        if self.game.status == "player_bust":
-            # Game over, update message
-            await interaction.response.edit_message(
-                embed=self.game.create_embed(interaction.user.name, interaction.user.display_avatar.url, hide_dealer=False), 
-                view=None
-            )
-            # Remove the game
-            if self.game.player_id in self.cog.active_games:
-                del self.cog.active_games[self.game.player_id]
+        if game.status == "player_bust":
+            # Game over, the bet is already deducted
+            self.cog.settle_game(game, username)
+            await editor.respond(interaction, lambda: {
+                "embed": create_game_embed(game, username, avatar_url, hide_dealer=False), "view": None
+            })
+            await self.cog.close_editor(game.message_id)
         else:
-            # Update the game state
-            await interaction.response.edit_message(
-                embed=self.game.create_embed(interaction.user.name, interaction.user.display_avatar.url)
-            )
+            # Update the game state; rapid hits are shown in one edit
+            self.cog.save_game(game)
+            await editor.respond(interaction, lambda: {"embed": create_game_embed(game, username, avatar_url)})
     
-    @discord.ui.button(label="Stand", style=discord.ButtonStyle.secondary)
+    @discord.ui.button(label="Stand", style=discord.ButtonStyle.secondary, custom_id="blackjack:stand")
     async def stand(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Stand button - end turn and let dealer play."""
-        if str(interaction.user.id) != self.game.player_id:
-            await interaction.response.send_message("This is not your game!", ephemeral=True)
+        game = await self.get_game(interaction)
+        if game is None:
             return
             
-        # Player stands, dealer plays
-        self.game.player_stand()
-        
-        # Game is over, process result
-        user_id = self.game.player_id
-        username = interaction.user.name
-        result = self.game.get_result()
-        
-        if result >= 0:  # Win or push
-            update_user_balance(user_id, username, self.game.bet_amount + result, "blackjack", f"Result: {self.game.status}")
+        # Player stands, dealer plays, and the game is settled
+        game.player_stand()
+        username, avatar_url = interaction.user.name, interaction.user.display_avatar.url
+        self.cog.settle_game(game, username)
         
         # Update message with final result
-        await interaction.response.edit_message(
-            embed=self.game.create_embed(interaction.user.name, interaction.user.display_avatar.url, hide_dealer=False),
-            view=None
+        await self.cog.message_editor(game.channel_id, game.message_id).respond(
+            interaction, lambda: {"embed": create_game_embed(game, username, avatar_url, hide_dealer=False), "view": None}
         )
-        
-        # Remove the game
-        if user_id in self.cog.active_games:
-            del self.cog.active_games[user_id]
+        await self.cog.close_editor(game.message_id)
+
+
+class TableView(discord.ui.View):
+    """Hit and stand buttons shared by every seat at a table."""
     
-    async def on_timeout(self):
-        """Handle timeout - automatically stand."""
-        if self.game.status == "active" and self.game.message:
-            # Player stands, dealer plays
-            self.game.player_stand()
-            
-            # Process result
-            user_id = self.game.player_id
-            result = self.game.get_result()
-            
-            # Try to get username from bot's cache
-            user = self.cog.bot.get_user(int(user_id))
-            username = user.name if user else "Player"
-            
-            if result >= 0:  # Win or push
-                update_user_balance(user_id, username, self.game.bet_amount + result, "blackjack", f"Result: {self.game.status} (timeout)")
-            
-            # Update message with final result
-            try:
-                await self.game.message.edit(
-                    embed=self.game.create_embed(username, user.display_avatar.url if user else None, hide_dealer=False),
-                    view=None
-                )
-            except:
-                logger.error(f"Failed to update blackjack game message on timeout for {user_id}")
-            
-            # Remove the game
-            if user_id in self.cog.active_games:
-                del self.cog.active_games[user_id]
+    def __init__(self, table):
+        super().__init__(timeout=None)  # Turns are timed by Blackjack.run_table
+        self.table = table
+        self.task = None
+        self.editor = None  # Coalescer of the table message's edits, once it's sent
+        self.full = asyncio.Event()  # Set when the last seat is taken
+        self.acted = asyncio.Event()  # Set when the seat whose turn it is acts
+    
+    async def act(self, interaction, action):
+        """Apply a player's action and show the table."""
+        try:
+            action(str(interaction.user.id))
+        except ValueError as e:
+            await interaction.response.send_message(str(e), ephemeral=True)
+            return
+        self.acted.set()
+        await self.editor.respond(interaction, self.render)
+    
+    def render(self):
+        """Build the table message from the round's latest state."""
+        return {"embed": create_table_embed(self.table), "view": self if self.table.status == "playing" else None}
+    
+    @discord.ui.button(label="Hit", style=discord.ButtonStyle.primary)
+    async def hit(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Hit button - draw another card."""
+        await self.act(interaction, self.table.hit)
+    
+    @discord.ui.button(label="Stand", style=discord.ButtonStyle.secondary)
+    async def stand(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Stand button - end turn and pass it on."""
+        await self.act(interaction, self.table.stand)
 
 
 async def setup(bot):
@@ -1,11 +1,15 @@
+import asyncio
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 import logging
 import re
 import os
-from utils.currency import parse_bet, format_currency
-from utils.slots import run_slots_game
+from utils.currency import format_currency, validate_bet
+from utils.slots import SYMBOLS, run_slots_game
+from utils.slots_grid import DEFAULT_GRID_FORMAT, GRID_FORMATS, GridRenderer
+from utils.paytable import get_paytable, reload_paytable, reload_if_changed
+from utils.rng import new_round
 from utils.db_service import get_user_balance, update_user_balance, get_or_create_user, check_daily_reward, get_leaderboard
 
 logger = logging.getLogger(__name__)
@@ -17,8 +21,44 @@ class Gambling(commands.Cog):
         self.bot = bot
         # Default starting balance for new users (handled in db_service now)
         self.default_balance = 1000
+        # Load the paytable now so a broken config fails at startup, not mid-spin
+        get_paytable()
+        # Draw the symbol tiles for /slots result images once
+        self.grid_renderer = GridRenderer(SYMBOLS)
         logger.info("Gambling cog initialized with database support")
     
+    async def cog_load(self):
+        """Start background tasks when the cog is loaded."""
+        self.watch_paytable.start()
+    
+    async def cog_unload(self):
+        """Stop background tasks when the cog is unloaded."""
+        self.watch_paytable.cancel()
+    
+    @tasks.loop(seconds=30)
+    async def watch_paytable(self):
+        """Hot-reload the paytable config when its file changes."""
+        try:
+            await asyncio.to_thread(reload_if_changed)
+        except (OSError, ValueError) as e:
+            logger.error(f"Rejected paytable update, keeping v{get_paytable().version}: {e}")
+    
+    @commands.command(name="reload_paytable")
+    @commands.is_owner()
+    async def reload_paytable_command(self, ctx):
+        """Reload the paytable config immediately (bot owner only)."""
+        try:
+            # Compiling the exact RTP takes a few hundred ms, so keep it off the event loop
+            table = await asyncio.to_thread(reload_paytable)
+        except (OSError, ValueError) as e:
+            await ctx.reply(f"Paytable rejected, keeping v{get_paytable().version}: {e}")
+            return
+        
+        await ctx.reply(
+            f"Loaded paytable v{table.version} ({table.digest}), "
+            f"slots RTP {table.rtp:.2%}, animated slots RTP {table.animated_rtp:.2%}"
+        )
+    
     def get_balance(self, user_id):
         """
         Get balance for a user.
@@ -32,7 +72,7 @@ class Gambling(commands.Cog):
         user_id = str(user_id)
         return get_user_balance(user_id)
     
-    def update_balance(self, user_id, amount, game_type="general", details=None):
+    def update_balance(self, user_id, amount, game_type="general", details=None, rng=None):
         """
         Update user balance by adding or subtracting an amount.
         
@@ -41,6 +81,7 @@ class Gambling(commands.Cog):
             amount (int): Amount to add (positive) or subtract (negative)
             game_type (str): Type of game ('slots', 'animated_slots', etc.)
             details (str, optional): Additional details about the transaction
+            rng (RoundRng, optional): Game round RNG to record on the transaction
             
         Returns:
             int: New balance
@@ -60,7 +101,7 @@ class Gambling(commands.Cog):
             if current + amount < 0:
                 amount = -current  # Only subtract what's available
         
-        return update_user_balance(user_id, username, amount, game_type, details)
+        return update_user_balance(user_id, username, amount, game_type, details, rng)
     
     @app_commands.command(
         name="slots",
@@ -76,35 +117,33 @@ class Gambling(commands.Cog):
         balance = self.get_balance(user_id)
         
         try:
-            bet_amount = parse_bet(bet, balance)
+            bet_amount = validate_bet(bet, balance)
         except ValueError as e:
-            await interaction.followup.send(f"Error: {str(e)}")
+            await interaction.followup.send(str(e))
             return
         
-        # Check if bet is valid
-        if bet_amount <= 0:
-            await interaction.followup.send("Bet amount must be greater than 0.")
-            return
-        
-        if bet_amount > balance:
-            await interaction.followup.send(f"You don't have enough funds! Your balance is {format_currency(balance)}.")
-            return
-        
-        # Update balance (deduct bet)
-        self.update_balance(user_id, -bet_amount, "slots", "Bet placed")
+        # Update balance (deduct bet), recording the paytable the spin uses
+        table = get_paytable()
+        rng = new_round(table)
+        self.update_balance(user_id, -bet_amount, "slots", "Bet placed", rng)
         
         # Run slots game
-        result, visual, winnings, win_details = run_slots_game(bet_amount)
+        result, visual, winnings, win_details, line = run_slots_game(bet_amount, rng, table)
         
         # Update balance with winnings if any
         if winnings > 0:
-            self.update_balance(user_id, winnings, "slots", f"Win: {win_details}")
+            self.update_balance(user_id, winnings, "slots", f"Win: {win_details}", rng)
         
         # Create result embed
         new_balance = self.get_balance(user_id)
-        embed = self._create_slots_embed(interaction.user, bet_amount, result, visual, winnings, win_details, new_balance)
+        file = self.render_grid(result, line)
+        embed = self._create_slots_embed(interaction.user, bet_amount, result, visual, winnings, win_details, new_balance,
+                                         file.filename if file else None)
         
-        await interaction.followup.send(embed=embed)
+        if file:
+            await interaction.followup.send(embed=embed, file=file)
+        else:
+            await interaction.followup.send(embed=embed)
     
     async def slots_command(self, message, bet_str):
         """Process slots command from message mention."""
@@ -114,35 +153,30 @@ class Gambling(commands.Cog):
         balance = self.get_balance(user_id)
         
         try:
-            bet_amount = parse_bet(bet_str, balance)
+            bet_amount = validate_bet(bet_str, balance)
         except ValueError as e:
-            await message.reply(f"Error: {str(e)}")
-            return
-        
-        # Check if bet is valid
-        if bet_amount <= 0:
-            await message.reply("Bet amount must be greater than 0.")
+            await message.reply(str(e))
             return
         
-        if bet_amount > balance:
-            await message.reply(f"You don't have enough funds! Your balance is {format_currency(balance)}.")
-            return
-        
-        # Update balance (deduct bet)
-        self.update_balance(user_id, -bet_amount, "slots", "Bet placed")
+        # Update balance (deduct bet), recording the paytable the spin uses
+        table = get_paytable()
+        rng = new_round(table)
+        self.update_balance(user_id, -bet_amount, "slots", "Bet placed", rng)
         
         # Run slots game
-        result, visual, winnings, win_details = run_slots_game(bet_amount)
+        result, visual, winnings, win_details, line = run_slots_game(bet_amount, rng, table)
         
         # Update balance with winnings if any
         if winnings > 0:
-            self.update_balance(user_id, winnings, "slots", f"Win: {win_details}")
+            self.update_balance(user_id, winnings, "slots", f"Win: {win_details}", rng)
         
         # Create result embed
         new_balance = self.get_balance(user_id)
-        embed = self._create_slots_embed(message.author, bet_amount, result, visual, winnings, win_details, new_balance)
+        file = self.render_grid(result, line)
+        embed = self._create_slots_embed(message.author, bet_amount, result, visual, winnings, win_details, new_balance,
+                                         file.filename if file else None)
         
-        await message.reply(embed=embed)
+        await message.reply(embed=embed, file=file)
     
     @app_commands.command(
         name="balance",
@@ -237,8 +271,27 @@ class Gambling(commands.Cog):
         
         await interaction.followup.send(embed=embed)
     
-    def _create_slots_embed(self, user, bet_amount, result, visual, winnings, win_details, new_balance):
-        """Create an embed for slots result."""
+    def render_grid(self, result, line):
+        """
+        Render a slots result as an image attachment.
+        
+        Args:
+            result (list): 3x3 matrix of slot symbols
+            line (int): Index in PAYLINES of the winning line, or None
+            
+        Returns:
+            discord.File: Result image, or None to show the emoji grid instead
+        """
+        try:
+            image = self.grid_renderer.render(result, line)
+        except Exception as e:
+            logger.error(f"Error rendering slots grid: {e}")
+            return None
+        return discord.File(image, filename=f"slots.{GRID_FORMATS[DEFAULT_GRID_FORMAT]['extension']}")
+    
+    def _create_slots_embed(self, user, bet_amount, result, visual, winnings, win_details, new_balance,
+                            image_filename=None):
+        """Create an embed for slots result, showing the attached grid image if there is one."""
         if winnings > 0:
             title = f"🎰 You won {format_currency(winnings)}! 🎰"
             color = discord.Color.green()
@@ -248,10 +301,12 @@ class Gambling(commands.Cog):
         
         embed = discord.Embed(
             title=title,
-            description=f"**{visual}**",
+            description=None if image_filename else f"**{visual}**",
             color=color
         )
         
+        if image_filename:
+            embed.set_image(url=f"attachment://{image_filename}")
         embed.set_author(name=f"{user.name}'s Slot Machine", icon_url=user.display_avatar.url)
         embed.add_field(name="Bet", value=format_currency(bet_amount), inline=True)
         
@@ -2,10 +2,10 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import logging
-import random
 from datetime import datetime, timedelta
-from utils.currency import parse_bet, format_currency
+from utils.currency import format_currency, validate_bet
 from utils.db_service import check_work_reward, get_user_balance, update_user_balance, get_user_transactions, get_or_create_user
+from utils.rng import new_round
 
 logger = logging.getLogger(__name__)
 
@@ -75,25 +75,17 @@ class GamblingExtras(commands.Cog):
         balance = get_user_balance(user_id)
         
         try:
-            bet_amount = parse_bet(bet, balance)
+            bet_amount = validate_bet(bet, balance)
         except ValueError as e:
-            await interaction.followup.send(f"Error: {str(e)}")
-            return
-        
-        # Check if bet is valid
-        if bet_amount <= 0:
-            await interaction.followup.send("Bet amount must be greater than 0.")
-            return
-        
-        if bet_amount > balance:
-            await interaction.followup.send(f"You don't have enough funds! Your balance is {format_currency(balance)}.")
+            await interaction.followup.send(str(e))
             return
         
         # Update balance (deduct bet)
-        update_user_balance(user_id, username, -bet_amount, "coinflip", "Bet placed")
+        rng = new_round()
+        update_user_balance(user_id, username, -bet_amount, "coinflip", "Bet placed", rng)
         
         # Flip the coin (50/50 chance)
-        result = random.choice(["heads", "tails"])
+        result = rng.choice(["heads", "tails"])
         
         # Determine if player won
         win = choice == result
@@ -101,7 +93,7 @@ class GamblingExtras(commands.Cog):
         # Create result embed
         if win:
             winnings = bet_amount  # 2x the bet (return + profit)
-            update_user_balance(user_id, username, winnings * 2, "coinflip", f"Win: {result}")
+            update_user_balance(user_id, username, winnings * 2, "coinflip", f"Win: {result}", rng)
             
             title = f"🪙 You won {format_currency(winnings)}! 🪙"
             color = discord.Color.green()
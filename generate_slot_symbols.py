@@ -1,6 +1,8 @@
 from PIL import Image, ImageDraw, ImageFont
 import os
 
+from utils.image_generator import build_symbol_atlas
+
 # Define constants
 SYMBOL_SIZE = 180
 SYMBOL_COLORS = {
@@ -107,7 +109,7 @@ def generate_symbol_image(symbol_key):
     return img
 
 def main():
-    """Generate all slot symbol images."""
+    """Generate all slot symbol images and pack them into the sprite atlas."""
     output_dir = "assets/slot_symbols"
     os.makedirs(output_dir, exist_ok=True)
     
@@ -116,6 +118,10 @@ def main():
         output_path = os.path.join(output_dir, file_name)
         img.save(output_path)
         print(f"Generated {symbol_key} image at {output_path}")
+    
+    # Renderers only read the atlas, so repack it from the new images
+    index = build_symbol_atlas(output_dir)
+    print(f"Packed {len(index['tiles'])} symbols into {os.path.join(output_dir, 'atlas.png')}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,46 +1,78 @@
+"""
+Web app and bot entry point.
+
+Importing this module has no side effects beyond logging setup: render worker
+processes import the main module again when they start, so the app, the
+database tables and the bot are only set up by create_app() and main().
+gunicorn serves `main:create_app()`.
+"""
 import os
 import logging
 import threading
-from flask import Flask, render_template, jsonify
+from flask import Blueprint, Flask, current_app, render_template, jsonify
 from bot import setup_bot
-from models import db
+from models import add_missing_columns, db
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Flask app
-app = Flask(__name__)
-
-# Setup Flask app configuration
-# Make sure DATABASE_URL is set, and print its value for debugging
-db_url = os.environ.get("DATABASE_URL")
-logger.info(f"Database URL: {db_url}")
-
-if not db_url:
-    raise ValueError("DATABASE_URL environment variable not set")
+# Web routes, registered on the app by create_app()
+web = Blueprint("web", __name__)
 
-app.config["SQLALCHEMY_DATABASE_URI"] = db_url
-app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
-}
-
-# Initialize database
-db.init_app(app)
-
-# Create database tables
-with app.app_context():
-    db.create_all()
-    logger.info("Database tables created successfully.")
+def create_app():
+    """
+    Create the Flask app and make sure the database tables are up to date.
+    
+    Under gunicorn this also starts the Discord bot in a background thread.
+    
+    Returns:
+        Flask: The configured app
+        
+    Raises:
+        ValueError: If DATABASE_URL isn't set
+    """
+    app = Flask(__name__)
+    
+    # Setup Flask app configuration
+    # Make sure DATABASE_URL is set, and print its value for debugging
+    db_url = os.environ.get("DATABASE_URL")
+    logger.info(f"Database URL: {db_url}")
+    
+    if not db_url:
+        raise ValueError("DATABASE_URL environment variable not set")
+    
+    app.config["SQLALCHEMY_DATABASE_URI"] = db_url
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        "pool_recycle": 300,
+        "pool_pre_ping": True,
+    }
+    
+    # Initialize database
+    db.init_app(app)
+    app.register_blueprint(web)
+    
+    # Create database tables
+    with app.app_context():
+        db.create_all()
+        add_missing_columns()
+        logger.info("Database tables created successfully.")
+    
+    # Initialize bot thread when served by gunicorn
+    if os.environ.get('GUNICORN_CMD_ARGS') is not None:
+        bot_thread = threading.Thread(target=run_discord_bot)
+        bot_thread.daemon = True
+        bot_thread.start()
+    
+    return app
 
-@app.route('/')
+@web.route('/')
 def index():
     """Homepage route that displays bot status and info."""
     return render_template('index.html')
 
-@app.route('/admin')
+@web.route('/admin')
 def admin():
     """Admin panel to view database information."""
     from models import User, Transaction
@@ -78,7 +110,7 @@ def admin():
             return f"{value:,}"
     
     # Register filter with Jinja2
-    app.jinja_env.filters['currency'] = currency_filter
+    current_app.jinja_env.filters['currency'] = currency_filter
     
     return render_template('admin.html', 
                           top_users=top_users,
@@ -87,7 +119,7 @@ def admin():
                           stats=stats,
                           recent_transactions=recent_transactions)
 
-@app.route('/api/status')
+@web.route('/api/status')
 def status():
     """API route to check bot status."""
     return jsonify({
@@ -96,6 +128,12 @@ def status():
         'description': 'A Discord bot that implements a virtual casino with slots gambling functionality and virtual currency system'
     })
 
+@web.route('/api/metrics')
+def metrics():
+    """API route with the bot's runtime metrics."""
+    from utils.metrics import snapshot
+    return jsonify(snapshot())
+
 def run_discord_bot():
     """
     Function to run the Discord bot in a separate thread.
@@ -122,6 +160,8 @@ def main():
     Main entry point for the application.
     Runs the Discord bot in a separate thread.
     """
+    create_app()
+    
     # Create and start bot thread
     bot_thread = threading.Thread(target=run_discord_bot)
     bot_thread.daemon = True
@@ -132,12 +172,6 @@ def main():
     if __name__ == "__main__":
         run_discord_bot()
 
-# Initialize bot thread when imported by gunicorn
-if os.environ.get('GUNICORN_CMD_ARGS') is not None:
-    bot_thread = threading.Thread(target=run_discord_bot)
-    bot_thread.daemon = True
-    bot_thread.start()
-
 # Run main function when executed directly
 if __name__ == "__main__":
     main()
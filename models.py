@@ -1,8 +1,12 @@
 import os
+import logging
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect, text
 from sqlalchemy.orm import DeclarativeBase
 
+logger = logging.getLogger(__name__)
+
 
 class Base(DeclarativeBase):
     pass
@@ -33,6 +37,68 @@ class Transaction(db.Model):
     game_type = db.Column(db.String(32), nullable=False)  # 'slots', 'animated_slots', 'daily', etc.
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     details = db.Column(db.String(256), nullable=True)  # Additional details about the transaction
+    round_id = db.Column(db.String(32), nullable=True, index=True)  # Game round the transaction belongs to
+    rng_seed = db.Column(db.String(16), nullable=True)  # Round RNG seed, replay with RoundRng.from_seed
+    paytable_digest = db.Column(db.String(16), nullable=True)  # Paytable.digest the round was played under
+
+    def __repr__(self):
+        return f'<Transaction {self.id}: {self.amount}>'
+
+class GuildSettings(db.Model):
+    """Model for per-guild bot settings."""
+    guild_id = db.Column(db.String(32), primary_key=True)  # Discord guild ID
+    slots_format = db.Column(db.String(16), nullable=True)  # Animated slots output format, None for the default
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<GuildSettings {self.guild_id}>'
+
+class ActiveBlackjackGame(db.Model):
+    """Model for blackjack games in progress, so they survive restarts."""
+    player_id = db.Column(db.String(32), primary_key=True)  # Discord user ID, one game per player
+    channel_id = db.Column(db.String(32), nullable=False)
+    message_id = db.Column(db.String(32), nullable=True)  # Game message, None until it's sent
+    bet_amount = db.Column(db.Integer, nullable=False)
+    round_id = db.Column(db.String(32), nullable=True)
+    rng_seed = db.Column(db.String(16), nullable=True)
+    player_cards = db.Column(db.LargeBinary(32), nullable=False)  # Card ints, one byte each
+    dealer_cards = db.Column(db.LargeBinary(32), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)  # Auto-stand after this time
 
     def __repr__(self):
-        return f'<Transaction {self.id}: {self.amount}>'
\ No newline at end of file
+        return f'<ActiveBlackjackGame {self.player_id}>'
+
+def add_missing_columns():
+    """
+    Add columns the models define but existing tables lack.
+
+    db.create_all() creates missing tables but never alters existing ones, so
+    columns added to a model later are added here. Only nullable columns can
+    be added to a table that already has rows. Safe to run on every startup.
+    Must be called inside an app context.
+
+    Returns:
+        list: "table.column" names that were added
+    """
+    engine = db.engine
+    quote = engine.dialect.identifier_preparer.quote
+    added = []
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    raise RuntimeError(f"Can't add non-nullable column {table.name}.{column.name} to an existing table")
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}"))
+                added.append(f"{table.name}.{column.name}")
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+    for name in added:
+        logger.info(f"Added column {name}")
+    return added
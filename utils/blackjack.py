@@ -0,0 +1,537 @@
+"""
+Blackjack game engine, free of Discord dependencies.
+
+Cards are integers 0-51, `suit * 13 + rank` with ranks ordered A, 2-10, J, Q,
+K, matching the order the original string deck was built and shuffled in, so
+seeded rounds replay identically. A `Hand` keeps its running total and soft
+ace count up to date as cards are added, so scoring never re-reads the cards.
+
+Cards are dealt from a `Shoe` of one or more decks, which can be shared by
+every game at a table. Games in progress can be saved as a small record with
+`to_record` and resumed with `from_record`. A `BlackjackTable` plays one round
+for several seated players against a single dealer hand.
+"""
+import os
+
+from utils.rng import RoundRng, new_round
+
+# Card suits and values
+SUITS = ["♠️", "♥️", "♦️", "♣️"]
+VALUES = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
+DECK_SIZE = len(SUITS) * len(VALUES)
+
+# Points of each card, with aces counted as 11
+CARD_POINTS = tuple(min(rank + 1, 10) if rank else 11 for _ in SUITS for rank in range(len(VALUES)))
+CARD_LABELS = tuple(f"{value}{suit}" for suit in SUITS for value in VALUES)
+# Plain-text codes such as "10S", for ledger rows
+CARD_CODES = tuple(f"{value}{suit}" for suit in "SHDC" for value in VALUES)
+
+DEALER_STAND = 17  # Dealer draws until reaching this score
+
+# Decks in a table's shoe, and the fraction dealt before the cut card comes out
+SHOE_DECKS = int(os.environ.get("BLACKJACK_DECKS", 6))
+SHOE_PENETRATION = float(os.environ.get("BLACKJACK_PENETRATION", 0.75))
+
+# Players that can sit at a blackjack table
+TABLE_SEATS = int(os.environ.get("BLACKJACK_TABLE_SEATS", 5))
+
+
+def card_label(card):
+    """Get the display label of a card, such as "10♠️"."""
+    return CARD_LABELS[card]
+
+
+def payout(status, bet_amount):
+    """
+    Get what a finished hand wins or loses.
+
+    Args:
+        status (str): Final status of the hand
+        bet_amount (int): Amount bet
+
+    Returns:
+        float: Winnings, 0 for a push, or the negative bet for a loss
+    """
+    if status == "player_blackjack":
+        return 1.5 * bet_amount  # Blackjack pays 3:2
+    elif status in ["player_win", "dealer_bust"]:
+        return bet_amount  # Win pays 1:1
+    elif status == "push":
+        return 0  # Push returns the bet
+    else:  # dealer_win, player_bust
+        return -bet_amount  # Lose
+
+
+def _final_status(player_score, dealer_score):
+    """Get the status of a standing hand once the dealer has played."""
+    if dealer_score > 21:
+        return "dealer_bust"
+    elif dealer_score > player_score:
+        return "dealer_win"
+    elif dealer_score < player_score:
+        return "player_win"
+    return "push"  # Equal scores
+
+
+class Shoe:
+    """
+    Shuffled cards of one or more decks, dealt by moving an index.
+
+    The cards live in one preallocated buffer that is refilled and shuffled
+    in place, and cards are dealt from its end. Once the cut card is reached
+    the shoe should be reshuffled before the next round; a shoe that runs out
+    mid-round reshuffles itself with the generator it was last shuffled with.
+    """
+
+    def __init__(self, decks=SHOE_DECKS, penetration=SHOE_PENETRATION):
+        """
+        Args:
+            decks (int): Number of 52-card decks
+            penetration (float): Fraction of the shoe dealt before the cut card
+
+        Raises:
+            ValueError: If decks or penetration is out of range
+        """
+        if decks < 1:
+            raise ValueError("A shoe needs at least one deck")
+        if not 0 < penetration <= 1:
+            raise ValueError("Penetration must be in (0, 1]")
+        self.decks = decks
+        self._ordered = bytes(range(DECK_SIZE)) * decks
+        self.cards = bytearray(self._ordered)
+        self.cut = len(self.cards) - int(len(self.cards) * penetration)  # Cards left when the cut card shows
+        self.remaining = 0  # Cards dealt from the end of `cards`; empty until shuffled
+        self.rng = None
+        self.shuffles = 0
+
+    def shuffle(self, rng):
+        """
+        Refill the shoe with every card and shuffle it.
+
+        Args:
+            rng (random.Random): Generator to shuffle with, normally the round
+                that triggered the shuffle, so the shoe can be replayed from its seed
+        """
+        self.cards[:] = self._ordered
+        rng.shuffle(self.cards)
+        self.remaining = len(self.cards)
+        self.rng = rng
+        self.shuffles += 1
+
+    @property
+    def needs_shuffle(self):
+        """Whether the cut card has come out (or the shoe was never shuffled)."""
+        return self.remaining <= self.cut
+
+    def deal(self):
+        """Deal the next card."""
+        if not self.remaining:
+            self.shuffle(self.rng or new_round())
+        self.remaining -= 1
+        return self.cards[self.remaining]
+
+
+class Hand:
+    """Cards in a hand, with the score kept up to date as cards are added."""
+
+    __slots__ = ("cards", "total", "soft_aces")
+
+    def __init__(self, cards=()):
+        self.cards = []
+        self.total = 0
+        self.soft_aces = 0  # Aces still counted as 11
+        for card in cards:
+            self.add(card)
+
+    def add(self, card):
+        """
+        Add a card and update the score.
+
+        Args:
+            card (int): Card to add
+
+        Returns:
+            int: New score
+        """
+        self.cards.append(card)
+        points = CARD_POINTS[card]
+        self.total += points
+        if points == 11:
+            self.soft_aces += 1
+        # Count aces as 1 instead of 11 while the hand is over 21
+        while self.total > 21 and self.soft_aces:
+            self.total -= 10
+            self.soft_aces -= 1
+        return self.total
+
+    @property
+    def score(self):
+        """Best score of the hand."""
+        return self.total
+
+    @property
+    def is_soft(self):
+        """Whether an ace is counted as 11."""
+        return self.soft_aces > 0
+
+    @property
+    def is_blackjack(self):
+        """Whether the hand is a natural 21."""
+        return self.total == 21 and len(self.cards) == 2
+
+    @property
+    def is_bust(self):
+        """Whether the hand is over 21."""
+        return self.total > 21
+
+    def code(self):
+        """Get the cards as plain-text codes, such as "AS 10H", to record a hand."""
+        return " ".join(CARD_CODES[card] for card in self.cards)
+
+    def format(self, hide_second=False):
+        """Format the hand for display, optionally hiding the hole card."""
+        if hide_second and len(self.cards) > 1:
+            return f"{card_label(self.cards[0])} ??"
+        return " ".join(card_label(card) for card in self.cards)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+
+class BlackjackGame:
+    """
+    A single-player blackjack round against the dealer.
+
+    Only the round's ID and seed are kept, not its generator, so a game in
+    progress takes a few hundred bytes.
+    """
+
+    __slots__ = (
+        "player_id", "bet_amount", "round_id", "seed_hex", "player_hand", "dealer_hand", "shoe",
+        "shoe_round", "shoe_position", "status", "channel_id", "message_id", "expires_at",
+    )
+
+    def __init__(self, player_id, bet_amount, rng=None, shoe=None):
+        """
+        Args:
+            player_id (str): Player's user ID
+            bet_amount (int): Amount bet
+            rng (RoundRng, optional): Round RNG, recorded on the game's transactions
+            shoe (Shoe, optional): Shared shoe to deal from; by default the round
+                gets its own single deck shuffled with `rng`
+        """
+        rng = rng or new_round()
+        self.player_id = player_id
+        self.bet_amount = bet_amount
+        self.round_id = getattr(rng, "round_id", None)  # Recorded on the game's transactions
+        self.seed_hex = getattr(rng, "seed_hex", None)
+        self.player_hand = Hand()
+        self.dealer_hand = Hand()
+        self.shoe = shoe or Shoe(decks=1, penetration=1)
+        # Shuffle at the cut card, between rounds, with this round's generator
+        if self.shoe.needs_shuffle:
+            self.shoe.shuffle(rng)
+        self.shoe_round = getattr(self.shoe.rng, "round_id", None)  # Round whose seed shuffled the shoe
+        # Where the initial deal starts; later draws can interleave with other games on the shoe,
+        # so the cards themselves are recorded when the game is settled
+        self.shoe_position = self.shoe.remaining
+        self.status = "active"  # active, player_blackjack, player_bust, dealer_bust, player_win, dealer_win, push
+        # Where the game is shown and when it times out, set by the table that runs it
+        self.channel_id = None
+        self.message_id = None
+        self.expires_at = None
+
+        # Deal initial cards
+        self.player_hand.add(self._deal_card())
+        self.dealer_hand.add(self._deal_card())
+        self.player_hand.add(self._deal_card())
+        self.dealer_hand.add(self._deal_card())
+
+        # Check for player blackjack
+        if self.player_hand.is_blackjack:
+            if self.dealer_hand.is_blackjack:
+                self.status = "push"  # Both have blackjack, push
+            else:
+                self.status = "player_blackjack"  # Player has blackjack
+
+    @classmethod
+    def from_record(cls, record, shoe):
+        """
+        Resume a game in progress from a record made by `to_record`.
+
+        Args:
+            record (dict): Saved game
+            shoe (Shoe): Shoe to deal the rest of the game from
+
+        Returns:
+            BlackjackGame: The game, still active
+        """
+        game = cls.__new__(cls)
+        game.player_id = record["player_id"]
+        game.bet_amount = record["bet_amount"]
+        game.round_id = record["round_id"]
+        game.seed_hex = record["rng_seed"]
+        game.player_hand = Hand(record["player_cards"])
+        game.dealer_hand = Hand(record["dealer_cards"])
+        game.shoe = shoe
+        game.shoe_round = None
+        game.shoe_position = None
+        game.status = "active"
+        game.channel_id = record["channel_id"]
+        game.message_id = record["message_id"]
+        game.expires_at = record["expires_at"]
+        return game
+
+    def to_record(self):
+        """
+        Get the state of a game in progress, to resume it with `from_record`.
+
+        Returns:
+            dict: Player, bet, round, cards as bytes, location and expiry
+        """
+        return {
+            "player_id": self.player_id,
+            "bet_amount": self.bet_amount,
+            "round_id": self.round_id,
+            "rng_seed": self.seed_hex,
+            "player_cards": bytes(self.player_hand.cards),
+            "dealer_cards": bytes(self.dealer_hand.cards),
+            "channel_id": self.channel_id,
+            "message_id": self.message_id,
+            "expires_at": self.expires_at,
+        }
+
+    @property
+    def rng(self):
+        """The round's generator, recreated from its seed for ledger rows (None if unseeded)."""
+        if self.seed_hex is None:
+            return None
+        return RoundRng.from_seed(self.seed_hex, self.round_id)
+
+    def _deal_card(self):
+        """Deal a card from the shoe."""
+        return self.shoe.deal()
+
+    def player_hit(self):
+        """Player takes a hit (draws a card)."""
+        score = self.player_hand.add(self._deal_card())
+        if score > 21:
+            self.status = "player_bust"
+        return score
+
+    def player_stand(self):
+        """Player stands, dealer plays."""
+        player_score = self.player_hand.score
+
+        # Dealer hits until 17 or higher
+        dealer_score = self.dealer_hand.score
+        while dealer_score < DEALER_STAND:
+            dealer_score = self.dealer_hand.add(self._deal_card())
+
+        self.status = _final_status(player_score, dealer_score)
+        return dealer_score
+
+    def get_result(self):
+        """Get the final result of the game."""
+        return payout(self.status, self.bet_amount)
+
+    def dealer_showing(self):
+        """Score of the dealer's up card."""
+        return CARD_POINTS[self.dealer_hand.cards[0]]
+
+
+class Seat:
+    """A player's place and hand at a blackjack table."""
+
+    __slots__ = ("player_id", "username", "bet_amount", "hand", "status")
+
+    def __init__(self, player_id, username, bet_amount):
+        self.player_id = player_id
+        self.username = username
+        self.bet_amount = bet_amount
+        self.hand = Hand()
+        self.status = "waiting"  # waiting, active, stood, then a final BlackjackGame status
+
+    def get_result(self):
+        """Get the final result of the seat's hand."""
+        return payout(self.status, self.bet_amount)
+
+
+class BlackjackTable:
+    """
+    One round of blackjack for several players against a single dealer hand.
+
+    Players take seats while the table is open. The round is then dealt from
+    the table's shoe a card to each seat and the dealer at a time, seats play
+    their hands in turn, and the dealer plays once for every hand still
+    standing. Hands pay out as in `BlackjackGame`.
+    """
+
+    def __init__(self, shoe, seats=TABLE_SEATS, rng=None):
+        """
+        Args:
+            shoe (Shoe): Shoe the table deals from
+            seats (int): Most players that can sit at the table
+            rng (RoundRng, optional): Round RNG, recorded on the round's transactions
+        """
+        self.shoe = shoe
+        self.max_seats = seats
+        self.rng = rng or new_round()
+        self.seats = []
+        self.dealer_hand = Hand()
+        self.turn = None  # Index of the seat to act, None when no one can
+        self.status = "open"  # open, playing, finished
+        self.shoe_round = None
+        self.shoe_position = None
+        # Where the table is shown, set by whoever runs it
+        self.channel_id = None
+        self.message_id = None
+
+    @property
+    def is_full(self):
+        """Whether every seat is taken."""
+        return len(self.seats) >= self.max_seats
+
+    @property
+    def current(self):
+        """The seat whose turn it is, or None."""
+        return self.seats[self.turn] if self.turn is not None else None
+
+    def dealer_showing(self):
+        """Score of the dealer's up card."""
+        return CARD_POINTS[self.dealer_hand.cards[0]]
+
+    def seat_of(self, player_id):
+        """Get a player's seat, or None if they aren't at the table."""
+        for seat in self.seats:
+            if seat.player_id == player_id:
+                return seat
+        return None
+
+    def sit(self, player_id, username, bet_amount):
+        """
+        Seat a player for the next round.
+
+        Args:
+            player_id (str): Player's user ID
+            username (str): Player's name, for display and the ledger
+            bet_amount (int): Amount bet
+
+        Returns:
+            Seat: The player's seat
+
+        Raises:
+            ValueError: If the round has started, the table is full or the player is already seated
+        """
+        if self.status != "open":
+            raise ValueError("This table's round has already started.")
+        if self.seat_of(player_id):
+            raise ValueError("You already have a seat at this table.")
+        if self.is_full:
+            raise ValueError("This table is full.")
+        seat = Seat(player_id, username, bet_amount)
+        self.seats.append(seat)
+        return seat
+
+    def leave(self, player_id):
+        """Remove a player from the table before the round is dealt."""
+        if self.status != "open":
+            raise ValueError("This table's round has already started.")
+        self.seats = [seat for seat in self.seats if seat.player_id != player_id]
+
+    def deal(self):
+        """
+        Deal the round and settle naturals.
+
+        Raises:
+            ValueError: If the round was already dealt or no one is seated
+        """
+        if self.status != "open":
+            raise ValueError("This table's round has already started.")
+        if not self.seats:
+            raise ValueError("No one is seated at this table.")
+
+        # Shuffle at the cut card, between rounds, with this round's generator
+        if self.shoe.needs_shuffle:
+            self.shoe.shuffle(self.rng)
+        self.shoe_round = getattr(self.shoe.rng, "round_id", None)
+        self.shoe_position = self.shoe.remaining
+        self.status = "playing"
+
+        # A card to each seat then the dealer, twice
+        for _ in range(2):
+            for seat in self.seats:
+                seat.hand.add(self.shoe.deal())
+            self.dealer_hand.add(self.shoe.deal())
+
+        for seat in self.seats:
+            if seat.hand.is_blackjack:
+                seat.status = "push" if self.dealer_hand.is_blackjack else "player_blackjack"
+            else:
+                seat.status = "active"
+        self._advance(0)
+
+    def _check_turn(self, player_id):
+        """Get the acting player's seat, checking it's their turn."""
+        seat = self.current
+        if seat is None or seat.player_id != player_id:
+            raise ValueError("It's not your turn!")
+        return seat
+
+    def hit(self, player_id):
+        """
+        The seat whose turn it is draws a card.
+
+        Args:
+            player_id (str): Player acting
+
+        Returns:
+            int: New score of the player's hand
+
+        Raises:
+            ValueError: If it isn't the player's turn
+        """
+        seat = self._check_turn(player_id)
+        score = seat.hand.add(self.shoe.deal())
+        if score > 21:
+            seat.status = "player_bust"
+            self._advance(self.turn + 1)
+        return score
+
+    def stand(self, player_id):
+        """
+        The seat whose turn it is stands, passing the turn on.
+
+        Args:
+            player_id (str): Player acting
+
+        Raises:
+            ValueError: If it isn't the player's turn
+        """
+        seat = self._check_turn(player_id)
+        seat.status = "stood"
+        self._advance(self.turn + 1)
+
+    def _advance(self, start):
+        """Pass the turn to the next seat still playing, or finish the round."""
+        for index in range(start, len(self.seats)):
+            if self.seats[index].status == "active":
+                self.turn = index
+                return
+        self.turn = None
+        self._finish()
+
+    def _finish(self):
+        """Play the dealer's hand against every standing seat."""
+        standing = [seat for seat in self.seats if seat.status == "stood"]
+        if standing:
+            # Dealer hits until 17 or higher
+            dealer_score = self.dealer_hand.score
+            while dealer_score < DEALER_STAND:
+                dealer_score = self.dealer_hand.add(self.shoe.deal())
+            for seat in standing:
+                seat.status = _final_status(seat.hand.score, dealer_score)
+        self.status = "finished"
@@ -0,0 +1,328 @@
+"""
+Monte Carlo expected value of /blackjack under different player strategies.
+
+The simulator plays the rules of `BlackjackGame` exactly: a shoe dealt to the
+cut card, player and dealer dealt alternately, a player natural paying 3:2 (or
+pushing against a dealer natural), no dealer peek, hit or stand only, the
+dealer drawing to 17 and standing on soft 17, and ties pushing. Hands are
+played in chunks across a process pool, each chunk with its own shoe and
+seed, and the outcome counts give the EV per unit bet with a confidence
+interval. Hands dealt from the same shoe aren't independent, so the interval
+comes from the spread between chunks (batch means), which are.
+
+Run this module directly to report every strategy:
+    python -m utils.blackjack_sim [--hands 10000000] [--strategies basic,stand] [--workers 4]
+"""
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.blackjack import CARD_POINTS, DEALER_STAND, SHOE_DECKS, SHOE_PENETRATION, BlackjackGame, Shoe
+from utils.rng import derive_seed
+
+# Hand outcomes and what each pays per unit bet
+OUTCOMES = {
+    "blackjack": 1.5,
+    "win": 1.0,
+    "dealer_bust": 1.0,
+    "push": 0.0,
+    "loss": -1.0,
+    "bust": -1.0,
+}
+
+# Hands per chunk. Chunks are the batches of the confidence interval, so a run
+# needs a few dozen of them for the normal approximation to hold.
+CHUNK_HANDS = 100_000
+Z_95 = 1.959964
+
+
+def basic_strategy(total, soft, up):
+    """Hit/stand basic strategy for these rules (no doubling, splitting or surrender)."""
+    if soft:
+        return total <= 17 or (total == 18 and up >= 9)
+    if total <= 11:
+        return True
+    if total == 12:
+        return not 4 <= up <= 6
+    if total <= 16:
+        return up >= 7
+    return False
+
+
+def stand_strategy(total, soft, up):
+    """Never hit, which is what the timeout auto-stand plays for an idle player."""
+    return False
+
+
+def mimic_strategy(total, soft, up):
+    """Play like the dealer: hit below 17, stand on soft 17."""
+    return total < DEALER_STAND
+
+
+STRATEGIES = {
+    "basic": basic_strategy,
+    "stand": stand_strategy,
+    "mimic": mimic_strategy,
+}
+
+
+def _hit_table(strategy):
+    """Precompute a strategy as hit[soft * 32 + total][up card points]."""
+    return [
+        [strategy(total, soft, up) for up in range(12)]
+        for soft in (False, True) for total in range(32)
+    ]
+
+
+def simulate(hands, strategy, rng, decks=SHOE_DECKS, penetration=SHOE_PENETRATION):
+    """
+    Play hands of blackjack from one shoe.
+
+    Args:
+        hands (int): Number of hands to play
+        strategy (str): Key of STRATEGIES
+        rng (random.Random): Generator the shoe is shuffled with
+        decks (int): Decks in the shoe
+        penetration (float): Fraction of the shoe dealt before reshuffling
+
+    Returns:
+        dict: Number of hands ending in each of OUTCOMES
+    """
+    hit = _hit_table(STRATEGIES[strategy])
+    points = CARD_POINTS
+    shoe = Shoe(decks, penetration)
+    deal = shoe.deal
+    blackjacks = wins = dealer_busts = pushes = losses = busts = 0
+
+    for _ in range(hands):
+        if shoe.remaining <= shoe.cut:
+            shoe.shuffle(rng)
+
+        # Deal player, dealer, player, dealer
+        p1, d1, p2, d2 = points[deal()], points[deal()], points[deal()], points[deal()]
+        player = p1 + p2
+        player_soft = (p1 == 11) + (p2 == 11)
+        if player > 21:
+            player -= 10
+            player_soft -= 1
+        dealer = d1 + d2
+        dealer_soft = (d1 == 11) + (d2 == 11)
+        if dealer > 21:
+            dealer -= 10
+            dealer_soft -= 1
+
+        if player == 21:
+            if dealer == 21:
+                pushes += 1
+            else:
+                blackjacks += 1
+            continue
+
+        # Player's turn
+        while hit[(player_soft > 0) * 32 + player][d1]:
+            card = points[deal()]
+            player += card
+            if card == 11:
+                player_soft += 1
+            while player > 21 and player_soft:
+                player -= 10
+                player_soft -= 1
+            if player > 21:
+                break
+        if player > 21:
+            busts += 1
+            continue
+
+        # Dealer's turn
+        while dealer < DEALER_STAND:
+            card = points[deal()]
+            dealer += card
+            if card == 11:
+                dealer_soft += 1
+            while dealer > 21 and dealer_soft:
+                dealer -= 10
+                dealer_soft -= 1
+
+        if dealer > 21:
+            dealer_busts += 1
+        elif dealer > player:
+            losses += 1
+        elif dealer < player:
+            wins += 1
+        else:
+            pushes += 1
+
+    return {
+        "blackjack": blackjacks,
+        "win": wins,
+        "dealer_bust": dealer_busts,
+        "push": pushes,
+        "loss": losses,
+        "bust": busts,
+    }
+
+
+def simulate_with_engine(hands, strategy, rng, decks=SHOE_DECKS, penetration=SHOE_PENETRATION):
+    """
+    Play hands through BlackjackGame itself; slow, used to check `simulate`.
+
+    Given generators in the same state, this returns the same counts as
+    `simulate`.
+    """
+    hit = STRATEGIES[strategy]
+    statuses = {"player_blackjack": "blackjack", "player_win": "win", "dealer_win": "loss", "player_bust": "bust"}
+    shoe = Shoe(decks, penetration)
+    counts = dict.fromkeys(OUTCOMES, 0)
+    for _ in range(hands):
+        game = BlackjackGame(None, 1, rng, shoe)
+        up = CARD_POINTS[game.dealer_hand.cards[0]]
+        while game.status == "active" and hit(game.player_hand.score, game.player_hand.is_soft, up):
+            game.player_hit()
+        if game.status == "active":
+            game.player_stand()
+        counts[statuses.get(game.status, game.status)] += 1
+    return counts
+
+
+def _run_chunk(hands, strategy, seed, chunk, decks, penetration):
+    """Simulate one chunk in a worker process with its own seeded generator."""
+    return simulate(hands, strategy, random.Random(derive_seed(seed, strategy, chunk)), decks, penetration)
+
+
+def _returns(counts):
+    """Get the total return of a set of outcome counts."""
+    return sum(OUTCOMES[name] * count for name, count in counts.items())
+
+
+def summarize(chunks):
+    """
+    Get the EV and its confidence interval from per-chunk outcome counts.
+
+    The standard error is estimated from how far each chunk's mean strays from
+    the overall EV, weighted by chunk size. A single chunk has no spread to
+    measure, so its interval treats the hands as independent and comes out
+    too narrow.
+
+    Args:
+        chunks (list): Outcome counts of each chunk
+
+    Returns:
+        dict: hands, batches, ev, stderr, ci95 (low, high) and the rate of each outcome
+
+    Raises:
+        ValueError: If no hands were played
+    """
+    counts = dict.fromkeys(OUTCOMES, 0)
+    for chunk in chunks:
+        for name, count in chunk.items():
+            counts[name] += count
+    hands = sum(counts.values())
+    if hands <= 0:
+        raise ValueError("No hands to summarize")
+
+    ev = _returns(counts) / hands
+    batches = len(chunks)
+    if batches > 1:
+        deviations = sum((_returns(chunk) - sum(chunk.values()) * ev) ** 2 for chunk in chunks)
+        stderr = math.sqrt(deviations * batches / (batches - 1)) / hands
+    else:
+        second_moment = sum(OUTCOMES[name] ** 2 * count for name, count in counts.items()) / hands
+        stderr = math.sqrt(max(second_moment - ev * ev, 0.0) / hands)
+    return {
+        "hands": hands,
+        "batches": batches,
+        "ev": ev,
+        "stderr": stderr,
+        "ci95": (ev - Z_95 * stderr, ev + Z_95 * stderr),
+        "rates": {name: count / hands for name, count in counts.items()},
+    }
+
+
+def run(hands, strategies, workers=None, seed=0, decks=SHOE_DECKS, penetration=SHOE_PENETRATION,
+        chunk_hands=CHUNK_HANDS):
+    """
+    Simulate strategies across a process pool.
+
+    Args:
+        hands (int): Hands per strategy
+        strategies (list): Keys of STRATEGIES
+        workers (int, optional): Worker processes, defaults to the CPU count
+        seed (int): Base seed; each chunk derives its own from it
+        decks (int): Decks in the shoe
+        penetration (float): Fraction of the shoe dealt before reshuffling
+        chunk_hands (int): Hands per task, and per batch of the confidence interval
+
+    Returns:
+        dict: Strategy -> summarize() result
+
+    Raises:
+        ValueError: If hands or chunk_hands isn't positive, or a strategy is unknown
+    """
+    if hands <= 0:
+        raise ValueError("Hands must be positive")
+    if chunk_hands <= 0:
+        raise ValueError("Chunk size must be positive")
+    for strategy in strategies:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy}")
+
+    chunks = [min(chunk_hands, hands - start) for start in range(0, hands, chunk_hands)]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = {
+            strategy: [
+                executor.submit(_run_chunk, size, strategy, seed, i, decks, penetration)
+                for i, size in enumerate(chunks)
+            ]
+            for strategy in strategies
+        }
+        results = {}
+        for strategy, chunk_futures in futures.items():
+            results[strategy] = summarize([future.result() for future in chunk_futures])
+    return results
+
+
+def format_report(results):
+    """Format simulation results as a text table."""
+    lines = [f"{'strategy':<10}{'EV':>10}{'95% CI':>24}{'win':>9}{'push':>9}{'loss':>9}{'bj':>8}"]
+    for strategy, summary in results.items():
+        rates = summary["rates"]
+        low, high = summary["ci95"]
+        lines.append(
+            f"{strategy:<10}{summary['ev']:>10.4%}{f'[{low:.4%}, {high:.4%}]':>24}"
+            f"{rates['win'] + rates['dealer_bust']:>9.2%}{rates['push']:>9.2%}"
+            f"{rates['loss'] + rates['bust']:>9.2%}{rates['blackjack']:>8.2%}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hands", type=int, default=10_000_000, help="Hands per strategy")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES), help="Comma-separated strategies")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--decks", type=int, default=SHOE_DECKS, help="Decks in the shoe")
+    parser.add_argument("--penetration", type=float, default=SHOE_PENETRATION, help="Fraction dealt before reshuffling")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed")
+    parser.add_argument("--chunk", type=int, default=CHUNK_HANDS, help="Hands per worker task")
+    args = parser.parse_args()
+
+    strategies = args.strategies.split(",")
+    start = time.perf_counter()
+    results = run(args.hands, strategies, args.workers, args.seed, args.decks, args.penetration, args.chunk)
+    elapsed = time.perf_counter() - start
+
+    batches = math.ceil(args.hands / args.chunk)
+    print(f"{args.hands:,} hands per strategy in {batches} batches, {args.decks} decks, "
+          f"{args.penetration:.0%} penetration")
+    print(format_report(results))
+    if "basic" in results and "stand" in results:
+        cost = results["basic"]["ev"] - results["stand"]["ev"]
+        print(f"Timeout auto-stand costs {cost:.2%} of the bet against basic strategy")
+    print(f"{args.hands * len(strategies) / elapsed:,.0f} hands/s")
+
+
+if __name__ == "__main__":
+    main()
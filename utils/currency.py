@@ -3,6 +3,12 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Words that bet the whole balance
+MAX_BET_WORDS = frozenset(['m', 'max', 'a', 'all', 'allin', 'all-in'])
+
+# Amounts like 100, 1k or 2.5m
+BET_PATTERN = re.compile(r'^(\d+(\.\d+)?)([kmb])?$')
+
 def parse_bet(bet_str, max_balance):
     """
     Parse a bet string into a numeric value.
@@ -17,20 +23,15 @@ def parse_bet(bet_str, max_balance):
     Raises:
         ValueError: If bet string is invalid
     """
-    # Handle "max" or "m" bet
-    if bet_str.lower() in ['m', 'max']:
-        return max_balance
-    
-    # Handle "all" or "a" bet
-    if bet_str.lower() in ['a', 'all', 'allin', 'all-in']:
+    # Handle "max"/"m" or "all"/"a" bet
+    if bet_str.lower() in MAX_BET_WORDS:
         return max_balance
     
     # Handle numeric values with suffixes (e.g., 1k, 2.5m)
     bet_str = bet_str.lower().strip()
     
     # Match pattern like 1k, 2.5m, 100, etc.
-    pattern = r'^(\d+(\.\d+)?)([kmb])?$'
-    match = re.match(pattern, bet_str)
+    match = BET_PATTERN.match(bet_str)
     
     if not match:
         raise ValueError("Invalid bet format. Use a number, or 'm'/'max' for maximum bet.")
@@ -49,6 +50,37 @@ def parse_bet(bet_str, max_balance):
     # Convert to integer (floor value)
     return int(amount)
 
+def validate_bet(bet_str, balance):
+    """
+    Parse a bet and check the player can place it.
+    
+    Shared by the slash, text and mention commands so they accept the same
+    bets and refuse them with the same messages.
+    
+    Args:
+        bet_str (str): Bet string to parse
+        balance (int): Player's current balance
+        
+    Returns:
+        int: Bet amount
+        
+    Raises:
+        ValueError: If the bet can't be placed, with the message to show the player
+    """
+    try:
+        bet_amount = parse_bet(bet_str, balance)
+    except ValueError as e:
+        raise ValueError(f"Error: {str(e)}") from e
+    
+    # Check if bet is valid
+    if bet_amount <= 0:
+        raise ValueError("Bet amount must be greater than 0.")
+    
+    if bet_amount > balance:
+        raise ValueError(f"You don't have enough funds! Your balance is {format_currency(balance)}.")
+    
+    return bet_amount
+
 def format_currency(amount):
     """
     Format a currency amount with appropriate suffix.
@@ -4,7 +4,7 @@ Contains functions to interact with the database models.
 """
 import logging
 from datetime import datetime
-from models import db, User, Transaction
+from models import db, User, Transaction, GuildSettings, ActiveBlackjackGame
 
 logger = logging.getLogger(__name__)
 
@@ -49,7 +49,7 @@ def get_user_balance(user_id):
     
     return user.balance
 
-def update_user_balance(user_id, username, amount, game_type, details=None):
+def update_user_balance(user_id, username, amount, game_type, details=None, rng=None):
     """
     Update user balance and record the transaction.
     
@@ -59,6 +59,7 @@ def update_user_balance(user_id, username, amount, game_type, details=None):
         amount (int): Amount to add (positive) or subtract (negative)
         game_type (str): Type of game or transaction
         details (str, optional): Additional details about transaction
+        rng (RoundRng, optional): Game round RNG to record on the transaction
         
     Returns:
         int: New balance
@@ -70,11 +71,57 @@ def update_user_balance(user_id, username, amount, game_type, details=None):
     db.session.commit()
     
     # Record transaction
-    add_transaction(user_id, amount, game_type, details)
+    add_transaction(user_id, amount, game_type, details, rng)
     
     return user.balance
 
-def add_transaction(user_id, amount, game_type, details=None):
+def apply_balance_changes(changes, game_type, rng=None):
+    """
+    Update several users' balances and record the transactions in one commit.
+    
+    Debits that would take a balance below zero are skipped, so stakes can be
+    taken for a whole table at once without a separate balance check.
+    
+    Args:
+        changes (list): Dicts with user_id, username, amount and details
+        game_type (str): Type of game or transaction
+        rng (RoundRng, optional): Game round RNG to record on the transactions
+        
+    Returns:
+        dict: New balance by user ID, for the changes that were applied
+    """
+    user_ids = [change["user_id"] for change in changes]
+    users = {user.id: user for user in User.query.filter(User.id.in_(user_ids))}
+    
+    balances = {}
+    for change in changes:
+        user = users.get(change["user_id"])
+        if not user:
+            user = users[change["user_id"]] = get_or_create_user(change["user_id"], change["username"])
+        if change["amount"] < 0 and user.balance + change["amount"] < 0:
+            continue
+        
+        user.balance += change["amount"]
+        db.session.add(Transaction(
+            user_id=user.id,
+            amount=change["amount"],
+            game_type=game_type,
+            details=change.get("details"),
+            round_id=rng.round_id if rng else None,
+            rng_seed=rng.seed_hex if rng else None,
+            paytable_digest=rng.paytable_digest if rng else None
+        ))
+        balances[user.id] = user.balance
+    
+    try:
+        db.session.commit()
+    except Exception:
+        # Leave the session usable, e.g. for a refund
+        db.session.rollback()
+        raise
+    return balances
+
+def add_transaction(user_id, amount, game_type, details=None, rng=None):
     """
     Add a transaction record to the database.
     
@@ -83,12 +130,17 @@ def add_transaction(user_id, amount, game_type, details=None):
         amount (int): Amount of transaction
         game_type (str): Type of game or transaction
         details (str, optional): Additional details about transaction
+        rng (RoundRng, optional): Game round RNG whose round ID, seed and paytable
+            digest are recorded
     """
     transaction = Transaction(
         user_id=user_id, 
         amount=amount, 
         game_type=game_type,
-        details=details
+        details=details,
+        round_id=rng.round_id if rng else None,
+        rng_seed=rng.seed_hex if rng else None,
+        paytable_digest=rng.paytable_digest if rng else None
     )
     
     db.session.add(transaction)
@@ -125,6 +177,96 @@ def get_leaderboard(limit=10):
 
 # Function removed to fix duplicate declaration
 
+def get_guild_settings(guild_id):
+    """
+    Get the settings for a guild.
+    
+    Args:
+        guild_id (str): Discord guild ID
+        
+    Returns:
+        GuildSettings: Settings object, or None if the guild has never changed any
+    """
+    return GuildSettings.query.get(guild_id)
+
+def set_guild_slots_format(guild_id, slots_format):
+    """
+    Set the animated slots output format for a guild.
+    
+    Args:
+        guild_id (str): Discord guild ID
+        slots_format (str): Format key, or None to use the global default
+        
+    Returns:
+        GuildSettings: Updated settings object
+    """
+    settings = GuildSettings.query.get(guild_id)
+    
+    if not settings:
+        settings = GuildSettings(guild_id=guild_id)
+        db.session.add(settings)
+    
+    settings.slots_format = slots_format
+    db.session.commit()
+    
+    return settings
+
+def save_blackjack_game(record):
+    """
+    Save a blackjack game in progress, replacing the player's previous save.
+    
+    Args:
+        record (dict): Game record from BlackjackGame.to_record(), with
+            channel_id and message_id as ints and expires_at as a UTC timestamp
+    """
+    row = ActiveBlackjackGame.query.get(record["player_id"])
+    if not row:
+        row = ActiveBlackjackGame(player_id=record["player_id"])
+        db.session.add(row)
+    
+    row.channel_id = str(record["channel_id"])
+    row.message_id = str(record["message_id"]) if record["message_id"] else None
+    row.bet_amount = record["bet_amount"]
+    row.round_id = record["round_id"]
+    row.rng_seed = record["rng_seed"]
+    row.player_cards = record["player_cards"]
+    row.dealer_cards = record["dealer_cards"]
+    row.expires_at = datetime.utcfromtimestamp(record["expires_at"])
+    db.session.commit()
+
+def delete_blackjack_game(player_id):
+    """
+    Delete a player's saved blackjack game once it's over.
+    
+    Args:
+        player_id (str): Discord user ID
+    """
+    ActiveBlackjackGame.query.filter_by(player_id=player_id).delete()
+    db.session.commit()
+
+def get_active_blackjack_games():
+    """
+    Get every saved blackjack game.
+    
+    Returns:
+        list: Game records in the form BlackjackGame.from_record() takes
+    """
+    return [
+        {
+            "player_id": row.player_id,
+            "channel_id": int(row.channel_id),
+            "message_id": int(row.message_id) if row.message_id else None,
+            "bet_amount": row.bet_amount,
+            "round_id": row.round_id,
+            "rng_seed": row.rng_seed,
+            "player_cards": row.player_cards,
+            "dealer_cards": row.dealer_cards,
+            "expires_at": (row.expires_at - datetime(1970, 1, 1)).total_seconds(),
+        }
+        for row in ActiveBlackjackGame.query.all()
+    ]
+
+
 def check_daily_reward(user_id, username):
     """
     Check if user can claim daily reward and process it if possible.
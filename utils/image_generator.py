@@ -1,4 +1,9 @@
+import functools
+import hashlib
+import json
 import os
+from typing import NamedTuple
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 import logging
 
@@ -7,8 +12,17 @@ logger = logging.getLogger(__name__)
 # Define constants
 SYMBOL_SIZE = 180
 REEL_WIDTH = 200
+REEL_BLOCKS = 6  # Times the full symbol sequence repeats on the reel strip
 BACKGROUND_COLOR = (40, 40, 40, 255)  # Dark gray background
 
+# Shared 256-colour GIF palette: quantized reel and facade colours, then two reserved entries
+PALETTE_COLORS = 254
+PALETTE_BACKGROUND_INDEX = 254
+PALETTE_TRANSPARENT_INDEX = 255
+# Max coverage quantizes the artwork with less error than median cut, and its
+# flatter colour areas make the GIF's LZW runs longer
+PALETTE_METHOD = Image.Quantize.MAXCOVERAGE
+
 # These colors are fallbacks in case images aren't available
 SYMBOL_COLORS = {
     "SEVEN": (255, 0, 0, 255),     # Red
@@ -22,41 +36,382 @@ SYMBOL_COLORS = {
     "CHERRY": (139, 0, 0, 255),    # Dark red
 }
 
-def generate_slots_assets():
-    """Generate all required slot machine assets."""
-    assets_dir = os.path.join("assets", "slots")
-    os.makedirs(assets_dir, exist_ok=True)
+# Bump when a generator changes its output for the same inputs
+ASSET_BUILD_VERSION = 1
+SYMBOLS_DIR = os.path.join("assets", "slot_symbols")
+SYMBOL_IMAGE_SIZE = SYMBOL_SIZE - 40  # Symbol art size on the reel, leaving some padding
+ATLAS_COLUMNS = 3
+
+def _file_digest(path):
+    """Get the SHA-256 of a file, or None if it doesn't exist."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+def _inputs_digest(inputs):
+    """Get the SHA-256 of a JSON-serializable description of a build's inputs."""
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+class SymbolAtlas(NamedTuple):
+    """Slot symbol art decoded once from the sprite atlas, sliced into tiles by offset."""
+    image: Image.Image
+    tiles: dict        # Symbol key -> (x, y) of its tile
+    tile_size: int
+    
+    def tile(self, symbol_key):
+        """Get a symbol's RGBA tile, or None if the symbol has no art."""
+        offset = self.tiles.get(symbol_key)
+        if offset is None:
+            return None
+        x, y = offset
+        return self.image.crop((x, y, x + self.tile_size, y + self.tile_size))
+
+def build_symbol_atlas(symbols_dir=SYMBOLS_DIR):
+    """
+    Pack the symbol images into one sprite atlas, if any of them changed.
     
-    # Create reel image
-    reel_path = os.path.join(assets_dir, "reel.png")
-    facade_path = os.path.join(assets_dir, "facade.png")
+    Each symbol's art is resized once to SYMBOL_IMAGE_SIZE and placed on a
+    grid in `atlas.png`. `atlas.json` maps symbol keys to tile offsets and
+    records the hash of each source image; symbols without a source image are
+    left out and drawn as their emoji instead.
     
-    if not os.path.exists(reel_path):
-        _generate_reel_image(reel_path)
-        logger.info(f"Generated reel image at {reel_path}")
+    Args:
+        symbols_dir (str, optional): Directory with the symbol images
+        
+    Returns:
+        dict: The atlas index
+    """
+    from utils.slots import SYMBOLS
+    atlas_path = os.path.join(symbols_dir, "atlas.png")
+    index_path = os.path.join(symbols_dir, "atlas.json")
     
-    if not os.path.exists(facade_path):
-        _generate_facade_image(facade_path)
-        logger.info(f"Generated facade image at {facade_path}")
+    sources = {}
+    for symbol_key, symbol_data in SYMBOLS.items():
+        digest = _file_digest(os.path.join(symbols_dir, symbol_data["file"]))
+        if digest is not None:
+            sources[symbol_key] = digest
     
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        index = {}
+    if (index.get("version") == ASSET_BUILD_VERSION and index.get("tile_size") == SYMBOL_IMAGE_SIZE
+            and {key: tile["sha256"] for key, tile in index.get("tiles", {}).items()} == sources
+            and index.get("sha256") == _file_digest(atlas_path)):
+        return index
+    
+    rows = max(-(-len(sources) // ATLAS_COLUMNS), 1)
+    atlas = Image.new('RGBA', (ATLAS_COLUMNS * SYMBOL_IMAGE_SIZE, rows * SYMBOL_IMAGE_SIZE), (0, 0, 0, 0))
+    tiles = {}
+    for i, (symbol_key, digest) in enumerate(sources.items()):
+        x = (i % ATLAS_COLUMNS) * SYMBOL_IMAGE_SIZE
+        y = (i // ATLAS_COLUMNS) * SYMBOL_IMAGE_SIZE
+        with Image.open(os.path.join(symbols_dir, SYMBOLS[symbol_key]["file"])) as symbol_img:
+            symbol_img = symbol_img.convert("RGBA").resize((SYMBOL_IMAGE_SIZE, SYMBOL_IMAGE_SIZE), Image.LANCZOS)
+        atlas.paste(symbol_img, (x, y))
+        tiles[symbol_key] = {"x": x, "y": y, "sha256": digest}
+    atlas.save(atlas_path)
+    
+    index = {
+        "version": ASSET_BUILD_VERSION,
+        "tile_size": SYMBOL_IMAGE_SIZE,
+        "tiles": tiles,
+        "sha256": _file_digest(atlas_path),
+    }
+    with open(index_path, "w") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+        f.write("\n")
+    load_symbol_atlas.cache_clear()
+    logger.info(f"Packed {len(tiles)} slot symbols into {atlas_path}")
+    return index
+
+@functools.lru_cache(maxsize=None)
+def load_symbol_atlas(symbols_dir=SYMBOLS_DIR):
+    """
+    Decode the symbol sprite atlas once for every renderer.
+    
+    Args:
+        symbols_dir (str, optional): Directory with atlas.png and atlas.json
+        
+    Returns:
+        SymbolAtlas: Decoded atlas, with no tiles if it hasn't been built
+    """
+    try:
+        with open(os.path.join(symbols_dir, "atlas.json")) as f:
+            index = json.load(f)
+        with Image.open(os.path.join(symbols_dir, "atlas.png")) as atlas:
+            image = atlas.convert("RGBA")
+    except FileNotFoundError:
+        logger.warning(f"No slot symbol atlas in {symbols_dir}, symbols are drawn as emoji")
+        return SymbolAtlas(Image.new('RGBA', (0, 0)), {}, SYMBOL_IMAGE_SIZE)
+    tiles = {key: (tile["x"], tile["y"]) for key, tile in index["tiles"].items()}
+    return SymbolAtlas(image, tiles, index["tile_size"])
+
+def _reel_inputs(atlas_index):
+    """Describe everything the reel image is built from, in paytable reel order."""
+    from utils.paytable import get_paytable
+    from utils.slots import SYMBOLS
+    symbols = []
+    for symbol_key in get_paytable().symbols:
+        symbol_data = SYMBOLS[symbol_key]
+        tile = atlas_index["tiles"].get(symbol_key)
+        symbols.append({
+            "key": symbol_key,
+            "file": tile["sha256"] if tile else None,
+            "emoji": symbol_data.get("emoji", "?"),
+            "color": SYMBOL_COLORS.get(symbol_key),
+        })
     return {
-        "reel": reel_path,
-        "facade": facade_path
+        "version": ASSET_BUILD_VERSION,
+        "symbols": symbols,
+        "size": [SYMBOL_SIZE, REEL_WIDTH, REEL_BLOCKS],
+        "background": BACKGROUND_COLOR,
     }
 
-def _generate_reel_image(output_path):
-    """Generate the slot machine reel image with all symbols."""
-    # Get symbols from slots module
-    from utils.slots import PAYOUTS, SYMBOLS
-    symbol_keys = list(PAYOUTS.keys())
+def _facade_inputs():
+    """Describe everything the facade image is built from."""
+    return {"version": ASSET_BUILD_VERSION, "size": [SYMBOL_SIZE, REEL_WIDTH]}
+
+def generate_slots_assets(assets_dir=os.path.join("assets", "slots")):
+    """
+    Build the slot machine assets, rebuilding only those whose inputs changed.
     
-    # Calculate reel height (symbols repeated in blocks of 6)
-    num_blocks = 6
-    reel_height = SYMBOL_SIZE * len(symbol_keys) * num_blocks
+    `manifest.json` in the assets directory records a hash of each build's
+    inputs (symbol images, colors, sizes and paytable reel order) and of each
+    output file. An output is rebuilt when its inputs hash differs or the file
+    is missing or was modified; the palette images are rebuilt whenever the
+    reel or facade is. The symbol sprite atlas is brought up to date first.
     
-    # Create a new image for the reel
-    reel = Image.new('RGBA', (REEL_WIDTH, reel_height), BACKGROUND_COLOR)
-    draw = ImageDraw.Draw(reel)
+    Args:
+        assets_dir (str, optional): Directory for the generated images
+        
+    Returns:
+        dict: Paths of the reel, facade and their palette versions
+    """
+    os.makedirs(assets_dir, exist_ok=True)
+    paths = {name: os.path.join(assets_dir, f"{name}.png") for name in ("reel", "facade", "reel_p", "facade_p")}
+    manifest_path = os.path.join(assets_dir, "manifest.json")
+    
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+    
+    atlas_index = build_symbol_atlas()
+    inputs = {
+        "reel": _inputs_digest(_reel_inputs(atlas_index)),
+        "facade": _inputs_digest(_facade_inputs()),
+        "palette": _inputs_digest({"version": ASSET_BUILD_VERSION, "colors": PALETTE_COLORS, "method": PALETTE_METHOD.name}),
+    }
+    
+    def is_stale(build, outputs):
+        if manifest.get("inputs", {}).get(build) != inputs[build]:
+            return True
+        recorded = manifest.get("outputs", {})
+        return any(recorded.get(name) is None or recorded[name] != _file_digest(paths[name]) for name in outputs)
+    
+    built = []
+    if is_stale("reel", ["reel"]):
+        _generate_reel_image(paths["reel"])
+        built.append("reel")
+    if is_stale("facade", ["facade"]):
+        _generate_facade_image(paths["facade"])
+        built.append("facade")
+    if built or is_stale("palette", ["reel_p", "facade_p"]):
+        _generate_palette_images(paths["reel"], paths["facade"], paths["reel_p"], paths["facade_p"])
+        built.append("palette")
+    
+    if built:
+        manifest = {
+            "inputs": inputs,
+            "outputs": {name: _file_digest(path) for name, path in paths.items()},
+        }
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+            f.write("\n")
+        logger.info(f"Rebuilt slots assets ({', '.join(built)}) in {assets_dir}")
+    
+    return paths
+
+class SlotsAssets(NamedTuple):
+    """Decoded slot machine assets, held as immutable pixel buffers."""
+    reel_size: tuple
+    reel_data: bytes        # RGBA
+    facade_size: tuple
+    facade_data: bytes      # RGBA
+    palette: bytes          # Shared RGB palette, 256 entries
+    reel_indices: bytes     # Reel pixels as palette indices
+    facade_indices: bytes   # Facade pixels as palette indices
+    
+    def reel(self):
+        """Get a read-only image view of the reel strip (no copy, no decoding)."""
+        return Image.frombuffer('RGBA', self.reel_size, self.reel_data, 'raw', 'RGBA', 0, 1)
+    
+    def facade(self):
+        """Get a read-only image view of the facade (no copy, no decoding)."""
+        return Image.frombuffer('RGBA', self.facade_size, self.facade_data, 'raw', 'RGBA', 0, 1)
+    
+    def reel_p(self):
+        """Get a read-only palette-mode view of the reel strip."""
+        reel = Image.frombuffer('P', self.reel_size, self.reel_indices, 'raw', 'P', 0, 1)
+        reel.putpalette(self.palette)
+        return reel
+    
+    def facade_p(self):
+        """Get a read-only palette-mode view of the facade (PALETTE_TRANSPARENT_INDEX where see-through)."""
+        facade = Image.frombuffer('P', self.facade_size, self.facade_indices, 'raw', 'P', 0, 1)
+        facade.putpalette(self.palette)
+        return facade
+    
+    def reel_array(self):
+        """Get the reel strip's palette indices as a read-only (height, width) array view."""
+        return np.frombuffer(self.reel_indices, dtype=np.uint8).reshape(self.reel_size[1], self.reel_size[0])
+    
+    def facade_array(self):
+        """Get the facade's palette indices as a read-only (height, width) array view."""
+        return np.frombuffer(self.facade_indices, dtype=np.uint8).reshape(self.facade_size[1], self.facade_size[0])
+    
+    def facade_mask(self):
+        """Get a (height, width) bool array of the facade pixels drawn over the reels."""
+        rgba = np.frombuffer(self.facade_data, dtype=np.uint8).reshape(self.facade_size[1], self.facade_size[0], 4)
+        return rgba[..., 3] > 127
+
+def load_slots_assets(paths=None):
+    """
+    Decode the reel and facade images once for reuse across spins.
+    
+    Args:
+        paths (dict, optional): Asset paths from generate_slots_assets()
+        
+    Returns:
+        SlotsAssets: Decoded assets
+    """
+    paths = paths or generate_slots_assets()
+    with Image.open(paths["reel"]) as reel, Image.open(paths["facade"]) as facade:
+        reel = reel.convert('RGBA')
+        facade = facade.convert('RGBA')
+    with Image.open(paths["reel_p"]) as reel_p, Image.open(paths["facade_p"]) as facade_p:
+        palette = bytes(reel_p.getpalette())
+        reel_indices = reel_p.tobytes()
+        facade_indices = facade_p.tobytes()
+    return SlotsAssets(
+        reel.size, reel.tobytes(), facade.size, facade.tobytes(),
+        palette, reel_indices, facade_indices
+    )
+
+def _generate_palette_images(reel_path, facade_path, reel_output_path, facade_output_path):
+    """
+    Quantize the reel, facade and background to one shared 256-colour palette.
+    
+    Frames composed from these images are already in GIF palette mode, so the
+    encoder never has to quantize them again.
+    """
+    with Image.open(reel_path) as reel, Image.open(facade_path) as facade:
+        # GIF frames ignore alpha, so quantize the raw RGB like the encoder would
+        reel_rgb = reel.convert('RGB')
+        facade_rgba = facade.convert('RGBA')
+    facade_rgb = facade_rgba.convert('RGB')
+    
+    # Build the palette from both images side by side
+    sample = Image.new('RGB', (reel_rgb.width + facade_rgb.width, max(reel_rgb.height, facade_rgb.height)))
+    sample.paste(reel_rgb, (0, 0))
+    sample.paste(facade_rgb, (reel_rgb.width, 0))
+    quantized = sample.quantize(colors=PALETTE_COLORS, method=PALETTE_METHOD, dither=Image.Dither.NONE)
+    
+    palette = quantized.getpalette()[:PALETTE_COLORS * 3]
+    palette += [0, 0, 0] * (PALETTE_COLORS - len(palette) // 3)
+    palette += list(BACKGROUND_COLOR[:3])   # PALETTE_BACKGROUND_INDEX
+    palette += [255, 0, 255]                # PALETTE_TRANSPARENT_INDEX, never drawn
+    palette_image = Image.new('P', (1, 1))
+    palette_image.putpalette(palette)
+    
+    reel_p = reel_rgb.quantize(palette=palette_image, dither=Image.Dither.NONE)
+    reel_p.save(reel_output_path)
+    
+    # Mark the see-through part of the facade with the reserved index
+    facade_p = Image.new('P', facade_rgb.size, PALETTE_TRANSPARENT_INDEX)
+    facade_p.putpalette(palette)
+    facade_p.paste(facade_rgb.quantize(palette=palette_image, dither=Image.Dither.NONE), (0, 0), facade_rgba.getchannel('A'))
+    facade_p.save(facade_output_path, transparency=PALETTE_TRANSPARENT_INDEX)
+
+def _symbol_tile(symbol_key, symbol_data, font, atlas):
+    """
+    Draw one symbol's cell of the reel strip.
+    
+    Args:
+        symbol_key (str): Symbol key
+        symbol_data (dict): Symbol's entry in SYMBOLS
+        font (ImageFont): Font for the emoji fallback
+        atlas (SymbolAtlas): Decoded symbol art
+        
+    Returns:
+        Image: REEL_WIDTH x SYMBOL_SIZE RGBA tile
+    """
+    tile = Image.new('RGBA', (REEL_WIDTH, SYMBOL_SIZE), BACKGROUND_COLOR)
+    draw = ImageDraw.Draw(tile)
+    
+    # Draw symbol background
+    color = SYMBOL_COLORS.get(symbol_key, (255, 255, 255, 255))
+    draw.rectangle(
+        (10, 10, REEL_WIDTH - 10, SYMBOL_SIZE - 10),
+        fill=(color[0], color[1], color[2], 100),  # Semi-transparent
+        outline=(255, 255, 255, 180),
+        width=2
+    )
+    
+    # Use the symbol's art from the atlas if it has any
+    symbol_img = atlas.tile(symbol_key)
+    if symbol_img is not None:
+        # Center the image in the tile
+        img_x = REEL_WIDTH // 2 - atlas.tile_size // 2
+        img_y = SYMBOL_SIZE // 2 - atlas.tile_size // 2
+        tile.paste(symbol_img, (img_x, img_y), symbol_img)
+        return tile
+    
+    # Fallback to emoji text if the symbol has no art
+    emoji = symbol_data.get("emoji", "?")
+    
+    # Get text size for centering
+    try:
+        # For newer Pillow versions
+        if hasattr(draw, "textbbox"):
+            bbox = draw.textbbox((0, 0), emoji, font=font)
+            text_width = bbox[2] - bbox[0]
+            text_height = bbox[3] - bbox[1]
+        # Fallback for any version
+        else:
+            # Use simple estimation based on font size
+            font_size = 80
+            text_width = font_size
+            text_height = font_size
+    except:
+        # Fallback dimensions
+        text_width, text_height = 80, 80
+    
+    # Draw the emoji text as fallback
+    draw.text(
+        (REEL_WIDTH // 2 - text_width // 2, SYMBOL_SIZE // 2 - text_height // 2),
+        emoji,
+        fill=(255, 255, 255, 255),
+        font=font
+    )
+    return tile
+
+def symbol_tiles(symbol_keys):
+    """
+    Draw the reel cell of each symbol: background, frame and art from the atlas.
+    
+    Args:
+        symbol_keys (iterable): Symbol keys to draw
+        
+    Returns:
+        list: REEL_WIDTH x SYMBOL_SIZE RGBA tiles, in the order of `symbol_keys`
+    """
+    from utils.slots import SYMBOLS
     
     # Try to get a font for drawing text (use default if not available)
     try:
@@ -64,70 +419,22 @@ def _generate_reel_image(output_path):
     except IOError:
         font = ImageFont.load_default()
     
-    # Draw each symbol multiple times to create blocks
-    for block in range(num_blocks):
-        for i, symbol_key in enumerate(symbol_keys):
-            y_pos = (block * len(symbol_keys) + i) * SYMBOL_SIZE
-            
-            symbol_data = SYMBOLS[symbol_key]
-            
-            # Draw symbol background
-            color = SYMBOL_COLORS.get(symbol_key, (255, 255, 255, 255))
-            draw.rectangle(
-                (10, y_pos + 10, REEL_WIDTH - 10, y_pos + SYMBOL_SIZE - 10),
-                fill=(color[0], color[1], color[2], 100),  # Semi-transparent
-                outline=(255, 255, 255, 180),
-                width=2
-            )
-            
-            # Try to use the image file if available
-            if symbol_data.get("image_available") == "yes" and "path" in symbol_data:
-                try:
-                    # Load the symbol image
-                    img_path = symbol_data["path"]
-                    symbol_img = Image.open(img_path).convert("RGBA")
-                    
-                    # Resize to fit in symbol box
-                    max_img_size = SYMBOL_SIZE - 40  # Leave some padding
-                    symbol_img = symbol_img.resize((max_img_size, max_img_size), Image.LANCZOS)
-                    
-                    # Calculate position to center the image
-                    img_x = REEL_WIDTH // 2 - max_img_size // 2
-                    img_y = y_pos + SYMBOL_SIZE // 2 - max_img_size // 2
-                    
-                    # Paste the image onto the reel
-                    reel.paste(symbol_img, (img_x, img_y), symbol_img)
-                    continue  # Skip the text drawing below
-                except Exception as e:
-                    logger.warning(f"Failed to load image for {symbol_key}: {e}")
-            
-            # Fallback to emoji text if image loading failed
-            emoji = symbol_data.get("emoji", "?")
-            
-            # Get text size for centering
-            try:
-                # For newer Pillow versions
-                if hasattr(draw, "textbbox"):
-                    bbox = draw.textbbox((0, 0), emoji, font=font)
-                    text_width = bbox[2] - bbox[0]
-                    text_height = bbox[3] - bbox[1]
-                # Fallback for any version
-                else:
-                    # Use simple estimation based on font size
-                    font_size = 80
-                    text_width = font_size
-                    text_height = font_size
-            except:
-                # Fallback dimensions
-                text_width, text_height = 80, 80
-            
-            # Draw the emoji text as fallback
-            draw.text(
-                (REEL_WIDTH // 2 - text_width // 2, y_pos + SYMBOL_SIZE // 2 - text_height // 2),
-                emoji,
-                fill=(255, 255, 255, 255),
-                font=font
-            )
+    atlas = load_symbol_atlas()
+    return [_symbol_tile(symbol_key, SYMBOLS[symbol_key], font, atlas) for symbol_key in symbol_keys]
+
+def _generate_reel_image(output_path):
+    """Generate the slot machine reel image with all symbols."""
+    # Get symbols in paytable reel order
+    from utils.paytable import get_paytable
+    symbol_keys = list(get_paytable().symbols)
+    
+    # Draw each symbol once, then repeat the tiles in blocks down the strip
+    tiles = symbol_tiles(symbol_keys)
+    reel_height = SYMBOL_SIZE * len(symbol_keys) * REEL_BLOCKS
+    reel = Image.new('RGBA', (REEL_WIDTH, reel_height), BACKGROUND_COLOR)
+    for block in range(REEL_BLOCKS):
+        for i, tile in enumerate(tiles):
+            reel.paste(tile, (0, (block * len(tiles) + i) * SYMBOL_SIZE))
     
     # Save the reel image
     reel.save(output_path)
@@ -0,0 +1,80 @@
+"""
+Routing of mention commands such as "@Piglet slots 1k".
+
+A message is split into tokens once, mentions are dropped, and the first
+remaining token picks the command from `COMMAND_ALIASES`. Only whole tokens
+match, so chatter like "flipping" or "2100" never starts a game, and a
+message that isn't a command costs one split and one dict lookup.
+"""
+from typing import NamedTuple
+
+from utils.currency import BET_PATTERN
+
+# Command token -> command name
+COMMAND_ALIASES = {
+    "slots": "slots",
+    "slot": "slots",
+    "sl": "slots",
+    "coinflip": "coinflip",
+    "coin": "coinflip",
+    "flip": "coinflip",
+    "blackjack": "blackjack",
+    "bj": "blackjack",
+    "21": "blackjack",
+}
+
+# Coinflip choice token -> side
+COIN_SIDES = {
+    "heads": "heads",
+    "head": "heads",
+    "h": "heads",
+    "tails": "tails",
+    "tail": "tails",
+    "t": "tails",
+}
+
+DEFAULT_BET = "1"
+COINFLIP_ARGS = 3  # Tokens after "coinflip" searched for the choice and bet
+# Whole-balance bets a coinflip takes from anywhere in its arguments. The
+# one-letter forms are left out: "flip a coin" must not bet everything.
+COINFLIP_MAX_WORDS = frozenset(["all", "max", "allin"])
+MENTION_PREFIXES = ("<@", "<#")  # User, role and channel mentions
+
+
+class MentionCommand(NamedTuple):
+    """A command parsed from a mention message."""
+    name: str
+    bet: str
+    choice: str = None
+
+
+def route(content):
+    """
+    Parse the command in a mention message.
+
+    Args:
+        content (str): Message content, mentions included
+
+    Returns:
+        MentionCommand: The command, or None if the message doesn't start with one
+    """
+    tokens = [token for token in content.lower().split() if not token.startswith(MENTION_PREFIXES)]
+    if not tokens:
+        return None
+    name = COMMAND_ALIASES.get(tokens[0])
+    if name is None:
+        return None
+
+    args = tokens[1:]
+    if name == "coinflip":
+        bet, choice = DEFAULT_BET, "heads"
+        for token in args[:COINFLIP_ARGS]:
+            if token in COIN_SIDES:
+                choice = COIN_SIDES[token]
+            elif token in COINFLIP_MAX_WORDS or BET_PATTERN.match(token):
+                bet = token
+        return MentionCommand(name, bet, choice)
+
+    # Slots and blackjack take the bet right after the command
+    bet = args[0] if args else DEFAULT_BET
+    return MentionCommand(name, bet)
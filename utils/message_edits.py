@@ -0,0 +1,144 @@
+"""
+Coalesced message edits for interactive game messages.
+
+Buttons change a game's state faster than Discord lets a channel's messages be
+edited, so views mark their message as changed instead of editing it. The
+first change is sent straight away; changes arriving within the next
+`EDIT_DEBOUNCE_SECONDS` are folded into one trailing edit. Edits are built
+when they are sent, from the latest state, so skipped states are never
+rendered.
+
+A button click's first change is sent as the click's own interaction
+response, so it costs no extra API call. Clicks inside the window are only
+acknowledged, and the trailing edit goes through the latest click's
+interaction webhook rather than the channel's message edit route.
+"""
+import asyncio
+import logging
+import os
+import time
+
+import discord
+
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# Shortest gap between two edits of the same message
+EDIT_DEBOUNCE_SECONDS = float(os.environ.get("EDIT_DEBOUNCE_SECONDS", 0.4))
+
+
+class EditCoalescer:
+    """Sends at most one edit of a message per debounce window."""
+
+    def __init__(self, edit, delay=EDIT_DEBOUNCE_SECONDS):
+        """
+        Args:
+            edit (callable): Coroutine function taking the edit's keyword
+                arguments, such as `PartialMessage.edit`
+            delay (float): Shortest gap between two edits, in seconds
+        """
+        self._message_edit = edit
+        # Sends the next trailing edit: the latest deferred click's webhook if
+        # there is one, since interaction tokens expire after 15 minutes
+        self._edit = edit
+        self.delay = delay
+        self._render = None  # Builds the next edit's keyword arguments
+        self._last_sent = float("-inf")
+        self._now = asyncio.Event()
+        self._task = None
+
+    @property
+    def pending(self):
+        """Whether an edit is waiting to be sent."""
+        return self._render is not None
+
+    def request(self, render):
+        """
+        Mark the message as changed.
+
+        Args:
+            render (callable): Returns the edit's keyword arguments, called
+                when the edit is sent; replaces any earlier pending render
+        """
+        metrics.increment("message_edits.requested")
+        self._render = render
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def respond(self, interaction, render):
+        """
+        Answer a button click with the message's change.
+
+        The first change in a window edits the message in the interaction
+        response. Later ones acknowledge the click and are folded into the
+        trailing edit, sent with the interaction's `edit_original_response`.
+
+        Args:
+            interaction (discord.Interaction): Unanswered component interaction
+                on the message
+            render (callable): Returns the edit's keyword arguments
+        """
+        loop = asyncio.get_running_loop()
+        idle = self._task is None or self._task.done()
+        if idle and loop.time() >= self._last_sent + self.delay:
+            metrics.increment("message_edits.requested")
+            self._last_sent = loop.time()
+            try:
+                kwargs = render()
+            except Exception as e:
+                metrics.increment("message_edits.failed")
+                logger.error(f"Failed to build game message edit: {e}")
+                await interaction.response.defer()
+            else:
+                await self._send(interaction.response.edit_message, kwargs)
+            return
+
+        metrics.increment("message_edits.deferred")
+        await interaction.response.defer()
+        self._edit = interaction.edit_original_response
+        self.request(render)
+
+    async def flush(self):
+        """Send a pending edit without waiting out the window, and wait until it's sent."""
+        if self._task is None or self._task.done():
+            return
+        self._now.set()
+        await self._task
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self._render is not None:
+            wait = self._last_sent + self.delay - loop.time()
+            if wait > 0:
+                try:
+                    await asyncio.wait_for(self._now.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+            self._now.clear()
+
+            render, self._render = self._render, None
+            edit, self._edit = self._edit, self._message_edit
+            self._last_sent = loop.time()
+            try:
+                await self._send(edit, render())
+            except Exception as e:
+                # Keep sending later edits even if building this one failed
+                metrics.increment("message_edits.failed")
+                logger.error(f"Failed to edit game message: {e}")
+
+    async def _send(self, edit, kwargs):
+        """Make the edit, recording the API call and any rate limiting."""
+        metrics.increment("message_edits.sent")
+        start = time.perf_counter()
+        try:
+            await edit(**kwargs)
+        except discord.HTTPException as e:
+            if e.status == 429:
+                metrics.increment("message_edits.rate_limited")
+            else:
+                metrics.increment("message_edits.failed")
+            logger.error(f"Failed to edit game message: {e}")
+        finally:
+            # discord.py waits out most 429s itself, which shows up here as latency
+            metrics.observe("message_edits.latency", time.perf_counter() - start)
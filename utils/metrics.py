@@ -0,0 +1,74 @@
+"""
+In-process metrics for Piglet Casino Bot.
+
+The bot and the Flask app share one process, so cogs record counters, gauges
+and timings here and the `/api/metrics` route serves `snapshot()`. Names are
+dotted strings such as "render.dropped.queue_full".
+"""
+import threading
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_timings = {}
+
+
+def increment(name, amount=1):
+    """
+    Add to a counter.
+
+    Args:
+        name (str): Counter name
+        amount (int): Amount to add
+    """
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def set_gauge(name, value):
+    """
+    Set a gauge to its current value.
+
+    Args:
+        name (str): Gauge name
+        value (float): Current value
+    """
+    with _lock:
+        _gauges[name] = value
+
+
+def observe(name, seconds):
+    """
+    Record a duration.
+
+    Args:
+        name (str): Timing name
+        seconds (float): Observed duration in seconds
+    """
+    with _lock:
+        timing = _timings.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+        timing["count"] += 1
+        timing["total"] += seconds
+        timing["max"] = max(timing["max"], seconds)
+
+
+def snapshot():
+    """
+    Get the current value of every metric.
+
+    Returns:
+        dict: counters, gauges and timings (count, mean and max seconds)
+    """
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "timings": {
+                name: {
+                    "count": timing["count"],
+                    "mean": timing["total"] / timing["count"],
+                    "max": timing["max"],
+                }
+                for name, timing in _timings.items()
+            },
+        }
@@ -0,0 +1,349 @@
+"""
+Paytable configuration for the slot games.
+
+Payouts, symbol weights and the animated slots forced-win settings live in a
+versioned JSON file (config/paytable.json by default). Each load is validated,
+compiled into lookup tables and checked against the configured RTP bounds
+before it replaces the active paytable.
+"""
+import hashlib
+import itertools
+import json
+import logging
+import os
+import threading
+from types import MappingProxyType
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+PAYTABLE_PATH = os.environ.get("PAYTABLE_PATH", os.path.join("config", "paytable.json"))
+
+# Paylines checked by /slots, as (row, column) cells of the 3x3 grid.
+# Order matters: the first line with the best payout provides the win details.
+PAYLINES = (
+    ((0, 0), (0, 1), (0, 2)),
+    ((1, 0), (1, 1), (1, 2)),
+    ((2, 0), (2, 1), (2, 2)),
+    ((0, 0), (1, 1), (2, 2)),
+    ((0, 2), (1, 1), (2, 0)),
+)
+
+
+class Paytable(NamedTuple):
+    """Compiled, read-only paytable."""
+    version: int
+    digest: str
+    symbols: tuple            # Symbol keys in reel order
+    index: MappingProxyType   # Symbol key -> position in `symbols`
+    payouts: MappingProxyType # Symbol key -> {count: multiplier}
+    weights: tuple            # Weight per symbol, aligned with `symbols`
+    cum_weights: tuple        # Cumulative weights for random.choices
+    line_table: tuple         # (multiplier, symbol index, count) per 3-symbol line
+    win_rate: float           # Animated slots forced-win chance
+    forced_win_weights: tuple # Animated slots forced-win bisect thresholds
+    rtp: float                # Expected return of /slots per unit bet
+    animated_rtp: float       # Expected return of /animated_slots per unit bet
+
+    def line_key(self, a, b, c):
+        """Get the `line_table` key for three symbol indices."""
+        n = len(self.symbols)
+        return (a * n + b) * n + c
+
+
+# Forced wins add multiples of 6 to the bisect position, so it must stay below 6
+FORCED_WIN_MAX_THRESHOLDS = 5
+
+_active = None
+_active_mtime = None
+_reload_lock = threading.Lock()
+
+
+def _compile_line_table(symbols, payouts):
+    """Precompute the best payout for every possible line of three symbols."""
+    table = []
+    for line in itertools.product(range(len(symbols)), repeat=3):
+        best = (0, None, 0)
+        for idx in dict.fromkeys(line):
+            count = line.count(idx)
+            multiplier = payouts[symbols[idx]].get(count, 0)
+            if multiplier > best[0]:
+                best = (multiplier, idx, count)
+        table.append(best)
+    return tuple(table)
+
+
+def _line_distribution(probs, fixed, line_table, n):
+    """
+    Get the payout CDF inputs for a line with one or two free cells.
+
+    Args:
+        probs (list): Probability of each symbol
+        fixed (dict): Line position -> symbol index for the known cells
+        line_table (tuple): Compiled line payouts
+        n (int): Number of symbols
+
+    Returns:
+        dict: payout multiplier -> probability
+    """
+    free = [pos for pos in range(3) if pos not in fixed]
+    dist = {}
+    for combo in itertools.product(range(n), repeat=len(free)):
+        cells = dict(fixed)
+        p = 1.0
+        for pos, idx in zip(free, combo):
+            cells[pos] = idx
+            p *= probs[idx]
+        payout = line_table[(cells[0] * n + cells[1]) * n + cells[2]][0]
+        dist[payout] = dist.get(payout, 0.0) + p
+    return dist
+
+
+def compute_slots_rtp(symbols, weights, line_table):
+    """
+    Compute the exact expected return of /slots per unit bet.
+
+    The four corners and the center fix both diagonals; given those, each
+    row only has free cells of its own, so rows are independent and the best
+    line payout can be taken from the product of their CDFs.
+
+    Args:
+        symbols (tuple): Symbol keys in reel order
+        weights (tuple): Weight per symbol
+        line_table (tuple): Compiled line payouts
+
+    Returns:
+        float: Expected payout multiplier
+    """
+    n = len(symbols)
+    total = float(sum(weights))
+    probs = [w / total for w in weights]
+    values = sorted({entry[0] for entry in line_table})
+
+    def cdf(dist):
+        acc = 0.0
+        out = []
+        for v in values:
+            acc += dist.get(v, 0.0)
+            out.append(acc)
+        return out
+
+    # Outer rows depend on their two corners, the middle row on the center
+    edge_cdf = {
+        (a, b): cdf(_line_distribution(probs, {0: a, 2: b}, line_table, n))
+        for a in range(n) for b in range(n)
+    }
+    middle_cdf = [cdf(_line_distribution(probs, {1: c}, line_table, n)) for c in range(n)]
+
+    rtp = 0.0
+    for tl, tr, bl, br, c in itertools.product(range(n), repeat=5):
+        p = probs[tl] * probs[tr] * probs[bl] * probs[br] * probs[c]
+        floor = max(line_table[(tl * n + c) * n + br][0], line_table[(tr * n + c) * n + bl][0])
+        top, mid, bottom = edge_cdf[(tl, tr)], middle_cdf[c], edge_cdf[(bl, br)]
+        expected = 0.0
+        previous = 0.0
+        for k, v in enumerate(values):
+            at_most = top[k] * mid[k] * bottom[k] if v >= floor else 0.0
+            expected += v * (at_most - previous)
+            previous = at_most
+        rtp += p * expected
+    return rtp
+
+
+def _is_number(value):
+    """Check for an int or float, rejecting bools."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _section(config, key):
+    """Get a section of the config that must be an object."""
+    section = config.get(key, {})
+    if not isinstance(section, dict):
+        raise ValueError(f"Paytable {key} must be an object")
+    return section
+
+
+def _rtp_bounds(bounds, game):
+    """Get the (low, high) RTP bounds of a game."""
+    value = bounds.get(game, (0.0, float("inf")))
+    if (not isinstance(value, (list, tuple)) or len(value) != 2
+            or not all(_is_number(bound) for bound in value) or value[0] > value[1]):
+        raise ValueError(f"RTP bounds for {game} must be [low, high] numbers")
+    return value
+
+
+def compile_paytable(config, digest=""):
+    """
+    Validate a paytable config and compile it.
+
+    Args:
+        config (dict): Parsed paytable config
+        digest (str): Content hash of the config file
+
+    Returns:
+        Paytable: Compiled paytable
+
+    Raises:
+        ValueError: If the config is invalid or its RTP is out of bounds
+    """
+    from utils.slots import SYMBOLS
+    from utils.slots_analysis import analyze_animated_slots
+
+    if not isinstance(config, dict):
+        raise ValueError("Paytable config must be an object")
+
+    version = config.get("version")
+    if not isinstance(version, int) or version < 1:
+        raise ValueError("Paytable version must be a positive integer")
+
+    symbols = config.get("symbols", ())
+    if not isinstance(symbols, list) or not all(isinstance(symbol, str) for symbol in symbols):
+        raise ValueError("Paytable symbols must be a list of symbol names")
+    symbols = tuple(symbols)
+    if sorted(symbols) != sorted(SYMBOLS) or len(set(symbols)) != len(symbols):
+        raise ValueError(f"Paytable symbols must list each of {', '.join(SYMBOLS)} exactly once")
+
+    raw_payout_table = _section(config, "payouts")
+    raw_weights = _section(config, "weights")
+    payouts = {}
+    weights = []
+    for symbol in symbols:
+        raw_payouts = raw_payout_table.get(symbol)
+        if not raw_payouts:
+            raise ValueError(f"Missing payouts for {symbol}")
+        if not isinstance(raw_payouts, dict):
+            raise ValueError(f"Payouts for {symbol} must be an object of count -> multiplier")
+        payouts[symbol] = {}
+        for count, multiplier in raw_payouts.items():
+            if count not in ("2", "3") or not _is_number(multiplier) or multiplier < 0:
+                raise ValueError(f"Invalid payout for {symbol}: {count} -> {multiplier}")
+            payouts[symbol][int(count)] = multiplier
+        weight = raw_weights.get(symbol)
+        if not isinstance(weight, int) or isinstance(weight, bool) or weight <= 0:
+            raise ValueError(f"Weight for {symbol} must be a positive integer")
+        weights.append(weight)
+
+    animated = _section(config, "animated")
+    win_rate = animated.get("win_rate", 0)
+    if not _is_number(win_rate) or not 0 <= win_rate <= 1:
+        raise ValueError("Animated slots win_rate must be a number between 0 and 1")
+    forced_win_weights = animated.get("forced_win_weights", ())
+    if (not isinstance(forced_win_weights, (list, tuple))
+            or not all(_is_number(weight) and 0 <= weight <= 100 for weight in forced_win_weights)):
+        raise ValueError("Animated slots forced_win_weights must be percentages between 0 and 100")
+    forced_win_weights = tuple(forced_win_weights)
+    if list(forced_win_weights) != sorted(forced_win_weights):
+        raise ValueError("Animated slots forced_win_weights must be ascending")
+    if len(forced_win_weights) > FORCED_WIN_MAX_THRESHOLDS:
+        raise ValueError(f"Animated slots forced_win_weights can have at most {FORCED_WIN_MAX_THRESHOLDS} thresholds")
+
+    rtp_bounds = _section(config, "rtp_bounds")
+
+    line_table = _compile_line_table(symbols, payouts)
+    rtp = compute_slots_rtp(symbols, weights, line_table)
+
+    low, high = _rtp_bounds(rtp_bounds, "slots")
+    if not low <= rtp <= high:
+        raise ValueError(f"Slots RTP {rtp:.4f} outside configured bounds [{low}, {high}]")
+
+    table = Paytable(
+        version=version,
+        digest=digest,
+        symbols=symbols,
+        index=MappingProxyType({symbol: i for i, symbol in enumerate(symbols)}),
+        payouts=MappingProxyType({k: MappingProxyType(v) for k, v in payouts.items()}),
+        weights=tuple(weights),
+        cum_weights=tuple(itertools.accumulate(weights)),
+        line_table=line_table,
+        win_rate=win_rate,
+        forced_win_weights=forced_win_weights,
+        rtp=rtp,
+        animated_rtp=0.0,
+    )
+
+    animated_rtp = analyze_animated_slots(table)["rtp"]
+    low, high = _rtp_bounds(rtp_bounds, "animated_slots")
+    if not low <= animated_rtp <= high:
+        raise ValueError(f"Animated slots RTP {animated_rtp:.4f} outside configured bounds [{low}, {high}]")
+
+    return table._replace(animated_rtp=animated_rtp)
+
+
+def load_paytable(path=None):
+    """
+    Load, validate and compile a paytable file without activating it.
+
+    Args:
+        path (str, optional): Config file path, defaults to PAYTABLE_PATH
+
+    Returns:
+        Paytable: Compiled paytable
+    """
+    path = path or PAYTABLE_PATH
+    with open(path, "rb") as f:
+        raw = f.read()
+    config = json.loads(raw)
+    return compile_paytable(config, digest=hashlib.sha256(raw).hexdigest()[:12])
+
+
+def reload_paytable(path=None):
+    """
+    Load a paytable file and swap it in as the active paytable.
+
+    The previous paytable stays active if the new one fails validation.
+    The symbol order is fixed once loaded because the reel artwork is built
+    from it.
+
+    Args:
+        path (str, optional): Config file path, defaults to PAYTABLE_PATH
+
+    Returns:
+        Paytable: The newly active paytable
+
+    Raises:
+        ValueError: If the config is invalid
+        OSError: If the file can't be read
+    """
+    global _active, _active_mtime
+
+    path = path or PAYTABLE_PATH
+    with _reload_lock:
+        mtime = os.path.getmtime(path)
+        table = load_paytable(path)
+        if _active is not None and table.symbols != _active.symbols:
+            raise ValueError("Paytable symbol order can't change at runtime (reel artwork depends on it)")
+        _active, _active_mtime = table, mtime
+    logger.info(
+        f"Loaded paytable v{table.version} ({table.digest}) with slots RTP {table.rtp:.4f}, "
+        f"animated slots RTP {table.animated_rtp:.4f}"
+    )
+    return table
+
+
+def reload_if_changed(path=None):
+    """
+    Reload the paytable if its file changed since the last load.
+
+    Returns:
+        Paytable or None: The new paytable, or None if nothing changed
+    """
+    path = path or PAYTABLE_PATH
+    if _active is not None and os.path.getmtime(path) == _active_mtime:
+        return None
+    return reload_paytable(path)
+
+
+def get_paytable():
+    """
+    Get the active paytable, loading the default file on first use.
+
+    Callers should take one snapshot per game round so a concurrent reload
+    can't mix two paytables within a spin.
+
+    Returns:
+        Paytable: Active paytable
+    """
+    table = _active
+    if table is None:
+        table = reload_paytable()
+    return table
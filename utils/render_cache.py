@@ -0,0 +1,182 @@
+"""
+Content-addressed disk cache of encoded slots animations.
+
+An animation is fully determined by the reel stops, the assets and renderer
+settings (summarized by a digest) and the output format, so each one is
+stored under a hash of those. Reads memory-map the file instead of copying
+it into the process. The cache is capped in bytes and evicts the least
+recently used files; recency survives restarts through file mtimes.
+"""
+import hashlib
+import io
+import logging
+import mmap
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+RENDER_CACHE_DIR = os.environ.get("RENDER_CACHE_DIR", os.path.join("data", "render_cache"))
+RENDER_CACHE_BYTES = int(os.environ.get("RENDER_CACHE_BYTES", 512 * 1024 * 1024))
+
+
+class MappedFile(io.RawIOBase):
+    """Read-only file object over a memory-mapped cache entry."""
+
+    def __init__(self, mapped):
+        super().__init__()
+        self._mapped = mapped
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._mapped.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        self._mapped.seek(offset, whence)
+        return self._mapped.tell()
+
+    def tell(self):
+        return self._mapped.tell()
+
+    def getvalue(self):
+        """Get the whole entry as bytes."""
+        return self._mapped[:]
+
+    def close(self):
+        if not self.closed:
+            self._mapped.close()
+        super().close()
+
+
+class RenderDiskCache:
+    """LRU disk cache of encoded animations, keyed by (stops, asset digest, format)."""
+
+    def __init__(self, digest, directory=RENDER_CACHE_DIR, max_bytes=RENDER_CACHE_BYTES):
+        self.digest = digest
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()  # Path -> size, least recently used first
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        """Index existing entries, oldest first, and trim to the size cap."""
+        found = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                if name.startswith("."):
+                    # Leftover temp file from an interrupted write
+                    os.remove(path)
+                    continue
+                stat = os.stat(path)
+                found.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(found):
+            self._entries[path] = size
+            self.bytes += size
+        self._evict()
+        logger.info(f"Render cache has {len(self._entries)} animations ({self.bytes / 1024 / 1024:.0f} MB)")
+
+    def path(self, stops, fmt, extension):
+        """
+        Get the content address of an animation.
+
+        Args:
+            stops (tuple): (s1, s2, s3) reel stop positions
+            fmt (str): Animation format key
+            extension (str): File extension for the format
+
+        Returns:
+            str: Path of the cache entry
+        """
+        key = f"{stops[0]}-{stops[1]}-{stops[2]}:{self.digest}:{fmt}".encode()
+        name = hashlib.sha256(key).hexdigest()
+        return os.path.join(self.directory, name[:2], f"{name}.{extension}")
+
+    def get(self, stops, fmt, extension):
+        """
+        Look up an animation.
+
+        Returns:
+            MappedFile: Memory-mapped animation, or None if it isn't cached
+        """
+        path = self.path(stops, fmt, extension)
+        with self._lock:
+            if path not in self._entries:
+                metrics.increment("render.disk_cache.misses")
+                return None
+            self._entries.move_to_end(path)
+        metrics.increment("render.disk_cache.hits")
+
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            # Keep the recency for the next restart
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Dropping unreadable render cache entry {path}: {e}")
+            self._forget(path)
+            return None
+        return MappedFile(mapped)
+
+    def put(self, stops, fmt, extension, data):
+        """
+        Store an encoded animation, evicting old ones to stay under the size cap.
+
+        Args:
+            stops (tuple): (s1, s2, s3) reel stop positions
+            fmt (str): Animation format key
+            extension (str): File extension for the format
+            data (bytes): Encoded animation
+        """
+        if len(data) > self.max_bytes:
+            return
+        path = self.path(stops, fmt, extension)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temp file and rename, so readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            os.remove(temp_path)
+            raise
+
+        with self._lock:
+            self.bytes += len(data) - self._entries.pop(path, 0)
+            self._entries[path] = len(data)
+            self._evict()
+
+    def __contains__(self, item):
+        stops, fmt, extension = item
+        return self.path(stops, fmt, extension) in self._entries
+
+    def _forget(self, path):
+        with self._lock:
+            self.bytes -= self._entries.pop(path, 0)
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits. Call with the lock held."""
+        while self.bytes > self.max_bytes and self._entries:
+            path, size = self._entries.popitem(last=False)
+            self.bytes -= size
+            metrics.increment("render.disk_cache.evictions")
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,123 @@
+"""
+Seeded, replayable random number streams for game rounds.
+
+Every round draws from its own counter-based generator keyed by a seed that is
+derived from the server seed and the round ID. The seed is stored on the
+round's ledger rows, so `RoundRng.from_seed(seed)` replays the round exactly.
+Rounds of paytable-driven games also record the paytable digest, since the
+same draws give a different outcome once the paytable is reloaded.
+"""
+import hashlib
+import os
+import random
+import secrets
+
+# Server seed used to derive round seeds. Set RNG_SERVER_SEED to keep seeds
+# stable across restarts; otherwise a fresh one is generated per process.
+SERVER_SEED = os.environ.get("RNG_SERVER_SEED") or secrets.token_hex(32)
+
+_MASK64 = (1 << 64) - 1
+_GAMMA = 0x9E3779B97F4A7C15
+
+
+def derive_seed(*parts):
+    """
+    Derive a 64-bit seed from a sequence of values.
+
+    Args:
+        *parts: Values to hash together (server seed, round ID, stream number, ...)
+
+    Returns:
+        int: 64-bit seed
+    """
+    data = ":".join(str(part) for part in parts).encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+
+def _mix64(z):
+    """SplitMix64 finalizer: scramble a 64-bit counter value."""
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+class RoundRng(random.Random):
+    """
+    Counter-based generator for a single game round.
+
+    Output block i is a pure function of (seed, i), so the stream can be
+    replayed from the seed alone and never shares state with other rounds.
+    All `random.Random` methods (randint, choice, shuffle, ...) are available.
+    """
+
+    def __init__(self, seed, round_id=None, paytable_digest=None):
+        self.round_id = round_id
+        self.paytable_digest = paytable_digest  # Paytable the round is played under, if any
+        super().__init__(seed)
+
+    @classmethod
+    def from_seed(cls, seed_hex, round_id=None, paytable_digest=None):
+        """Recreate a round's generator from the seed stored on its ledger row."""
+        return cls(int(seed_hex, 16), round_id, paytable_digest)
+
+    @property
+    def seed_hex(self):
+        """The round seed as stored on ledger rows."""
+        return f"{self._key:016x}"
+
+    def seed(self, a=None, version=2):
+        """Reset the stream to the start of the given 64-bit seed."""
+        if a is None:
+            a = secrets.randbits(64)
+        self._key = a & _MASK64
+        self._counter = 0
+
+    def getstate(self):
+        return self._key, self._counter
+
+    def setstate(self, state):
+        self._key, self._counter = state
+
+    def _next64(self):
+        self._counter += 1
+        return _mix64((self._key + self._counter * _GAMMA) & _MASK64)
+
+    def random(self):
+        """Get the next float in [0, 1)."""
+        return (self._next64() >> 11) * (1.0 / (1 << 53))
+
+    def getrandbits(self, k):
+        """Get an int with k random bits."""
+        if k <= 64:
+            return self._next64() >> (64 - k) if k else 0
+        value = 0
+        for _ in range((k + 63) // 64):
+            value = (value << 64) | self._next64()
+        return value >> (-k % 64)
+
+    def spawn(self, stream):
+        """
+        Get an independent generator for a sub-stream, e.g. one per worker process.
+
+        Args:
+            stream (int): Stream number
+
+        Returns:
+            RoundRng: Generator keyed by this seed and the stream number
+        """
+        return RoundRng(derive_seed(self.seed_hex, stream), self.round_id, self.paytable_digest)
+
+
+def new_round(table=None):
+    """
+    Start a new game round.
+
+    Args:
+        table (Paytable, optional): Paytable snapshot the round is played under
+
+    Returns:
+        RoundRng: Generator for the round, with its `round_id` and `seed_hex`
+            set, and `paytable_digest` when a paytable is given
+    """
+    round_id = secrets.token_hex(8)
+    return RoundRng(derive_seed(SERVER_SEED, round_id), round_id, table.digest if table else None)
@@ -0,0 +1,179 @@
+"""
+Exact outcome analysis for the slot games.
+
+`analyze_animated_slots` reproduces the reel stop distribution used by
+`AnimatedSlots.pick_stops`, including the forced-win branch and its block
+arithmetic, and enumerates every symbol combination on the payline. Run this
+module directly to print a report for the active paytable.
+"""
+import bisect
+import itertools
+
+from utils.image_generator import REEL_BLOCKS
+
+# Forced-win draws are round(random() * 100, 1), i.e. tenths from 0.0 to 100.0
+_FORCED_DRAW_STEPS = 1000
+
+
+def forced_draw_distribution(forced_win_weights):
+    """
+    Get the distribution of the forced-win symbol offset.
+
+    Args:
+        forced_win_weights (tuple): Ascending bisect thresholds from the paytable
+
+    Returns:
+        dict: bisect position -> probability
+    """
+    dist = {}
+    for k in range(_FORCED_DRAW_STEPS + 1):
+        # Values at either end only collect half a rounding interval
+        p = 0.5 if k in (0, _FORCED_DRAW_STEPS) else 1.0
+        pos = bisect.bisect(forced_win_weights, k / 10)
+        dist[pos] = dist.get(pos, 0.0) + p / _FORCED_DRAW_STEPS
+    return dist
+
+
+def stop_distributions(table, items):
+    """
+    Get the per-reel stop position distributions used by the animated slots cog.
+
+    Reels are independent within each branch, but the forced-win branch shares
+    one bisect position across all three reels, so each branch is kept separate.
+
+    Args:
+        table (Paytable): Paytable snapshot
+        items (int): Number of symbol positions on the reel strip
+
+    Returns:
+        list: (branch probability, {stop position: probability}) pairs
+    """
+    uniform = {s: 1 / (items - 1) for s in range(1, items)}
+    branches = [(1 - table.win_rate, uniform)]
+
+    blocks = range(1, items // 6)
+    for pos, p_pos in forced_draw_distribution(table.forced_win_weights).items():
+        stops = {}
+        for m in blocks:
+            s = pos + m * 6
+            s = s - 6 if s >= items else s
+            stops[s] = stops.get(s, 0.0) + 1 / len(blocks)
+        branches.append((table.win_rate * p_pos, stops))
+    return branches
+
+
+def stop_frequencies(table, items=None):
+    """
+    Get how often each reel stops at each position, most frequent first.
+
+    Args:
+        table (Paytable): Paytable snapshot
+        items (int, optional): Reel positions, defaults to the generated reel's
+
+    Returns:
+        dict: stop position -> probability for a single reel
+    """
+    items = items or REEL_BLOCKS * len(table.symbols)
+    freq = {}
+    for p_branch, stops in stop_distributions(table, items):
+        for s, p in stops.items():
+            freq[s] = freq.get(s, 0.0) + p_branch * p
+    return dict(sorted(freq.items(), key=lambda item: item[1], reverse=True))
+
+
+def outcome_frequencies(table, items=None, limit=None):
+    """
+    Get the most frequent (s1, s2, s3) outcomes of /animated_slots.
+
+    Every outcome has the same chance in the uniform branch, so only outcomes
+    reachable through the forced-win branch can be more frequent than others.
+
+    Args:
+        table (Paytable): Paytable snapshot
+        items (int, optional): Reel positions, defaults to the generated reel's
+        limit (int, optional): Maximum number of outcomes to return
+
+    Returns:
+        list: ((s1, s2, s3), probability) pairs, most frequent first
+    """
+    items = items or REEL_BLOCKS * len(table.symbols)
+    branches = stop_distributions(table, items)
+    p_uniform = branches[0][0]
+    base = p_uniform * (1 / (items - 1)) ** 3
+
+    freq = {}
+    for p_branch, stops in branches[1:]:
+        for (a, p_a), (b, p_b), (c, p_c) in itertools.product(stops.items(), repeat=3):
+            key = (a, b, c)
+            freq[key] = freq.get(key, base) + p_branch * p_a * p_b * p_c
+
+    outcomes = sorted(freq.items(), key=lambda item: item[1], reverse=True)
+    return outcomes[:limit] if limit is not None else outcomes
+
+
+def analyze_animated_slots(table, items=None):
+    """
+    Compute the exact economics of /animated_slots.
+
+    Args:
+        table (Paytable): Paytable snapshot
+        items (int, optional): Reel positions, defaults to the generated reel's
+
+    Returns:
+        dict: rtp, hit_rate, forced_rate and per-symbol hit and payout rates
+    """
+    n = len(table.symbols)
+    items = items or REEL_BLOCKS * n
+
+    symbols = {key: {"hit_rate": 0.0, "rtp": 0.0, 3: 0.0, 2: 0.0} for key in table.symbols}
+    rtp = 0.0
+    hit_rate = 0.0
+    for p_branch, stops in stop_distributions(table, items):
+        # The cog maps stop positions to symbols with `position % 9`
+        reel = [0.0] * n
+        for s, p in stops.items():
+            reel[s % 9] += p
+
+        for a, b, c in itertools.product(range(n), repeat=3):
+            p = p_branch * reel[a] * reel[b] * reel[c]
+            multiplier, idx, count = table.line_table[table.line_key(a, b, c)]
+            if not p or not multiplier:
+                continue
+            stats = symbols[table.symbols[idx]]
+            stats["hit_rate"] += p
+            stats["rtp"] += p * multiplier
+            stats[count] += p
+            rtp += p * multiplier
+            hit_rate += p
+
+    return {
+        "rtp": rtp,
+        "hit_rate": hit_rate,
+        "forced_rate": table.win_rate,
+        "items": items,
+        "symbols": symbols,
+    }
+
+
+def format_report(name, report):
+    """Format an analysis report as a text table."""
+    lines = [
+        f"{name}: RTP {report['rtp']:.4%}, hit rate {report['hit_rate']:.4%}",
+        f"{'symbol':<10}{'hits':>10}{'3x':>10}{'2x':>10}{'RTP':>10}",
+    ]
+    for key, stats in report["symbols"].items():
+        lines.append(
+            f"{key:<10}{stats['hit_rate']:>10.4%}{stats[3]:>10.4%}{stats[2]:>10.4%}{stats['rtp']:>10.4%}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # If run directly, report on the active paytable
+    from utils.paytable import get_paytable
+
+    table = get_paytable()
+    print(f"Paytable v{table.version} ({table.digest})")
+    print(f"/slots: RTP {table.rtp:.4%}")
+    print()
+    print(format_report("/animated_slots", analyze_animated_slots(table)))
@@ -0,0 +1,136 @@
+"""
+Static 3x3 result images for /slots.
+
+Each symbol cell is drawn once from the symbol atlas, scaled to the grid size
+and quantized to one shared palette, in a plain and a highlighted (winning
+line) variant. Rendering a result only pastes nine palette tiles and encodes
+the image.
+"""
+import io
+import logging
+import os
+
+from PIL import Image, ImageDraw
+
+from utils.image_generator import REEL_WIDTH, SYMBOL_SIZE, symbol_tiles
+from utils.paytable import PAYLINES
+
+logger = logging.getLogger(__name__)
+
+GRID_CELL_WIDTH = REEL_WIDTH * 3 // 5   # Reel cells scaled to 120 x 108
+GRID_CELL_HEIGHT = SYMBOL_SIZE * 3 // 5
+GRID_GAP = 4
+GRID_MARGIN = 8
+GRID_BACKGROUND = (20, 20, 20)
+HIGHLIGHT_COLOR = (255, 215, 0)  # Gold, like the machine's frame
+HIGHLIGHT_WIDTH = 5
+
+GRID_FORMATS = {
+    "png": {"label": "PNG", "extension": "png", "params": {"format": "PNG", "compress_level": 1}},
+    "webp": {
+        "label": "WebP (lossless)",
+        "extension": "webp",
+        "params": {"format": "WEBP", "lossless": True, "quality": 0, "method": 0},
+    },
+}
+
+# Format of /slots result images
+DEFAULT_GRID_FORMAT = os.environ.get("SLOTS_GRID_FORMAT", "png")
+if DEFAULT_GRID_FORMAT not in GRID_FORMATS:
+    logger.error(f"Unknown SLOTS_GRID_FORMAT {DEFAULT_GRID_FORMAT!r}, using png")
+    DEFAULT_GRID_FORMAT = "png"
+
+
+class GridRenderer:
+    """Renders 3x3 slots results from pre-quantized symbol tiles."""
+
+    def __init__(self, symbol_keys):
+        """
+        Draw, scale and quantize every symbol tile once.
+
+        Args:
+            symbol_keys (iterable): Symbols that can appear in a result
+        """
+        symbol_keys = list(symbol_keys)
+        cell = (GRID_CELL_WIDTH, GRID_CELL_HEIGHT)
+        plain = [tile.convert("RGB").resize(cell, Image.LANCZOS) for tile in symbol_tiles(symbol_keys)]
+        highlighted = []
+        for tile in plain:
+            tile = tile.copy()
+            ImageDraw.Draw(tile).rectangle(
+                (0, 0, cell[0] - 1, cell[1] - 1), outline=HIGHLIGHT_COLOR, width=HIGHLIGHT_WIDTH
+            )
+            highlighted.append(tile)
+
+        # Quantize every variant to one palette, with the grid background in it
+        sample = Image.new("RGB", (cell[0] * (len(plain) + 1), cell[1] * 2), GRID_BACKGROUND)
+        for i, (tile, lit) in enumerate(zip(plain, highlighted)):
+            sample.paste(tile, (i * cell[0], 0))
+            sample.paste(lit, (i * cell[0], cell[1]))
+        palette = sample.quantize(colors=256, method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE)
+
+        self._tiles = {
+            key: (
+                tile.quantize(palette=palette, dither=Image.Dither.NONE),
+                lit.quantize(palette=palette, dither=Image.Dither.NONE),
+            )
+            for key, tile, lit in zip(symbol_keys, plain, highlighted)
+        }
+        background = Image.new("RGB", (1, 1), GRID_BACKGROUND).quantize(palette=palette, dither=Image.Dither.NONE)
+        self._background_index = background.getpixel((0, 0))
+        self._palette = palette.getpalette()
+
+        self.size = (
+            3 * GRID_CELL_WIDTH + 2 * GRID_GAP + 2 * GRID_MARGIN,
+            3 * GRID_CELL_HEIGHT + 2 * GRID_GAP + 2 * GRID_MARGIN,
+        )
+
+    def compose(self, result, line=None):
+        """
+        Compose a result as a palette image.
+
+        Args:
+            result (list): 3x3 matrix of slot symbols
+            line (int, optional): Index in PAYLINES of the winning line to highlight
+
+        Returns:
+            Image: Palette-mode grid image
+        """
+        lit = set(PAYLINES[line]) if line is not None else ()
+        image = Image.new("P", self.size, self._background_index)
+        image.putpalette(self._palette)
+        for row in range(3):
+            for col in range(3):
+                tile = self._tiles[result[row][col]][(row, col) in lit]
+                image.paste(tile, (
+                    GRID_MARGIN + col * (GRID_CELL_WIDTH + GRID_GAP),
+                    GRID_MARGIN + row * (GRID_CELL_HEIGHT + GRID_GAP),
+                ))
+        return image
+
+    def render(self, result, line=None, fmt=DEFAULT_GRID_FORMAT):
+        """
+        Render a result as an encoded image.
+
+        Args:
+            result (list): 3x3 matrix of slot symbols
+            line (int, optional): Index in PAYLINES of the winning line to highlight
+            fmt (str): Key of GRID_FORMATS
+
+        Returns:
+            io.BytesIO: Encoded image, positioned at the start
+
+        Raises:
+            ValueError: If the format is unknown
+        """
+        if fmt not in GRID_FORMATS:
+            raise ValueError(f"Unknown grid format: {fmt}")
+
+        image = self.compose(result, line)
+        if fmt != "png":
+            # WebP has no palette mode
+            image = image.convert("RGB")
+        output = io.BytesIO()
+        image.save(output, **GRID_FORMATS[fmt]["params"])
+        output.seek(0)
+        return output
@@ -0,0 +1,827 @@
+"""
+Frame rendering for the animated slot machine.
+
+Each reel column's animation depends only on which reel it is and where that
+reel stops, so the column crops (with the facade slice over them already
+composited) are computed once and kept in a memory-bounded LRU cache.
+Each column is stored as one full first frame followed by delta frames in
+which unchanged areas are transparent. Rendering a spin then only assembles
+three cached columns per frame.
+
+Frames are composed in palette mode from the pre-quantized assets, so every
+frame shares one palette and the GIF encoder skips per-frame quantization.
+GIFs are written straight from the delta frames, so the encoder only stores
+the reel window of each frame after the first.
+
+Besides GIF, spins can be encoded as animated WebP (lossy or lossless) or
+APNG; see ANIMATION_FORMATS.
+
+`RenderPool` runs the renderer in worker processes so frame composition and
+GIF encoding never block the bot's event loop. It admits renders under a
+concurrency cap with per-user fairness and a queue-time budget; rejected spins
+fall back to a static PNG of the final frame, which is cheap to render. With a
+RenderDiskCache, encoded animations are kept on disk under a digest of the
+assets and renderer settings, so repeated outcomes skip the workers entirely.
+"""
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+from PIL import Image
+
+from utils import metrics
+from utils.image_generator import PALETTE_BACKGROUND_INDEX, PALETTE_TRANSPARENT_INDEX, SYMBOL_SIZE
+
+logger = logging.getLogger(__name__)
+
+REEL_COUNT = 3
+REEL_X = 25        # Left edge of the first reel on the facade
+REEL_Y = 100       # Canvas row where the top of the reel strip starts
+SPIN_SPEED = 6     # Pixels scrolled per frame, multiplied by the stop position
+FRAME_COUNT = SYMBOL_SIZE // SPIN_SPEED
+FRAME_DURATION = 50  # Duration of each frame in ms
+DELTA_MIN_RUN = 5    # Smallest unchanged area made transparent in GIF delta frames (odd)
+
+# Output formats for the spin animation. GIF is encoded from delta frames;
+# the others get complete frames and Pillow's encoder options below.
+ANIMATION_FORMATS = {
+    "gif": {"label": "GIF", "extension": "gif", "params": None},
+    "webp": {
+        "label": "Animated WebP (lossy)",
+        "extension": "webp",
+        "params": {"format": "WEBP", "quality": 80, "method": 0},
+    },
+    "webp_lossless": {
+        "label": "Animated WebP (lossless)",
+        "extension": "webp",
+        "params": {"format": "WEBP", "lossless": True, "quality": 0, "method": 0},
+    },
+    "apng": {"label": "APNG", "extension": "png", "params": {"format": "PNG"}},
+}
+
+# Format used when a guild hasn't picked one
+DEFAULT_ANIMATION_FORMAT = os.environ.get("SLOTS_ANIMATION_FORMAT", "gif")
+if DEFAULT_ANIMATION_FORMAT not in ANIMATION_FORMATS:
+    logger.error(f"Unknown SLOTS_ANIMATION_FORMAT {DEFAULT_ANIMATION_FORMAT!r}, using gif")
+    DEFAULT_ANIMATION_FORMAT = "gif"
+
+# Memory budget for cached reel columns (about 3 MB per reel stop)
+REEL_CACHE_BYTES = int(os.environ.get("REEL_CACHE_BYTES", 256 * 1024 * 1024))
+
+# Render worker processes, and how many spins may wait for one
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", min(os.cpu_count() or 1, 4)))
+RENDER_QUEUE_SIZE = int(os.environ.get("RENDER_QUEUE_SIZE", RENDER_WORKERS * 4))
+# Longest a spin may wait for a worker before falling back, in seconds
+RENDER_QUEUE_BUDGET = float(os.environ.get("RENDER_QUEUE_BUDGET", 2.0))
+# Renders a single user may have queued or running at once
+RENDER_USER_LIMIT = int(os.environ.get("RENDER_USER_LIMIT", 2))
+
+# Concurrent still renders in the bot process, and how many stills are kept
+STILL_CONCURRENCY = 2
+STILL_CACHE_SIZE = 256
+
+
+def _window_reduce(mask, size, reduce):
+    """
+    Apply a size x size sliding-window AND or OR over the last two axes.
+
+    Args:
+        mask (ndarray): Bool array
+        size (int): Odd window size
+        reduce (ufunc): np.logical_and for erosion, np.logical_or for dilation
+
+    Returns:
+        ndarray: Reduced mask, edges handled by replicating the border
+    """
+    r = size // 2
+    height, width = mask.shape[-2:]
+    pad = [(0, 0)] * (mask.ndim - 2) + [(r, r), (r, r)]
+    padded = np.pad(mask, pad, mode='edge')
+    # Square windows are separable: combine shifted rows, then shifted columns
+    rows = padded[..., 0:height, :].copy()
+    for k in range(1, size):
+        reduce(rows, padded[..., k:k + height, :], out=rows)
+    out = rows[..., 0:width].copy()
+    for k in range(1, size):
+        reduce(out, rows[..., k:k + width], out=out)
+    return out
+
+
+def _deltas(columns):
+    """
+    Turn complete column frames into a first frame followed by deltas.
+
+    Only unchanged areas at least DELTA_MIN_RUN pixels across become
+    transparent: scattered transparent pixels break up LZW runs and make
+    the GIF larger than leaving them opaque.
+
+    Args:
+        columns (ndarray): (frames, height, width) palette indices
+
+    Returns:
+        ndarray: Same shape, with unchanged areas of every frame after the
+            first set to PALETTE_TRANSPARENT_INDEX
+    """
+    unchanged = columns[1:] == columns[:-1]
+    # Morphological opening drops unchanged areas smaller than the window
+    opened = _window_reduce(_window_reduce(unchanged, DELTA_MIN_RUN, np.logical_and), DELTA_MIN_RUN, np.logical_or)
+    deltas = columns.copy()
+    deltas[1:][opened & unchanged] = PALETTE_TRANSPARENT_INDEX
+    return deltas
+
+
+class ReelFrameCache:
+    """LRU cache of pre-cropped column frames, keyed by (reel, stop position)."""
+
+    def __init__(self, assets, max_bytes=REEL_CACHE_BYTES):
+        self.assets = assets
+        self.max_bytes = max_bytes
+        # Every entry caches FRAME_COUNT palette-mode columns of the same size
+        self.entry_bytes = FRAME_COUNT * assets.reel_size[0] * assets.facade_size[1]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._columns = OrderedDict()
+        self._lock = threading.Lock()
+
+        # The part of the facade drawn over each reel column never moves
+        self._reel = assets.reel_array()
+        facade = assets.facade_array()
+        mask = assets.facade_mask()
+        self._overlays = []
+        for reel_index in range(REEL_COUNT):
+            left = REEL_X + assets.reel_size[0] * reel_index
+            columns = slice(left, left + assets.reel_size[0])
+            self._overlays.append((facade[:, columns], mask[:, columns]))
+
+    @property
+    def bytes(self):
+        """Memory currently held by cached columns."""
+        return len(self._columns) * self.entry_bytes
+
+    def column(self, reel_index, stop, frame, out=None):
+        """
+        Build one complete column frame without caching it.
+
+        Only the reel rows that end up visible are copied.
+
+        Args:
+            reel_index (int): Reel number, 0 to REEL_COUNT - 1
+            stop (int): Reel stop position
+            frame (int): Animation frame, 1 to FRAME_COUNT
+            out (ndarray, optional): (height, width) buffer to write into
+
+        Returns:
+            ndarray: (height, width) palette indices
+        """
+        overlay, overlay_mask = self._overlays[reel_index]
+        height = overlay.shape[0]
+        if out is None:
+            out = np.empty(overlay.shape, dtype=np.uint8)
+
+        # Canvas row y shows reel row y - top
+        top = REEL_Y - SPIN_SPEED * frame * stop
+        start = max(top, 0)
+        end = min(top + self._reel.shape[0], height)
+        out[:start] = PALETTE_BACKGROUND_INDEX
+        out[start:end] = self._reel[start - top:end - top]
+        out[max(end, start):] = PALETTE_BACKGROUND_INDEX
+
+        np.copyto(out, overlay, where=overlay_mask)
+        return out
+
+    def _crop_columns(self, reel_index, stop):
+        """Build every frame of one reel column for a stop position, as deltas."""
+        height, width = self._overlays[reel_index][0].shape
+        columns = np.empty((FRAME_COUNT, height, width), dtype=np.uint8)
+        for i in range(FRAME_COUNT):
+            self.column(reel_index, stop, i + 1, out=columns[i])
+        return _deltas(columns)
+
+    def get(self, reel_index, stop):
+        """
+        Get the column frames for a reel stopping at a position.
+
+        Args:
+            reel_index (int): Reel number, 0 to REEL_COUNT - 1
+            stop (int): Reel stop position
+
+        Returns:
+            ndarray: (FRAME_COUNT, height, width) palette indices, shared and
+                not to be modified. The first frame is complete; in the rest,
+                pixels unchanged since the previous frame may be
+                PALETTE_TRANSPARENT_INDEX.
+        """
+        key = (reel_index, stop)
+        with self._lock:
+            entry = self._columns.get(key)
+            if entry is not None:
+                self._columns.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = self._crop_columns(reel_index, stop)
+        entry.flags.writeable = False
+
+        with self._lock:
+            self._columns[key] = entry
+            # Evict least recently used entries, but always keep the newest one
+            while self.bytes > self.max_bytes and len(self._columns) > 1:
+                self._columns.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def prewarm(self, stops):
+        """
+        Fill the cache for the given stops on every reel, until the budget is used.
+
+        Args:
+            stops (iterable): Stop positions, most important first
+        """
+        for stop in stops:
+            if self.bytes + REEL_COUNT * self.entry_bytes > self.max_bytes:
+                break
+            for reel_index in range(REEL_COUNT):
+                self.get(reel_index, stop)
+        logger.info(f"Prewarmed {len(self._columns)} reel columns ({self.bytes / 1024 / 1024:.0f} MB)")
+
+
+class SlotsRenderer:
+    """
+    Renders animated slots spins from decoded assets.
+
+    Frames are assembled in preallocated buffers and handed out as read-only
+    image views of them, so they stay valid only until the next render call.
+    A renderer is meant for one thread; RenderPool gives each worker its own.
+    """
+
+    def __init__(self, assets, cache_bytes=REEL_CACHE_BYTES):
+        self.assets = assets
+        self.cache = ReelFrameCache(assets, cache_bytes)
+
+        # Every frame starts from the background with the facade drawn on it;
+        # the reel columns then cover everything between the margins
+        self.base = np.full((assets.facade_size[1], assets.facade_size[0]), PALETTE_BACKGROUND_INDEX, dtype=np.uint8)
+        np.copyto(self.base, assets.facade_array(), where=assets.facade_mask())
+
+        # Frame buffers, allocated on first use. Only the reel windows change
+        # between spins, so the margins drawn here are never rewritten.
+        self._full_frames = None
+        self._delta_frames = None
+
+    def _frame_buffer(self):
+        """Allocate a (FRAME_COUNT, height, width) buffer of base frames."""
+        return np.repeat(self.base[np.newaxis], FRAME_COUNT, axis=0)
+
+    def _window_view(self, frames, reel_index):
+        """Get the (frames, height, width) slice of a buffer covered by one reel."""
+        left = REEL_X + self.assets.reel_size[0] * reel_index
+        return frames[:, :, left:left + self.assets.reel_size[0]]
+
+    def _images(self, frames):
+        """Wrap a frame buffer as palette-mode image views."""
+        height, width = self.base.shape
+        images = []
+        for frame in frames:
+            image = Image.frombuffer('P', (width, height), frame, 'raw', 'P', 0, 1)
+            image.putpalette(self.assets.palette)
+            images.append(image)
+        return images
+
+    def render_frames(self, s1, s2, s3):
+        """
+        Render the complete spin animation frames for the given reel stops.
+
+        Args:
+            s1, s2, s3 (int): Reel stop positions
+
+        Returns:
+            list: Palette-mode animation frames sharing the asset palette,
+                valid until the next render call
+        """
+        if self._full_frames is None:
+            self._full_frames = self._frame_buffer()
+
+        for k, stop in enumerate((s1, s2, s3)):
+            columns = self.cache.get(k, stop)
+            out = self._window_view(self._full_frames, k)
+            # Draw each delta over the previous frame, skipping its transparent pixels
+            out[0] = columns[0]
+            for i in range(1, FRAME_COUNT):
+                np.copyto(out[i], out[i - 1])
+                np.copyto(out[i], columns[i], where=columns[i] != PALETTE_TRANSPARENT_INDEX)
+        return self._images(self._full_frames)
+
+    def render_delta_frames(self, s1, s2, s3):
+        """
+        Render the first frame in full and the rest as deltas.
+
+        Outside the reels every delta frame matches the first frame, and inside
+        them unchanged areas are transparent, so the GIF encoder crops each
+        delta to the moving reel window.
+
+        Args:
+            s1, s2, s3 (int): Reel stop positions
+
+        Returns:
+            list: Palette-mode frames to be played with disposal 1 (do not dispose),
+                valid until the next render call
+        """
+        if self._delta_frames is None:
+            self._delta_frames = self._frame_buffer()
+
+        for k, stop in enumerate((s1, s2, s3)):
+            self._window_view(self._delta_frames, k)[:] = self.cache.get(k, stop)
+        return self._images(self._delta_frames)
+
+    def build_frames(self, s1, s2, s3, fmt=DEFAULT_ANIMATION_FORMAT):
+        """
+        Render the frames a format is encoded from.
+
+        Args:
+            s1, s2, s3 (int): Reel stop positions
+            fmt (str): Key of ANIMATION_FORMATS
+
+        Returns:
+            list: Delta frames for GIF, complete frames for everything else
+
+        Raises:
+            ValueError: If the format is unknown
+        """
+        if fmt not in ANIMATION_FORMATS:
+            raise ValueError(f"Unknown animation format: {fmt}")
+        if ANIMATION_FORMATS[fmt]["params"] is None:
+            return self.render_delta_frames(s1, s2, s3)
+        return self.render_frames(s1, s2, s3)
+
+    def encode(self, images, fmt=DEFAULT_ANIMATION_FORMAT):
+        """
+        Encode frames from build_frames as a looping animation in memory.
+
+        Args:
+            images (list): Frames from build_frames for the same format
+            fmt (str): Key of ANIMATION_FORMATS
+
+        Returns:
+            io.BytesIO: Encoded animation, positioned at the start
+        """
+        params = ANIMATION_FORMATS[fmt]["params"]
+        if params is None:
+            params = {
+                "format": 'GIF',
+                "optimize": False,   # Frames already share one palette
+                "disposal": 1,       # Keep each frame so deltas draw on top of it
+                "transparency": PALETTE_TRANSPARENT_INDEX,
+            }
+        elif params["format"] == "WEBP":
+            # WebP has no palette mode, so give the encoder RGB frames
+            images = [image.convert('RGB') for image in images]
+
+        buffer = io.BytesIO()
+        images[0].save(
+            buffer,
+            save_all=True,
+            append_images=images[1:],
+            duration=FRAME_DURATION,
+            loop=0,  # Loop forever
+            **params
+        )
+        buffer.seek(0)
+        return buffer
+
+    def render_animation(self, s1, s2, s3, fmt=DEFAULT_ANIMATION_FORMAT):
+        """
+        Render a spin and encode it in one of ANIMATION_FORMATS in memory.
+
+        Args:
+            s1, s2, s3 (int): Reel stop positions
+            fmt (str): Key of ANIMATION_FORMATS
+
+        Returns:
+            io.BytesIO: Encoded animation, positioned at the start
+
+        Raises:
+            ValueError: If the format is unknown
+        """
+        return self.encode(self.build_frames(s1, s2, s3, fmt), fmt)
+
+    def render_still(self, s1, s2, s3):
+        """
+        Render only the final frame of a spin as a PNG in memory.
+
+        Builds the frame directly instead of through the column cache, so it
+        stays cheap without a warm cache.
+
+        Args:
+            s1, s2, s3 (int): Reel stop positions
+
+        Returns:
+            io.BytesIO: Encoded PNG, positioned at the start
+        """
+        frame = self.base.copy()
+        for k, stop in enumerate((s1, s2, s3)):
+            self.cache.column(k, stop, FRAME_COUNT, out=self._window_view(frame[np.newaxis], k)[0])
+
+        buffer = io.BytesIO()
+        self._images([frame])[0].save(buffer, format='PNG')
+        buffer.seek(0)
+        return buffer
+
+
+def window_rows(assets):
+    """
+    Find the rows the facade leaves open over each reel.
+
+    Args:
+        assets (SlotsAssets): Decoded slot machine assets
+
+    Returns:
+        list: Per reel, the (start, end) canvas rows of each window, top to bottom
+    """
+    mask = assets.facade_mask()
+    windows = []
+    for reel_index in range(REEL_COUNT):
+        left = REEL_X + assets.reel_size[0] * reel_index
+        open_rows = ~mask[:, left:left + assets.reel_size[0]].all(axis=1)
+        # Windows start where a run of open rows begins and end where it stops
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], open_rows, [False])).astype(np.int8)))
+        windows.append([(int(start), int(end)) for start, end in zip(edges[::2], edges[1::2])])
+    return windows
+
+
+def visible_positions(windows, stop, reel_symbols):
+    """
+    Get the reel strip position shown in each window of a stopped reel.
+
+    The final frame draws the strip from the same offset as
+    ReelFrameCache.column. A window that straddles two symbols shows the one
+    covering most of its rows.
+
+    Args:
+        windows (list): (start, end) canvas rows of one reel's windows
+        stop (int): Reel stop position
+        reel_symbols (int): Number of symbol positions on the reel strip
+
+    Returns:
+        list: Strip position per window, None where the window is mostly past the strip
+    """
+    top = REEL_Y - SPIN_SPEED * FRAME_COUNT * stop
+    positions = []
+    for start, end in windows:
+        first = (start - top) // SYMBOL_SIZE
+        last = (end - 1 - top) // SYMBOL_SIZE
+        covered = [
+            min(end, top + (position + 1) * SYMBOL_SIZE) - max(start, top + position * SYMBOL_SIZE)
+            for position in range(first, last + 1)
+        ]
+        position = first + covered.index(max(covered))
+        positions.append(position if 0 <= position < reel_symbols else None)
+    return positions
+
+
+def visible_grid(windows, stops, reel_symbols, symbols):
+    """
+    Get the symbol keys shown in the windows once the reels stop.
+
+    Args:
+        windows (list): Per reel window rows, from window_rows()
+        stops (tuple): Reel stop positions
+        reel_symbols (int): Number of symbol positions on the reel strip
+        symbols (tuple): Symbol keys in reel strip order
+
+    Returns:
+        list: Rows of symbol keys, top to bottom, None for an empty window
+    """
+    columns = []
+    for reel_windows, stop in zip(windows, stops):
+        positions = visible_positions(reel_windows, stop, reel_symbols)
+        columns.append([None if p is None else symbols[p % len(symbols)] for p in positions])
+    return [list(row) for row in zip(*columns)]
+
+
+# Renderer owned by each worker process, set up by _init_worker
+_worker_renderer = None
+
+
+def render_digest(assets):
+    """
+    Get a digest of everything besides the reel stops that shapes an animation.
+
+    Changing an asset, the reel geometry or an encoder setting changes the
+    digest, so disk-cached animations from older settings are never served.
+
+    Args:
+        assets (SlotsAssets): Decoded slot machine assets
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    settings = {
+        "reel_size": assets.reel_size,
+        "facade_size": assets.facade_size,
+        "geometry": [REEL_COUNT, REEL_X, REEL_Y, SPIN_SPEED, FRAME_COUNT, FRAME_DURATION, DELTA_MIN_RUN],
+        "formats": {fmt: spec["params"] for fmt, spec in ANIMATION_FORMATS.items()},
+    }
+    digest.update(json.dumps(settings, sort_keys=True).encode())
+    for buffer in (assets.palette, assets.reel_indices, assets.facade_indices, assets.facade_data):
+        digest.update(buffer)
+    return digest.hexdigest()
+
+
+def _init_worker(assets, cache_bytes, prewarm_stops):
+    """Build the worker's renderer and warm its column cache."""
+    global _worker_renderer
+    _worker_renderer = SlotsRenderer(assets, cache_bytes)
+    _worker_renderer.cache.prewarm(prewarm_stops)
+
+
+def _worker_ready():
+    """No-op task that makes the pool start a worker."""
+
+
+def _render_in_worker(s1, s2, s3, fmt):
+    """Render a spin in a worker process and return the encoded bytes."""
+    return _worker_renderer.render_animation(s1, s2, s3, fmt).getvalue()
+
+
+class RenderRejected(Exception):
+    """Raised when the render scheduler refuses a render or gives up waiting for it."""
+
+    def __init__(self, reason):
+        super().__init__(f"Render rejected: {reason}")
+        self.reason = reason
+
+
+class RenderPool:
+    """
+    Process pool that renders animated slots spins off the event loop.
+
+    At most `max_running` renders are submitted to the workers at once. Other
+    requests wait in per-user queues that are served round-robin, so one
+    player spamming spins can't starve everyone else. Requests that would
+    wait longer than the queue-time budget are rejected with RenderRejected,
+    and callers fall back to a still or text result.
+
+    With a `disk_cache`, finished animations are stored on disk and later
+    requests for the same outcome are served from it without queueing.
+    """
+
+    def __init__(self, assets, workers=RENDER_WORKERS, max_queued=RENDER_QUEUE_SIZE,
+                 queue_budget=RENDER_QUEUE_BUDGET, user_limit=RENDER_USER_LIMIT,
+                 cache_bytes=REEL_CACHE_BYTES, prewarm_stops=(), disk_cache=None):
+        self.assets = assets
+        self.disk_cache = disk_cache
+        self.workers = workers
+        self.max_running = workers
+        self.max_queued = max_queued
+        self.queue_budget = queue_budget
+        self.user_limit = user_limit
+        # Each worker keeps its own column cache, so split the budget between them
+        self.cache_bytes = cache_bytes // workers
+        self.prewarm_stops = tuple(prewarm_stops)
+        self._executor = self._create_executor()
+
+        self.running = 0
+        self._waiting = OrderedDict()  # User ID -> deque of waiter futures, in serving order
+        self._user_renders = {}        # User ID -> renders queued or running
+        self._render_seconds = 0.15    # Moving average render time, for queue wait estimates
+
+        # Stills are rendered on a thread in this process, without a column cache,
+        # and the most recent ones are kept
+        self._still_renderer = SlotsRenderer(assets, cache_bytes=0)
+        self._stills = OrderedDict()
+        self._still_slots = asyncio.Semaphore(STILL_CONCURRENCY)
+
+    @property
+    def queued(self):
+        """Number of renders waiting for a worker."""
+        return sum(len(waiters) for waiters in self._waiting.values())
+
+    def _create_executor(self):
+        # Workers come from a forkserver, a fresh single-threaded process, never
+        # from a plain fork of this one: the bot, Flask and asyncio threads may
+        # hold locks (logging's, for one) that a forked child would inherit locked.
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["utils.slots_render"])
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.assets, self.cache_bytes, self.prewarm_stops),
+        )
+        # Start every worker now rather than on the first spins
+        for _ in range(self.workers):
+            executor.submit(_worker_ready)
+        return executor
+
+    def _update_gauges(self):
+        metrics.set_gauge("render.queue_depth", self.queued)
+        metrics.set_gauge("render.running", self.running)
+
+    def _reject(self, reason):
+        metrics.increment(f"render.dropped.{reason}")
+        return RenderRejected(reason)
+
+    def _dispatch(self):
+        """Hand free worker slots to waiting renders, one user at a time."""
+        while self.running < self.max_running and self._waiting:
+            user_id, waiters = next(iter(self._waiting.items()))
+            waiter = waiters.popleft()
+            # Serve this user's next render after everyone else's
+            del self._waiting[user_id]
+            if waiters:
+                self._waiting[user_id] = waiters
+            if waiter.done():
+                continue
+            self.running += 1
+            waiter.set_result(None)
+        self._update_gauges()
+
+    async def _acquire(self, user_id):
+        """Wait for a worker slot within the queue-time budget."""
+        if self.running < self.max_running and not self._waiting:
+            self.running += 1
+            self._update_gauges()
+            return
+
+        queued = self.queued
+        if queued >= self.max_queued:
+            raise self._reject("queue_full")
+        # Renders ahead of this one finish max_running at a time
+        expected_wait = (queued // self.max_running + 1) * self._render_seconds
+        if expected_wait > self.queue_budget:
+            raise self._reject("over_budget")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(user_id, deque()).append(waiter)
+        self._update_gauges()
+        try:
+            await asyncio.wait({waiter}, timeout=self.queue_budget)
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the caller was cancelled
+                self._release()
+            else:
+                self._leave_queue(user_id, waiter)
+            raise
+
+        if not waiter.done():
+            self._leave_queue(user_id, waiter)
+            raise self._reject("timeout")
+        if waiter.cancelled():
+            # The pool shut down while this render was queued
+            raise self._reject("shutdown")
+
+    def _leave_queue(self, user_id, waiter):
+        """Remove a render that stopped waiting from its user's queue."""
+        waiter.cancel()
+        waiters = self._waiting.get(user_id)
+        if waiters is not None and waiter in waiters:
+            waiters.remove(waiter)
+            if not waiters:
+                del self._waiting[user_id]
+        self._update_gauges()
+
+    def _release(self):
+        self.running -= 1
+        self._dispatch()
+
+    async def render_animation(self, s1, s2, s3, fmt=DEFAULT_ANIMATION_FORMAT, user_id=None):
+        """
+        Render a spin in the pool, waiting for a worker if the pool is busy.
+
+        Args:
+            s1, s2, s3 (int): Reel stop positions
+            fmt (str): Key of ANIMATION_FORMATS
+            user_id (str, optional): Player the render is for, used for fairness
+
+        Returns:
+            io.RawIOBase: Encoded animation, positioned at the start; a
+                memory-mapped file on a disk cache hit, otherwise io.BytesIO
+
+        Raises:
+            RenderRejected: If the user or the queue is over its limit, or the
+                render couldn't start within the queue-time budget
+        """
+        extension = ANIMATION_FORMATS[fmt]["extension"]
+        if self.disk_cache is not None:
+            cached = await asyncio.to_thread(self.disk_cache.get, (s1, s2, s3), fmt, extension)
+            if cached is not None:
+                return cached
+
+        if self._user_renders.get(user_id, 0) >= self.user_limit:
+            raise self._reject("user_limit")
+
+        self._user_renders[user_id] = self._user_renders.get(user_id, 0) + 1
+        try:
+            queued_at = time.monotonic()
+            await self._acquire(user_id)
+            started_at = time.monotonic()
+            metrics.observe("render.wait_seconds", started_at - queued_at)
+            try:
+                loop = asyncio.get_running_loop()
+                data = await loop.run_in_executor(self._executor, _render_in_worker, s1, s2, s3, fmt)
+            except BrokenProcessPool:
+                logger.error("Render worker died, restarting render pool")
+                self._executor = self._create_executor()
+                raise
+            finally:
+                self._release()
+        finally:
+            self._user_renders[user_id] -= 1
+            if not self._user_renders[user_id]:
+                del self._user_renders[user_id]
+
+        render_seconds = time.monotonic() - started_at
+        self._render_seconds = 0.8 * self._render_seconds + 0.2 * render_seconds
+        metrics.observe("render.render_seconds", render_seconds)
+        metrics.increment("render.completed")
+
+        if self.disk_cache is not None:
+            try:
+                await asyncio.to_thread(self.disk_cache.put, (s1, s2, s3), fmt, extension, data)
+            except OSError as e:
+                logger.error(f"Error storing animation in the render cache: {e}")
+        return io.BytesIO(data)
+
+    async def prerender(self, outcomes, fmt=DEFAULT_ANIMATION_FORMAT, idle_delay=1.0):
+        """
+        Fill the disk cache with outcomes that aren't cached yet, only while the pool is idle.
+
+        Stops once another animation wouldn't fit, so later (less wanted)
+        outcomes never evict earlier ones.
+
+        Args:
+            outcomes (list): (s1, s2, s3) reel stops, most wanted first
+            fmt (str): Key of ANIMATION_FORMATS
+            idle_delay (float): Seconds to wait before checking a busy pool again
+
+        Returns:
+            int: Number of animations rendered
+        """
+        extension = ANIMATION_FORMATS[fmt]["extension"]
+        rendered = 0
+        largest = 0
+        for stops in outcomes:
+            if (stops, fmt, extension) in self.disk_cache:
+                continue
+            if self.disk_cache.bytes + largest > self.disk_cache.max_bytes:
+                break
+            # Players' spins always go first
+            while self.running or self._waiting:
+                await asyncio.sleep(idle_delay)
+            try:
+                animation = await self.render_animation(*stops, fmt, user_id="prerender")
+            except RenderRejected:
+                continue
+            largest = max(largest, len(animation.getvalue()))
+            rendered += 1
+        return rendered
+
+    async def render_still(self, s1, s2, s3):
+        """
+        Render the final frame of a spin as a PNG, bypassing the worker queue.
+
+        Args:
+            s1, s2, s3 (int): Reel stop positions
+
+        Returns:
+            io.BytesIO: Encoded PNG, positioned at the start
+
+        Raises:
+            RenderRejected: If every still render slot is in use
+        """
+        key = (s1, s2, s3)
+        data = self._stills.get(key)
+        if data is not None:
+            self._stills.move_to_end(key)
+            return io.BytesIO(data)
+
+        if self._still_slots.locked():
+            raise self._reject("still_busy")
+        async with self._still_slots:
+            data = (await asyncio.to_thread(self._still_renderer.render_still, s1, s2, s3)).getvalue()
+
+        self._stills[key] = data
+        if len(self._stills) > STILL_CACHE_SIZE:
+            self._stills.popitem(last=False)
+        return io.BytesIO(data)
+
+    def shutdown(self):
+        """Stop the worker processes, dropping queued renders."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for waiters in self._waiting.values():
+            for waiter in waiters:
+                waiter.cancel()